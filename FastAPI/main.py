@@ -1,33 +1,32 @@
-from fastapi import FastAPI  # all lowercase for 'fastapi'
-import uvicorn
-from BankNotes import BankNote # Importing the BankNote model
-import numpy as np
-import pandas as pd
-import pickle
+import importlib.util
+import os
+import sys
 
 
-# Create FastAPI instance
-app = FastAPI()
-pickle_in = open("model.pkl", "rb")
-classifier = pickle.load(pickle_in)
+# The Bank-Note-Authentication service (machine lear/Resources/Ml-BASIC-PROJECT/
+# Bank-Note-Authentication/main.py), served from this folder. Everything -
+# the endpoints, batching, caching, reloading - lives in that file; this one
+# only loads it. model.pkl is opened relative to the working directory, so
+# start it from the Bank-Note-Authentication folder:
+#
+#   cd "machine lear/Resources/Ml-BASIC-PROJECT/Bank-Note-Authentication"
+#   uvicorn main:app --app-dir ../../../../FastAPI
 
+BANK_NOTE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'machine lear', 'Resources', 'Ml-BASIC-PROJECT', 'Bank-Note-Authentication')
 
-@app.get('/')
-def index():
-    return {'message': 'Hello, World'}
+# BankNotes, microbatch, stream_scoring and metrics are imported from there
+sys.path.insert(0, BANK_NOTE_DIR)
 
-@app.post('/predict')
-def predict_bank_note(data: BankNote):
-    variance = data.variance
-    skewness = data.skewness
-    curtosis = data.curtosis
-    entropy = data.entropy
-    prediction = classifier.predict([[variance, skewness, curtosis, entropy]])
-    if prediction[0] == 0:
-        return {'prediction': 'The note is authentic'}
-    else:
-        return {'prediction': 'The note is not authentic'}
+# Both files are called main.py, so the service is loaded under its own name
+_spec = importlib.util.spec_from_file_location('bank_note_main', os.path.join(BANK_NOTE_DIR, 'main.py'))
+bank_note_main = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = bank_note_main
+_spec.loader.exec_module(bank_note_main)
+
+app = bank_note_main.app
+models = bank_note_main.models
 
 if __name__ == '__main__':
+    import uvicorn
     uvicorn.run(app, host='127.0.0.1', port=8000)
-# BankNotes.py
\ No newline at end of file
@@ -0,0 +1,168 @@
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+# Iterative (MICE) imputation, the same algorithm MICE.ipynb walks through by
+# hand: start from column means, then repeatedly regress each column with
+# missing values on all the other columns (fitting on the rows where it is
+# observed) and replace its missing cells with the predictions.
+#
+# Instead of refitting a LinearRegression per column per round, every fit is
+# solved from one Gram matrix G = A^T A of the working matrix A = [1, X]:
+#   G_obs = G - A_mis^T A_mis      (only the few missing rows are touched)
+# and G is patched with a rank update after each column changes. All updates
+# happen in place in a single working array; nothing is copied per round.
+#
+# update='sequential' matches the notebook (each column sees the values just
+# imputed for earlier columns). update='parallel' groups columns whose missing
+# rows never overlap - none of them is needed to predict another's missing
+# cells - and solves each group together: one batched np.linalg.solve call,
+# with the per-column work spread over n_jobs threads. Groups still run one
+# after another, so rows with several missing cells stay stable. (Updating
+# overlapping columns simultaneously, Jacobi style, can diverge.)
+#
+# A column with no observed values has nothing to regress on: it is left NaN,
+# as sklearn's IterativeImputer does for the column it drops with
+# keep_empty_features=False.
+
+
+class MICEImputer:
+    def __init__(self, max_iter=10, tol=1e-3, update='sequential', n_jobs=None, ridge=1e-10, copy=True):
+        if update not in ('sequential', 'parallel'):
+            raise ValueError("update must be 'sequential' or 'parallel'")
+        self.max_iter = max_iter
+        self.tol = tol
+        self.update = update
+        self.n_jobs = n_jobs
+        self.ridge = ridge
+        self.copy = copy
+
+    def _prepare(self, X):
+        # Working matrix A = [1, standardised X]; standardising keeps the
+        # normal equations well conditioned for columns like R&D Spend
+        A = np.empty((X.shape[0], X.shape[1] + 1))
+        A[:, 0] = 1.0
+        A[:, 1:] = X
+        with warnings.catch_warnings():
+            # Empty columns: their NaN mean and scale are replaced below
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.mean_ = np.nanmean(X, axis=0)
+            self.scale_ = np.nanstd(X, axis=0)
+        self.scale_[~(self.scale_ > 0)] = 1.0
+        self.mean_[np.isnan(self.mean_)] = 0.0
+        A[:, 1:] -= self.mean_
+        A[:, 1:] /= self.scale_
+        mask = np.isnan(A)
+        # Round 0: mean imputation (0 after centring)
+        A[mask] = 0.0
+        return A, mask
+
+    def _system(self, A, G, rows, j):
+        # Normal equations for column j on its observed rows, with column j
+        # itself swapped for an identity row so every system has the same shape
+        A_mis = A[rows]
+        G_obs = G - A_mis.T @ A_mis
+        b = G_obs[:, j].copy()
+        G_obs[j, :] = 0.0
+        G_obs[:, j] = 0.0
+        G_obs[j, j] = 1.0
+        b[j] = 0.0
+        n_obs = A.shape[0] - len(rows)
+        G_obs[np.arange(1, len(G)), np.arange(1, len(G))] += self.ridge * max(n_obs, 1)
+        return G_obs, b
+
+    def _apply(self, A, G, rows, j, new_values):
+        # Rank update of G for the changed cells, then write them in place
+        d = new_values - A[rows, j]
+        v = A[rows].T @ d
+        G[j, :] += v
+        G[:, j] += v
+        G[j, j] += d @ d
+        A[rows, j] = new_values
+        return np.abs(d).max() if len(d) else 0.0
+
+    def _sweep_sequential(self, A, G, columns):
+        change = 0.0
+        for j, rows in columns:
+            G_obs, b = self._system(A, G, rows, j)
+            beta = np.linalg.solve(G_obs, b)
+            change = max(change, self._apply(A, G, rows, j, A[rows] @ beta))
+        return change
+
+    @staticmethod
+    def _groups(mask, columns):
+        # Greedy colouring of the "missing rows overlap" graph
+        M = mask[:, [j for j, _ in columns]].astype(np.float32)
+        overlap = (M.T @ M) > 0
+        groups = []
+        for k in range(len(columns)):
+            for group in groups:
+                if not overlap[k, group].any():
+                    group.append(k)
+                    break
+            else:
+                groups.append([k])
+        return [[columns[k] for k in group] for group in groups]
+
+    def _sweep_parallel(self, A, G, groups, pool):
+        change = 0.0
+        for group in groups:
+            if len(group) == 1:
+                change = max(change, self._sweep_sequential(A, G, group))
+                continue
+            systems = list(pool.map(lambda item: self._system(A, G, item[1], item[0]), group))
+            betas = np.linalg.solve(np.stack([s[0] for s in systems]),
+                                    np.stack([s[1] for s in systems])[..., None])[..., 0]
+            predictions = list(pool.map(lambda k: A[group[k][1]] @ betas[k], range(len(group))))
+            for (j, rows), values in zip(group, predictions):
+                change = max(change, self._apply(A, G, rows, j, values))
+        return change
+
+    def fit_transform(self, X):
+        frame = X if isinstance(X, pd.DataFrame) else None
+        if frame is not None:
+            numeric = frame.select_dtypes(include='number').columns
+            values = frame[numeric].to_numpy(dtype=np.float64, copy=True)
+        else:
+            values = np.asarray(X, dtype=np.float64)
+            if self.copy and values is X:
+                values = values.copy()
+
+        A, mask = self._prepare(values)
+        # Columns to impute: some but not all values missing (1-based in A)
+        columns = [(j, np.flatnonzero(mask[:, j]))
+                   for j in range(1, A.shape[1]) if 0 < mask[:, j].sum() < len(A)]
+
+        self.history_ = []
+        self.n_iter_ = 0
+        pool = None
+        if self.update == 'parallel' and columns:
+            groups = self._groups(mask, columns)
+            pool = ThreadPoolExecutor(self.n_jobs)
+        try:
+            for _ in range(self.max_iter if columns else 0):
+                # Fresh Gram each round so rank-update round-off never accumulates
+                G = A.T @ A
+                if pool is None:
+                    change = self._sweep_sequential(A, G, columns)
+                else:
+                    change = self._sweep_parallel(A, G, groups, pool)
+                self.n_iter_ += 1
+                self.history_.append(change)
+                # Largest change of any imputed cell, in standard deviations
+                if change < self.tol:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        # Back to original units, writing only the imputed cells (empty columns stay NaN)
+        rows, cols = np.nonzero(mask[:, 1:] & ~mask[:, 1:].all(axis=0))
+        values[rows, cols] = A[rows, cols + 1] * self.scale_[cols] + self.mean_[cols]
+        if frame is None:
+            return values
+        out = frame.copy() if self.copy else frame
+        out[numeric] = values
+        return out
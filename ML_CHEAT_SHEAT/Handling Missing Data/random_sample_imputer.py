@@ -0,0 +1,141 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+
+# Random sample (hot deck) imputation, as described in RandomSampleImputatio.ipynb:
+# every missing cell gets a value drawn from the observed values of its column.
+#
+# The usual recipe - X[col].dropna().sample(n) and realigning the index, one
+# column at a time - is slow on wide frames and gives a different fill for the
+# same row depending on what else is in the batch. Here fit() keeps one pool of
+# observed values per column (all pools concatenated into a single array), and
+# transform() fills every missing cell of every column in one vectorized
+# gather. The draw for a cell depends only on (random_state, row key, column),
+# so scoring a single request online gives exactly the fill the offline batch
+# job gave that row:
+#
+#   imputer = RandomSampleImputer(random_state=2).fit(X_train)
+#   X_batch = imputer.transform(X_test, keys='PassengerId')
+#   X_one = imputer.transform(X_test.iloc[[5]], keys='PassengerId')   # same fill
+#
+# NumPy arrays are handled without going through pandas (columns are then
+# identified by position).
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(h):
+    # splitmix64 finaliser, vectorized over a uint64 array
+    h = h + _GOLDEN
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def hash_keys(keys):
+    # Stable across processes and platforms (unlike hash() on str)
+    keys = np.asarray(keys)
+    if keys.dtype.kind in 'iub':
+        return keys.astype(np.int64).view(np.uint64)
+    if keys.dtype.kind == 'f':
+        return keys.astype(np.float64).view(np.uint64)
+    return pd.util.hash_array(keys.astype(object))
+
+
+def _is_missing(values):
+    if values.dtype.kind == 'f':
+        return np.isnan(values)
+    if values.dtype.kind == 'O':
+        return pd.isna(values)
+    return np.zeros(values.shape, dtype=bool)
+
+
+class _Pools:
+    # Observed values of several columns in one array; column j owns
+    # values[offsets[j]:offsets[j] + sizes[j]]
+    def __init__(self, values, salts):
+        observed = ~_is_missing(values)
+        # Column-major boolean indexing lays the pools out one after another
+        self.values = values.T[observed.T]
+        self.sizes = observed.sum(axis=0).astype(np.uint64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes)[:-1]]).astype(np.int64)
+        self.salts = salts
+
+    def fill(self, values, key_hashes, seed):
+        mask = _is_missing(values)
+        rows, cols = np.nonzero(mask)
+        if not len(rows):
+            return values
+        sizes = self.sizes[cols]
+        if not sizes.all():
+            raise ValueError('Cannot impute a column that had no observed values during fit')
+        h = _mix(_mix(key_hashes[rows] ^ seed) ^ self.salts[cols])
+        values[rows, cols] = self.values[self.offsets[cols] + (h % sizes).astype(np.int64)]
+        return values
+
+
+class RandomSampleImputer:
+    def __init__(self, random_state=0, copy=True):
+        self.random_state = random_state
+        self.copy = copy
+
+    @staticmethod
+    def _salts(columns):
+        return _mix(np.array([zlib.crc32(str(column).encode('utf-8')) for column in columns], dtype=np.uint64))
+
+    def fit(self, X):
+        self._seed = _mix(np.array([self.random_state], dtype=np.uint64))[0]
+        if isinstance(X, pd.DataFrame):
+            self.columns_ = list(X.columns)
+            # One pool block per dtype, so numeric fills stay numeric
+            self._blocks = {}
+            for numeric, columns in self._split(X).items():
+                values = X[columns].to_numpy(dtype=np.float64 if numeric else object)
+                self._blocks[numeric] = (columns, _Pools(values, self._salts(columns)))
+        else:
+            values = np.asarray(X)
+            if values.ndim != 2:
+                raise ValueError('Expected a 2-D array')
+            self.columns_ = list(range(values.shape[1]))
+            self._pools = _Pools(values, self._salts(self.columns_))
+        return self
+
+    @staticmethod
+    def _split(frame):
+        numeric = frame.select_dtypes(include=['number', 'bool']).columns
+        blocks = {True: list(numeric), False: [c for c in frame.columns if c not in set(numeric)]}
+        return {kind: columns for kind, columns in blocks.items() if columns}
+
+    def _key_hashes(self, X, keys):
+        if keys is None:
+            # Fallback: the row position/index. Pass real ids for online/offline parity.
+            keys = X.index.to_numpy() if isinstance(X, pd.DataFrame) else np.arange(len(X))
+        elif isinstance(X, pd.DataFrame) and isinstance(keys, str):
+            keys = X[keys].to_numpy()
+        hashes = hash_keys(keys)
+        if len(hashes) != len(X):
+            raise ValueError('Expected one key per row')
+        return hashes
+
+    def transform(self, X, keys=None):
+        key_hashes = self._key_hashes(X, keys)
+        if not isinstance(X, pd.DataFrame):
+            values = np.array(X, copy=True) if self.copy else np.asarray(X)
+            if values.dtype.kind not in 'fO':
+                return values
+            return self._pools.fill(values, key_hashes, self._seed)
+
+        out = X.copy() if self.copy else X
+        for numeric, (columns, pools) in self._blocks.items():
+            values = out[columns].to_numpy(dtype=np.float64 if numeric else object, copy=True)
+            touched = np.flatnonzero(_is_missing(values).any(axis=0))
+            if len(touched):
+                values = pools.fill(values, key_hashes, self._seed)
+                # Only columns that had gaps are written back, so the rest keep their dtype
+                for j in touched:
+                    out[columns[j]] = values[:, j]
+        return out
+
+    def fit_transform(self, X, keys=None):
+        return self.fit(X).transform(X, keys)
@@ -0,0 +1,286 @@
+import heapq
+import numpy as np
+import pandas as pd
+
+
+# Out-of-core versions of the imputations in this folder (mean/median,
+# frequent value, arbitrary value, missing category, CCA). Statistics are
+# fitted in one pass over CSV chunks and applied chunk by chunk on the way
+# out, so peak memory is set by the chunk size, not the file size.
+#
+#   imputer = StreamingImputer({'GarageQual': 'most_frequent',
+#                               'FireplaceQu': 'missing_category',
+#                               'LotFrontage': 'median',
+#                               'MasVnrArea': ('constant', 0)},
+#                              drop_na=['Electrical'])
+#   imputer.fit_csv('../Dataset/train1.csv')
+#   imputer.transform_csv('../Dataset/train1.csv', 'train1_imputed.csv')
+#
+# Every statistic is mergeable, so workers can fit separate shards and the
+# results combined with imputer.merge(other).
+
+
+class QuantileSketch:
+    # Exact value counts while the column has at most exact_limit distinct
+    # values (so the median matches pandas exactly), then a KLL-style
+    # compactor sketch: level h holds sorted items of weight 2**h, and a full
+    # level keeps every other item (random offset) and promotes it to h + 1.
+    def __init__(self, k=2048, exact_limit=100_000, seed=0):
+        self.k = k
+        self.exact_limit = exact_limit
+        self.counts = {}
+        self.levels = None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self):
+        return self.levels is None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        if self.exact:
+            uniques, counts = np.unique(values, return_counts=True)
+            self._add_counts(uniques, counts)
+        else:
+            self._add(0, values)
+
+    def _add_counts(self, values, counts):
+        if self.exact:
+            for value, count in zip(values.tolist(), counts.tolist()):
+                self.counts[value] = self.counts.get(value, 0) + count
+            if len(self.counts) > self.exact_limit:
+                self._to_sketch()
+            return
+        # A value seen c times goes to level h for every bit h set in c
+        counts = np.asarray(counts)
+        for h in range(int(counts.max()).bit_length()):
+            self._add(h, values[(counts >> h) & 1 == 1])
+
+    def _to_sketch(self):
+        values = np.fromiter(self.counts.keys(), dtype=np.float64, count=len(self.counts))
+        counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        self.counts = {}
+        self.levels = []
+        self._add_counts(values, counts)
+
+    def _add(self, h, values):
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0))
+        self.levels[h] = np.concatenate([self.levels[h], values])
+        while len(self.levels[h]) > self.k:
+            items = np.sort(self.levels[h])
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            items = items[:len(items) - len(keep)]
+            self.levels[h] = keep
+            promoted = items[self._rng.integers(2)::2]
+            if len(self.levels) <= h + 1:
+                self.levels.append(np.empty(0))
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def merge(self, other):
+        if self.exact and other.exact:
+            self._add_counts(np.array(list(other.counts.keys())), np.array(list(other.counts.values())))
+            return self
+        if self.exact:
+            self._to_sketch()
+        if other.exact:
+            self._add_counts(np.array(list(other.counts.keys())), np.array(list(other.counts.values()), dtype=np.int64))
+        else:
+            for h, items in enumerate(other.levels):
+                if len(items):
+                    self._add(h, items)
+        return self
+
+    def quantile(self, q):
+        if self.exact:
+            if not self.counts:
+                return np.nan
+            values = np.array(sorted(self.counts))
+            weights = np.array([self.counts[value] for value in values.tolist()])
+            # Same linear interpolation as pandas/numpy on the full column
+            position = q * (weights.sum() - 1)
+            cumulative = np.cumsum(weights)
+            lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+            upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+            return lower + (upper - lower) * (position - np.floor(position))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        return values[order][np.searchsorted(cumulative, q * cumulative[-1])]
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+def _value_key(value):
+    # Orders values of one type as usual and groups mixed types by type name,
+    # so ties never compare e.g. a str with a float
+    return type(value).__name__, value
+
+
+class FrequentItems:
+    # Exact counts up to `capacity` distinct values; past that a weighted
+    # Space-Saving summary. A new value that does not fit takes over the
+    # counter of the current minimum m: its count starts at m + count and
+    # errors[value] = m records how much of that may belong to other values.
+    # Every count is an overestimate by at most its error, and any value
+    # occurring more than total / capacity times is guaranteed to be kept.
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.exact = True
+        # Min-heap of [count, order, value]; counts only grow, so entries go
+        # stale and are refreshed when they reach the top
+        self._heap = []
+        self._order = 0
+
+    def update(self, series):
+        self._add(series.value_counts(dropna=True).items())
+
+    def _push(self, value):
+        heapq.heappush(self._heap, (self.counts[value], self._order, value))
+        self._order += 1
+
+    def _pop_min(self):
+        while True:
+            count, _, value = heapq.heappop(self._heap)
+            if count == self.counts[value]:
+                return value
+            self._push(value)
+
+    def _add(self, items, errors=None):
+        for value, count in items:
+            count = int(count)
+            error = errors.get(value, 0) if errors else 0
+            if value in self.counts:
+                self.counts[value] += count
+                self.errors[value] += error
+                continue
+            if len(self.counts) >= self.capacity:
+                self.exact = False
+                evicted = self._pop_min()
+                floor = self.counts.pop(evicted)
+                del self.errors[evicted]
+                count += floor
+                error += floor
+            self.counts[value] = count
+            self.errors[value] = error
+            self._push(value)
+
+    def merge(self, other):
+        self.exact = self.exact and other.exact
+        self._add(other.counts.items(), other.errors)
+        return self
+
+    def mode(self):
+        if not self.counts:
+            return np.nan
+        best = max(self.counts.values())
+        # Ties resolve to the smallest value, like Series.mode()[0]
+        return min((value for value, count in self.counts.items() if count == best), key=_value_key)
+
+    def vocabulary(self):
+        return sorted(self.counts, key=_value_key)
+
+
+class StreamingImputer:
+    STRATEGIES = ('mean', 'median', 'most_frequent', 'constant', 'missing_category')
+
+    def __init__(self, strategies, drop_na=(), chunksize=100_000, sketch_size=2048, exact_limit=100_000):
+        self.strategies = {}
+        for column, strategy in strategies.items():
+            fill_value = None
+            if isinstance(strategy, tuple):
+                strategy, fill_value = strategy
+            if strategy not in self.STRATEGIES:
+                raise ValueError('Unknown strategy {!r} for column {!r}'.format(strategy, column))
+            if strategy == 'missing_category':
+                strategy, fill_value = 'constant', 'Missing'
+            self.strategies[column] = (strategy, fill_value)
+        # Complete-case analysis: rows missing any of these are dropped
+        self.drop_na = list(drop_na)
+        self.chunksize = chunksize
+        self.sketch_size = sketch_size
+        self.exact_limit = exact_limit
+        self.n_rows_ = 0
+        self._stats = {}
+        for column, (strategy, _) in self.strategies.items():
+            if strategy == 'mean':
+                self._stats[column] = [0, 0.0]
+            elif strategy == 'median':
+                self._stats[column] = QuantileSketch(sketch_size, exact_limit)
+            else:
+                self._stats[column] = FrequentItems(exact_limit)
+
+    def partial_fit(self, chunk):
+        self.n_rows_ += len(chunk)
+        for column, (strategy, _) in self.strategies.items():
+            series = chunk[column]
+            if strategy == 'mean':
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                values = values[~np.isnan(values)]
+                self._stats[column][0] += len(values)
+                self._stats[column][1] += values.sum()
+            elif strategy == 'median':
+                self._stats[column].update(series.to_numpy(dtype=np.float64, na_value=np.nan))
+            else:
+                self._stats[column].update(series)
+        return self
+
+    def fit_chunks(self, chunks):
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def fit_csv(self, path, **read_csv_kwargs):
+        # Only the imputed columns are parsed in the fit pass
+        reader = pd.read_csv(path, usecols=list(self.strategies), chunksize=self.chunksize, **read_csv_kwargs)
+        return self.fit_chunks(reader)
+
+    def merge(self, other):
+        self.n_rows_ += other.n_rows_
+        for column, (strategy, _) in self.strategies.items():
+            if strategy == 'mean':
+                self._stats[column][0] += other._stats[column][0]
+                self._stats[column][1] += other._stats[column][1]
+            else:
+                self._stats[column].merge(other._stats[column])
+        return self
+
+    @property
+    def statistics_(self):
+        fills = {}
+        for column, (strategy, fill_value) in self.strategies.items():
+            stat = self._stats[column]
+            if strategy == 'mean':
+                fills[column] = stat[1] / stat[0] if stat[0] else np.nan
+            elif strategy == 'median':
+                fills[column] = stat.median()
+            elif strategy == 'most_frequent':
+                fills[column] = stat.mode()
+            else:
+                fills[column] = fill_value
+        return fills
+
+    def vocabulary(self, column):
+        # Observed categories of a most_frequent / constant column (sorted)
+        return self._stats[column].vocabulary()
+
+    def transform(self, chunk, statistics=None):
+        if self.drop_na:
+            chunk = chunk.dropna(subset=self.drop_na)
+        return chunk.fillna(statistics if statistics is not None else self.statistics_)
+
+    def transform_csv(self, path, out_path, **read_csv_kwargs):
+        statistics = self.statistics_
+        header = True
+        for chunk in pd.read_csv(path, chunksize=self.chunksize, **read_csv_kwargs):
+            self.transform(chunk, statistics).to_csv(out_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+        return out_path
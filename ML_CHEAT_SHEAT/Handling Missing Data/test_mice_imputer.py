@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from mice_imputer import MICEImputer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COLUMNS = ['R&D Spend', 'Administration', 'Marketing Spend', 'Profit']
+
+
+def _startups():
+    # read_csv frames hand out read-only arrays under Copy-on-Write
+    df = pd.read_csv(os.path.join(HERE, '..', 'Dataset', '50_Startups.csv'))[COLUMNS + ['State']].copy()
+    rng = np.random.default_rng(0)
+    for column in COLUMNS[:3]:
+        df.loc[rng.choice(len(df), 6, replace=False), column] = np.nan
+    return df
+
+
+def _reference(df, rounds):
+    # MICE.ipynb: mean imputation, then one LinearRegression per column per round
+    missing = df.isna()
+    current = df.fillna(df.mean())
+    for _ in range(rounds):
+        for column in df.columns[missing.any()]:
+            rows = missing[column].to_numpy()
+            others = current.drop(columns=column)
+            model = LinearRegression().fit(others[~rows], current.loc[~rows, column])
+            current.loc[rows, column] = model.predict(others[rows])
+    return current
+
+
+@pytest.mark.parametrize('update', ['sequential', 'parallel'])
+def test_matches_the_notebook_loop(update):
+    df = _startups()
+    out = MICEImputer(max_iter=5, tol=0, update=update).fit_transform(df)
+    expected = _reference(df[COLUMNS], 5)
+    if update == 'sequential':
+        np.testing.assert_allclose(out[COLUMNS].to_numpy(), expected.to_numpy(), rtol=1e-6)
+    assert not out[COLUMNS].isna().any().any()
+    assert out['State'].equals(df['State'])
+    # The input frame is left alone
+    assert df[COLUMNS].isna().sum().sum() == 18
+
+
+def test_parallel_converges_to_the_sequential_result():
+    df = _startups()
+    sequential = MICEImputer(max_iter=500, tol=1e-12).fit_transform(df)
+    parallel = MICEImputer(max_iter=500, tol=1e-12, update='parallel', n_jobs=2).fit_transform(df)
+    np.testing.assert_allclose(parallel[COLUMNS].to_numpy(), sequential[COLUMNS].to_numpy(), rtol=1e-7)
+
+
+def test_empty_columns_stay_missing():
+    df = _startups()[COLUMNS]
+    df['Empty'] = np.nan
+    out = MICEImputer(max_iter=5, tol=0).fit_transform(df)
+    assert out['Empty'].isna().all()
+    assert not out[COLUMNS].isna().any().any()
+    np.testing.assert_allclose(out[COLUMNS].to_numpy(), _reference(df[COLUMNS], 5).to_numpy(), rtol=1e-6)
+
+
+def test_frame_built_from_an_array():
+    values = np.random.default_rng(1).normal(size=(10, 4)) @ np.triu(np.ones((4, 4)))
+    values[[1, 4], 0] = np.nan
+    values[7, 2] = np.nan
+    frame = pd.DataFrame(values, columns=list('abcd'))
+    expected = _reference(frame, 3)
+    out = MICEImputer(max_iter=3, tol=0, copy=False).fit_transform(frame)
+    assert not out.isna().any().any()
+    np.testing.assert_allclose(out.to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+
+def test_array_input():
+    values = _startups()[COLUMNS].to_numpy()
+    out = MICEImputer(max_iter=5, tol=0).fit_transform(values)
+    assert np.isnan(values).sum() == 18
+    np.testing.assert_allclose(out, _reference(pd.DataFrame(values), 5).to_numpy(), rtol=1e-6)
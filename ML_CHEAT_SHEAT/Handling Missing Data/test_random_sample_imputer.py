@@ -0,0 +1,48 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from random_sample_imputer import RandomSampleImputer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    df = pd.read_csv(os.path.join(HERE, '..', 'Dataset', 'Titanic-Dataset.csv'))
+    return df[['PassengerId', 'Age', 'Fare', 'Embarked', 'Cabin']]
+
+
+def test_fills_from_the_observed_values(titanic):
+    out = RandomSampleImputer(random_state=2).fit_transform(titanic, keys='PassengerId')
+    assert not out.isna().any().any()
+    for column in ['Age', 'Embarked', 'Cabin']:
+        missing = titanic[column].isna()
+        assert out.loc[missing, column].isin(titanic[column].dropna()).all()
+        assert out.loc[~missing, column].equals(titanic.loc[~missing, column])
+    assert out['Fare'].equals(titanic['Fare'])
+    assert titanic['Age'].isna().sum() == 177
+
+
+def test_single_rows_get_the_batch_fill(titanic):
+    imputer = RandomSampleImputer(random_state=2).fit(titanic)
+    batch = imputer.transform(titanic, keys='PassengerId')
+    for position in np.flatnonzero(titanic['Age'].isna().to_numpy())[:20]:
+        one = imputer.transform(titanic.iloc[[position]], keys='PassengerId')
+        assert one.iloc[0].equals(batch.iloc[position])
+
+
+@pytest.mark.parametrize('copy', [True, False])
+def test_list_input(copy):
+    rows = [[1.0, np.nan], [np.nan, 5.0], [3.0, 6.0], [4.0, np.nan]]
+    out = RandomSampleImputer(copy=copy).fit(rows).transform(rows)
+    assert not np.isnan(out).any()
+    assert np.isnan(rows[0][1])
+
+
+def test_copy_false_fills_an_array_in_place():
+    values = np.array([[1.0, np.nan], [np.nan, 5.0], [3.0, 6.0]])
+    out = RandomSampleImputer(copy=False).fit(values).transform(values)
+    assert out is values
+    assert not np.isnan(values).any()
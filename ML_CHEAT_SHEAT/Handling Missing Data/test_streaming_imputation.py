@@ -0,0 +1,89 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_imputation import FrequentItems, QuantileSketch, StreamingImputer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TRAIN = os.path.join(HERE, '..', 'Dataset', 'train1.csv')
+
+
+def test_imputes_like_pandas_on_the_whole_file(tmp_path):
+    imputer = StreamingImputer({'GarageQual': 'most_frequent', 'FireplaceQu': 'missing_category',
+                                'LotFrontage': 'median', 'MasVnrArea': ('constant', 0), 'GarageYrBlt': 'mean'},
+                               drop_na=['Electrical'], chunksize=200)
+    imputer.fit_csv(TRAIN)
+    df = pd.read_csv(TRAIN)
+    fills = imputer.statistics_
+    assert fills['GarageQual'] == df['GarageQual'].mode()[0]
+    assert fills['LotFrontage'] == df['LotFrontage'].median()
+    assert fills['GarageYrBlt'] == pytest.approx(df['GarageYrBlt'].mean())
+
+    out = pd.read_csv(imputer.transform_csv(TRAIN, str(tmp_path / 'train1_imputed.csv')))
+    expected = df.dropna(subset=['Electrical']).fillna(fills).reset_index(drop=True)
+    # Through csv text as well, so both sides get the same dtypes
+    pd.testing.assert_frame_equal(out, pd.read_csv(io.StringIO(expected.to_csv(index=False))))
+    assert (out['FireplaceQu'] == 'Missing').sum() == df.dropna(subset=['Electrical'])['FireplaceQu'].isna().sum()
+
+
+def test_merged_shards_match_one_pass():
+    df = pd.read_csv(TRAIN, usecols=['GarageQual', 'LotFrontage'])
+    strategies = {'GarageQual': 'most_frequent', 'LotFrontage': 'median'}
+    whole = StreamingImputer(strategies).partial_fit(df)
+    left = StreamingImputer(strategies).partial_fit(df.iloc[:700])
+    left.merge(StreamingImputer(strategies).partial_fit(df.iloc[700:]))
+    assert left.statistics_ == whole.statistics_
+    assert left.n_rows_ == len(df)
+
+
+def test_quantile_sketch_stays_close_past_the_exact_limit():
+    values = np.random.default_rng(0).normal(size=200_000)
+    sketch = QuantileSketch(k=512, exact_limit=1000)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+    assert not sketch.exact
+    for q in (0.1, 0.5, 0.9):
+        assert abs(np.mean(values <= sketch.quantile(q)) - q) < 0.01
+
+
+def test_mode_ties_with_mixed_types():
+    items = FrequentItems()
+    items.update(pd.Series(['b', 1.5, 'a', 1.5, 'a', 'b', 2], dtype=object))
+    # 'a', 'b' and 1.5 all occur twice; types are ordered by name
+    assert items.mode() == 1.5
+    assert items.vocabulary() == [1.5, 2, 'a', 'b']
+    numbers = FrequentItems()
+    numbers.update(pd.Series([3, 1, 3, 1, 2]))
+    assert numbers.mode() == pd.Series([3, 1, 3, 1, 2]).mode()[0]
+
+
+def test_space_saving_bounds():
+    rng = np.random.default_rng(1)
+    # One heavy value among many rare ones, fed in chunks
+    stream = np.concatenate([np.full(5000, -1), rng.integers(0, 20_000, size=45_000)])
+    rng.shuffle(stream)
+    items = FrequentItems(capacity=100)
+    for chunk in np.array_split(stream, 50):
+        items.update(pd.Series(chunk))
+    assert not items.exact
+    assert len(items.counts) == 100
+    assert items.mode() == -1
+    truth = pd.Series(stream).value_counts()
+    for value, count in items.counts.items():
+        assert truth[value] <= count <= truth[value] + items.errors[value]
+    assert sum(items.counts.values()) == len(stream)
+
+
+def test_space_saving_merge():
+    rng = np.random.default_rng(2)
+    shards = [pd.Series(np.concatenate([np.full(400, 'heavy'), rng.integers(0, 5000, 3000).astype(str)]))
+              for _ in range(3)]
+    merged = FrequentItems(capacity=50)
+    for shard in shards:
+        part = FrequentItems(capacity=50)
+        part.update(shard)
+        merged.merge(part)
+    assert merged.mode() == 'heavy'
+    assert merged.counts['heavy'] - merged.errors['heavy'] <= 1200 <= merged.counts['heavy']
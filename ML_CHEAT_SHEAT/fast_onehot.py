@@ -0,0 +1,197 @@
+import pickle
+import sys
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+# One-hot encoding without object-dtype intermediates.
+#
+# Every column's categories are turned into a pd.Index once at fit time, so
+# transform is one hash lookup per column (get_indexer) giving integer codes.
+# The output is built straight from the codes:
+#   output='csr'    scipy CSR matrix (one stored 1.0 per known category per row)
+#   output='dense'  the same dense array sklearn's OneHotEncoder returns
+#   output='codes'  (n_rows, n_columns) int32 output-column indices, -1 = unknown
+# Columns listed in `hashed` ({column: n_buckets}) skip the vocabulary and are
+# mapped with a stable hash into n_buckets features - for high-cardinality
+# columns such as city in data_science_job.csv.
+#
+# FastOneHotEncoder keeps sklearn's attributes (categories_, handle_unknown,
+# sparse_output, feature_names_in_ ...), so it works inside ColumnTransformer
+# (trf2 in titanic-using-pipeline.ipynb) and in place of the ohe_*.pkl files:
+#
+#   python fast_onehot.py models/ohe_sex.pkl models/ohe_sex_fast.pkl
+
+OUTPUTS = ('csr', 'dense', 'codes')
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _sorted_categories(values):
+    # Same order as sklearn: sorted values, then missing values last
+    uniques = pd.unique(values)
+    if uniques.dtype.kind in 'biuf':
+        return np.unique(uniques)
+    present = sorted(value for value in uniques if not _is_missing(value))
+    missing = [value for value in uniques if value is None] + [np.nan] * any(
+        isinstance(value, float) and np.isnan(value) for value in uniques)
+    return np.array(present + missing, dtype=object)
+
+
+def hash_codes(values, n_buckets):
+    return (pd.util.hash_array(np.asarray(values, dtype=object)) % np.uint64(n_buckets)).astype(np.int64)
+
+
+class FastOneHotEncoder(TransformerMixin, BaseEstimator):
+    def __init__(self, categories='auto', handle_unknown='ignore', sparse_output=True, dtype=np.float64,
+                 output=None, hashed=None):
+        self.categories = categories
+        self.handle_unknown = handle_unknown
+        self.sparse_output = sparse_output
+        self.dtype = dtype
+        self.output = output
+        self.hashed = hashed
+
+    @classmethod
+    def from_sklearn(cls, encoder):
+        # Same fitted state as a sklearn OneHotEncoder (drop / min_frequency unsupported)
+        if encoder.drop is not None or getattr(encoder, 'min_frequency', None) or getattr(encoder, 'max_categories', None):
+            raise ValueError('Only OneHotEncoders without drop/min_frequency/max_categories can be converted')
+        sparse_output = getattr(encoder, 'sparse_output', getattr(encoder, 'sparse', True))
+        fast = cls(handle_unknown=encoder.handle_unknown, sparse_output=sparse_output, dtype=encoder.dtype)
+        fast.categories_ = [np.asarray(categories) for categories in encoder.categories_]
+        fast.n_features_in_ = encoder.n_features_in_
+        if hasattr(encoder, 'feature_names_in_'):
+            fast.feature_names_in_ = encoder.feature_names_in_
+        fast._hashed = {}
+        fast._build_lookups()
+        return fast
+
+    @staticmethod
+    def _columns(X):
+        if isinstance(X, pd.DataFrame):
+            return [X.iloc[:, j].to_numpy() for j in range(X.shape[1])], X.columns
+        X = np.asarray(X)
+        if X.ndim != 2:
+            raise ValueError('Expected a 2-D array, got shape {}'.format(X.shape))
+        return [X[:, j] for j in range(X.shape[1])], None
+
+    def _resolve_hashed(self, names):
+        hashed = {}
+        for column, n_buckets in (self.hashed or {}).items():
+            if isinstance(column, str):
+                if names is None or column not in list(names):
+                    raise ValueError('Hashed column {!r} not found'.format(column))
+                column = list(names).index(column)
+            hashed[column] = int(n_buckets)
+        return hashed
+
+    def _build_lookups(self):
+        self._lookups = [None if j in self._hashed else pd.Index(categories)
+                         for j, categories in enumerate(self.categories_)]
+        widths = [len(categories) for categories in self.categories_]
+        self._offsets = np.concatenate([[0], np.cumsum(widths)]).astype(np.int64)
+
+    def fit(self, X, y=None):
+        if self.handle_unknown not in ('ignore', 'error'):
+            raise ValueError("handle_unknown must be 'ignore' or 'error'")
+        columns, names = self._columns(X)
+        self.n_features_in_ = len(columns)
+        if names is not None and all(isinstance(name, str) for name in names):
+            self.feature_names_in_ = np.asarray(names, dtype=object)
+        self._hashed = self._resolve_hashed(names)
+        self.categories_ = []
+        for j, values in enumerate(columns):
+            if j in self._hashed:
+                # Hashed columns have bucket numbers instead of a vocabulary
+                self.categories_.append(np.arange(self._hashed[j]))
+            elif self.categories != 'auto':
+                self.categories_.append(np.asarray(self.categories[j]))
+            else:
+                self.categories_.append(_sorted_categories(values))
+        self._build_lookups()
+        return self
+
+    def __setstate__(self, state):
+        # Lookups are rebuilt after unpickling (pd.Index is cheap to recreate)
+        self.__dict__.update(state)
+        if 'categories_' in state and '_lookups' not in state:
+            self._build_lookups()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_lookups', None)
+        return state
+
+    def transform_codes(self, X):
+        # (n_rows, n_columns) output-column indices; -1 marks unknown categories
+        columns, _ = self._columns(X)
+        if len(columns) != self.n_features_in_:
+            raise ValueError('X has {} features, but the encoder was fitted with {}'.format(
+                len(columns), self.n_features_in_))
+        n_rows = len(columns[0]) if columns else 0
+        codes = np.empty((n_rows, len(columns)), dtype=np.int32)
+        for j, values in enumerate(columns):
+            if j in self._hashed:
+                column = hash_codes(values, self._hashed[j])
+            else:
+                column = self._lookups[j].get_indexer(values)
+                unknown = column < 0
+                if unknown.any():
+                    if self.handle_unknown == 'error':
+                        raise ValueError('Found unknown categories {} in column {} during transform'.format(
+                            pd.unique(values[unknown])[:10].tolist(), j))
+                    column = np.where(unknown, -1 - self._offsets[j], column)
+            codes[:, j] = column + self._offsets[j]
+        return codes
+
+    def transform(self, X):
+        codes = self.transform_codes(X)
+        output = self.output or ('csr' if self.sparse_output else 'dense')
+        if output not in OUTPUTS:
+            raise ValueError('output must be one of {}'.format(OUTPUTS))
+        if output == 'codes':
+            return codes
+        n_rows, width = len(codes), int(self._offsets[-1])
+        known = codes >= 0
+        if output == 'dense':
+            out = np.zeros((n_rows, width), dtype=self.dtype)
+            rows, cols = np.nonzero(known)
+            out[rows, codes[rows, cols]] = 1
+            return out
+        # Row-major order of `codes` already gives sorted column indices per row
+        indices = codes[known]
+        indptr = np.concatenate([[0], np.cumsum(known.sum(axis=1))])
+        return sp.csr_matrix((np.ones(len(indices), dtype=self.dtype), indices, indptr), shape=(n_rows, width))
+
+    def inverse_transform(self, X):
+        X = X.toarray() if sp.issparse(X) else np.asarray(X)
+        out = np.empty((len(X), self.n_features_in_), dtype=object)
+        for j, categories in enumerate(self.categories_):
+            block = X[:, self._offsets[j]:self._offsets[j + 1]]
+            picked = block.argmax(axis=1)
+            out[:, j] = np.asarray(categories, dtype=object)[picked]
+            out[block.max(axis=1) == 0, j] = None
+        return out
+
+    def get_feature_names_out(self, input_features=None):
+        if input_features is None:
+            input_features = getattr(self, 'feature_names_in_', ['x{}'.format(j) for j in range(self.n_features_in_)])
+        names = []
+        for j, (feature, categories) in enumerate(zip(input_features, self.categories_)):
+            prefix = '{}_hash'.format(feature) if j in self._hashed else '{}_'.format(feature)
+            names.extend('{}{}'.format(prefix, category) for category in categories)
+        return np.asarray(names, dtype=object)
+
+
+if __name__ == '__main__':
+    # python fast_onehot.py models/ohe_sex.pkl models/ohe_sex_fast.pkl
+    with open(sys.argv[1], 'rb') as f:
+        encoder = pickle.load(f)
+    with open(sys.argv[2], 'wb') as f:
+        pickle.dump(FastOneHotEncoder.from_sklearn(encoder), f)
+    print('Wrote {}'.format(sys.argv[2]))
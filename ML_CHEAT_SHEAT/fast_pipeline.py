@@ -0,0 +1,189 @@
+import pickle
+import sys
+from array import array
+import numpy as np
+
+
+# Folds a fitted Pipeline (ColumnTransformer / SimpleImputer / OneHotEncoder /
+# MinMaxScaler / SelectKBest / DecisionTreeClassifier) into one flat predictor.
+#
+# Every feature that reaches the tree is traced back to a single raw input
+# column, so a prediction is:
+#   raw column -> fill if missing -> (one-hot: value == category) -> x * scale + min
+# for the selected features only, followed by a walk over flat node lists.
+# The compiled predictor holds plain Python lists and does not need sklearn.
+
+
+class Feature:
+    def __init__(self, column):
+        self.column = column
+        self.fill = None        # SimpleImputer statistic for this raw column
+        self.category = None    # set when the feature is a one-hot indicator
+        self.affine = []        # [(scale, min), ...] from MinMaxScaler steps
+
+    def copy(self):
+        feature = Feature(self.column)
+        feature.fill = self.fill
+        feature.category = self.category
+        feature.affine = list(self.affine)
+        return feature
+
+
+def _resolve_columns(columns, n_features, names):
+    if isinstance(columns, slice):
+        return list(range(n_features))[columns]
+    columns = np.asarray(columns)
+    if columns.dtype == bool:
+        return list(np.flatnonzero(columns))
+    if columns.dtype.kind in 'OUS':
+        return [names.index(name) for name in columns]
+    return [int(column) for column in columns]
+
+
+def _fold_imputer(imputer, features):
+    if imputer.strategy == 'constant':
+        statistics = [imputer.fill_value] * len(features)
+    else:
+        statistics = list(imputer.statistics_)
+    if not (isinstance(imputer.missing_values, float) and np.isnan(imputer.missing_values)):
+        raise TypeError('Only missing_values=np.nan can be folded')
+    out = []
+    for feature, statistic in zip(features, statistics):
+        if feature.category is not None or feature.affine:
+            raise TypeError('SimpleImputer must come before encoding and scaling')
+        feature = feature.copy()
+        if feature.fill is None:
+            feature.fill = statistic
+        out.append(feature)
+    return out
+
+
+def _fold_onehot(encoder, features):
+    if encoder.drop is not None or getattr(encoder, '_infrequent_enabled', False):
+        raise TypeError('OneHotEncoder with drop/infrequent categories cannot be folded')
+    out = []
+    for feature, categories in zip(features, encoder.categories_):
+        for category in categories:
+            feature = feature.copy()
+            feature.category = category
+            out.append(feature)
+    return out
+
+
+def _fold_scaler(scaler, features):
+    out = []
+    for feature, scale, offset in zip(features, scaler.scale_, scaler.min_):
+        feature = feature.copy()
+        feature.affine.append((float(scale), float(offset)))
+        out.append(feature)
+    return out
+
+
+def _fold_column_transformer(ct, features):
+    names = list(getattr(ct, 'feature_names_in_', []))
+    out = []
+    for _, transformer, columns in ct.transformers_:
+        if transformer == 'drop':
+            continue
+        selected = [features[i] for i in _resolve_columns(columns, len(features), names)]
+        if not selected:
+            continue
+        if transformer == 'passthrough':
+            out.extend(selected)
+        else:
+            out.extend(_fold(transformer, selected))
+    return out
+
+
+def _fold(step, features):
+    kind = type(step).__name__
+    if kind == 'ColumnTransformer':
+        return _fold_column_transformer(step, features)
+    if kind == 'Pipeline':
+        for _, sub_step in step.steps:
+            if sub_step != 'passthrough':
+                features = _fold(sub_step, features)
+        return features
+    if kind == 'FunctionTransformer' and step.func is None:
+        # Fitted ColumnTransformers store remainder='passthrough' this way
+        return features
+    if kind == 'SimpleImputer':
+        return _fold_imputer(step, features)
+    if kind == 'OneHotEncoder':
+        return _fold_onehot(step, features)
+    if kind == 'MinMaxScaler':
+        return _fold_scaler(step, features)
+    if hasattr(step, 'get_support'):
+        return [feature for feature, keep in zip(features, step.get_support()) if keep]
+    raise TypeError('Cannot fold {} into a fast predictor'.format(kind))
+
+
+class FastPredictor:
+    def __init__(self, pipe):
+        *transforms, (_, tree_model) = pipe.steps
+        if type(tree_model).__name__ != 'DecisionTreeClassifier':
+            raise TypeError('The last pipeline step must be a DecisionTreeClassifier')
+        features = [Feature(i) for i in range(pipe.n_features_in_)]
+        for _, step in transforms:
+            if step != 'passthrough':
+                features = _fold(step, features)
+
+        self.n_features_in_ = pipe.n_features_in_
+        self.columns = [feature.column for feature in features]
+        self.fills = [feature.fill for feature in features]
+        self.categories = [feature.category for feature in features]
+        self.is_onehot = [feature.category is not None for feature in features]
+        self.affines = [feature.affine for feature in features]
+
+        tree = tree_model.tree_
+        self.left = tree.children_left.tolist()
+        self.right = tree.children_right.tolist()
+        self.feature = tree.feature.tolist()
+        self.threshold = tree.threshold.tolist()
+        self.classes_ = tree_model.classes_
+        self.leaf_class = tree_model.classes_.take(np.argmax(tree.value[:, 0, :], axis=1)).tolist()
+
+    def transform_one(self, row):
+        values = []
+        for column, fill, category, is_onehot, affine in zip(
+                self.columns, self.fills, self.categories, self.is_onehot, self.affines):
+            value = row[column]
+            # None (e.g. null in a JSON request) is missing too, not only NaN (NaN != NaN)
+            if fill is not None and (value is None or value != value):
+                value = fill
+            if is_onehot:
+                value = 1.0 if value == category else 0.0
+            else:
+                value = float(value)
+            for scale, offset in affine:
+                value = value * scale + offset
+            values.append(value)
+        # The tree compares float32 features, exactly like sklearn does
+        return array('f', values)
+
+    def predict_one(self, row):
+        x = self.transform_one(row)
+        left, right, feature, threshold = self.left, self.right, self.feature, self.threshold
+        node = 0
+        while left[node] != -1:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+        return self.leaf_class[node]
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=object).reshape(-1, self.n_features_in_)
+        return np.array([self.predict_one(row) for row in X], dtype=self.classes_.dtype)
+
+
+def export_fast_predictor(pipe, path):
+    predictor = FastPredictor(pipe)
+    with open(path, 'wb') as f:
+        pickle.dump(predictor, f)
+    return predictor
+
+
+if __name__ == '__main__':
+    # python fast_pipeline.py pipe.pkl pipe_fast.pkl
+    with open(sys.argv[1], 'rb') as f:
+        pipe = pickle.load(f)
+    export_fast_predictor(pipe, sys.argv[2])
+    print('Wrote fast predictor to {}'.format(sys.argv[2]))
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+
+# One file holding the fitted encoders, the classifier and the column layout
+# used by predict-without-pipeline_deploy.ipynb, instead of three pickles and
+# a hand-written np.concatenate per input.
+#
+# The layout lists, in output order, how each block of model features is built
+# from the raw input columns:
+#   ('passthrough', [column, ...])  -> raw values cast to float
+#   ('onehot', column, encoder_name) -> one-hot block from a fitted OneHotEncoder
+
+FORMAT_VERSION = 1
+
+# Raw input: Pclass/gender/age/SibSp/Parch/Fare/Embarked
+TITANIC_COLUMNS = ['Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked']
+TITANIC_LAYOUT = [
+    ('passthrough', [0, 3, 4, 5]),
+    ('passthrough', [2]),
+    ('onehot', 1, 'Sex'),
+    ('onehot', 6, 'Embarked'),
+]
+
+# Process-wide cache: content hash -> loaded bundle contents
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def save_bundle(path, encoders, classifier, columns, layout):
+    bundle = {
+        'format_version': FORMAT_VERSION,
+        'columns': list(columns),
+        'layout': list(layout),
+        'encoders': dict(encoders),
+        'classifier': classifier,
+    }
+    with open(path, 'wb') as f:
+        pickle.dump(bundle, f)
+
+
+class ModelBundle:
+    def __init__(self, path):
+        self.path = path
+        self._contents = None
+
+    @property
+    def contents(self):
+        # Opened on first use; identical files share one loaded copy. The file
+        # is read once: the same bytes are hashed and unpickled
+        if self._contents is None:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            key = hashlib.sha256(data).hexdigest()
+            with _CACHE_LOCK:
+                if key not in _CACHE:
+                    bundle = pickle.loads(data)
+                    if bundle.get('format_version') != FORMAT_VERSION:
+                        raise ValueError('Unsupported bundle format version: {}'.format(bundle.get('format_version')))
+                    bundle['lookups'] = {name: [pd.Index(categories) for categories in encoder.categories_]
+                                         for name, encoder in bundle['encoders'].items()}
+                    _CACHE[key] = bundle
+                self._contents = _CACHE[key]
+        return self._contents
+
+    @property
+    def classifier(self):
+        return self.contents['classifier']
+
+    @property
+    def columns(self):
+        return self.contents['columns']
+
+    def transform(self, X):
+        # Build the whole feature matrix for a batch in one preallocated array
+        contents = self.contents
+        X = np.asarray(X, dtype=object).reshape(-1, len(contents['columns']))
+        widths = [len(block[1]) if block[0] == 'passthrough'
+                  else len(contents['lookups'][block[2]][0]) for block in contents['layout']]
+        out = np.zeros((len(X), sum(widths)))
+        start = 0
+        for block, width in zip(contents['layout'], widths):
+            if block[0] == 'passthrough':
+                out[:, start:start + width] = X[:, block[1]].astype(np.float64)
+            else:
+                # Unknown categories get code -1 and stay all-zero (handle_unknown='ignore').
+                # None is unknown too, as in OneHotEncoder: only NaN matches a NaN category
+                values = X[:, block[1]]
+                codes = contents['lookups'][block[2]][0].get_indexer(values)
+                codes[np.equal(values, None)] = -1
+                rows = np.flatnonzero(codes >= 0)
+                out[rows, start + codes[rows]] = 1.0
+            start += width
+        return out
+
+    def predict(self, X):
+        return self.classifier.predict(self.transform(X))
+
+
+def load_bundle(path):
+    return ModelBundle(path)
+
+
+if __name__ == '__main__':
+    # python model_bundle.py models titanic_bundle.pkl
+    models_dir, path = sys.argv[1], sys.argv[2]
+    with open(os.path.join(models_dir, 'ohe_sex.pkl'), 'rb') as f:
+        ohe_sex = pickle.load(f)
+    with open(os.path.join(models_dir, 'ohe_embarked.pkl'), 'rb') as f:
+        ohe_embarked = pickle.load(f)
+    with open(os.path.join(models_dir, 'clf.pkl'), 'rb') as f:
+        clf = pickle.load(f)
+    save_bundle(path, {'Sex': ohe_sex, 'Embarked': ohe_embarked}, clf, TITANIC_COLUMNS, TITANIC_LAYOUT)
+    print('Wrote model bundle to {}'.format(path))
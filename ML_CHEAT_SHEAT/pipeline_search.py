@@ -0,0 +1,253 @@
+import argparse
+import json
+import math
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv
+
+
+# Grid search over a Pipeline that refits only what a candidate changes.
+#
+# GridSearchCV refits every stage for every fold x candidate, although a grid
+# like {'trf5__max_depth': [...]} in titanic-using-pipeline.ipynb only touches
+# the tree: the imputers, one-hot encoders, scaler and SelectKBest come out the
+# same each time. Here every fitted prefix of the pipeline is fingerprinted by
+#   (training rows of the fold, class + params of each step so far)
+# and its transformed train/test matrices are cached on disk, so a prefix is
+# fitted once per fold and shared by every candidate (and every later run)
+# with the same settings up to that step. Only the changed suffix is refit.
+#
+# Work is spread over a process pool: one task per (fold, transformer
+# settings), which then fits the final step for each candidate in the group.
+# halving=True runs successive halving: every round scores the survivors on a
+# larger share of the training rows and keeps the best 1/factor of them.
+#
+#   search = CachedPipelineSearch(pipe, {'trf5__max_depth': [1, 2, 3, 4, 5, None]},
+#                                 cv=5, scoring='accuracy', n_jobs=4)
+#   search.fit(X_train, y_train)
+#   search.best_params_, search.best_score_
+
+
+def _rows(X, index):
+    return X.iloc[index] if hasattr(X, 'iloc') else X[index]
+
+
+def step_fingerprint(step):
+    # Unfitted settings only; sklearn's version is part of the key too
+    if step is None or step == 'passthrough':
+        return 'passthrough'
+    return joblib.hash((type(step).__module__, type(step).__qualname__, step.get_params(deep=True)))
+
+
+class _PrefixCache:
+    # hits counts prefixes loaded from disk, misses prefixes that had to be fitted
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pkl')
+
+    def has(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temp name and renamed, so parallel workers never
+        # read a half-written file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+# Per-process state, set once by the pool initializer instead of pickling
+# the data into every task
+_state = {}
+
+
+def _init_worker(pipe, X, y, scoring, cache_dir):
+    _state.update(pipe=pipe, X=X, y=y, scorer=get_scorer(scoring), cache=_PrefixCache(cache_dir))
+
+
+def _fit_group(data_key, train, test, candidates):
+    pipe, X, y, cache = _state['pipe'], _state['X'], _state['y'], _state['cache']
+    y_train, y_test = y[train], y[test]
+    template = clone(pipe).set_params(**candidates[0])
+    hits, misses = cache.hits, cache.misses
+    key = data_key
+    levels = []
+    for name, step in template.steps[:-1]:
+        key = joblib.hash((key, name, step_fingerprint(step)))
+        if step is not None and step != 'passthrough':
+            levels.append((key, step))
+    # Only the deepest cached prefix is loaded; the levels after it are fitted
+    start = 0
+    Xt_train = Xt_test = None
+    for depth in range(len(levels), 0, -1):
+        cached = cache.get(levels[depth - 1][0]) if cache.has(levels[depth - 1][0]) else None
+        if cached is not None:
+            (Xt_train, Xt_test), start = cached, depth
+            break
+    if Xt_train is None:
+        Xt_train, Xt_test = _rows(X, train), _rows(X, test)
+    for key, step in levels[start:]:
+        cache.misses += 1
+        fitted = clone(step)
+        Xt_train = fitted.fit_transform(Xt_train, y_train)
+        Xt_test = fitted.transform(Xt_test)
+        cache.put(key, (Xt_train, Xt_test))
+
+    scores = []
+    for params in candidates:
+        final = clone(clone(pipe).set_params(**params).steps[-1][1])
+        final.fit(Xt_train, y_train)
+        scores.append(_state['scorer'](final, Xt_test, y_test))
+    return scores, cache.hits - hits, cache.misses - misses
+
+
+class CachedPipelineSearch:
+    def __init__(self, pipe, param_grid, cv=5, scoring='accuracy', n_jobs=None,
+                 cache_dir='.pipeline_cache', halving=False, factor=3, min_resources=None,
+                 random_state=0, refit=True):
+        self.pipe = pipe
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.halving = halving
+        self.factor = factor
+        self.min_resources = min_resources
+        self.random_state = random_state
+        self.refit = refit
+
+    def _group(self, candidates):
+        # Candidates with the same transformer settings share one task per fold
+        groups = {}
+        for index, params in enumerate(candidates):
+            steps = clone(self.pipe).set_params(**params).steps[:-1]
+            key = joblib.hash([(name, step_fingerprint(step)) for name, step in steps])
+            groups.setdefault(key, []).append(index)
+        return list(groups.values())
+
+    def _schedule(self, n_candidates, n_samples):
+        # Training rows used per round; the last round always uses all of them
+        if not self.halving or n_candidates == 1:
+            return [n_samples]
+        n_rounds = 1 + int(math.floor(math.log(n_candidates, self.factor)))
+        smallest = self.min_resources or max(n_samples // self.factor ** (n_rounds - 1), 1)
+        return [min(n_samples, smallest * self.factor ** r) for r in range(n_rounds - 1)] + [n_samples]
+
+    def _run_round(self, pool, X_key, folds, candidates, indices, resources):
+        groups = self._group([candidates[i] for i in indices])
+        tasks = []
+        for fold, (train, test) in enumerate(folds):
+            train = train[:resources]
+            data_key = joblib.hash((sklearn.__version__, X_key, train, test))
+            for group in groups:
+                tasks.append((fold, [indices[i] for i in group],
+                              (data_key, train, test, [candidates[indices[i]] for i in group])))
+        if pool is None:
+            results = [_fit_group(*args) for _, _, args in tasks]
+        else:
+            results = list(pool.map(_fit_group, *zip(*[args for _, _, args in tasks])))
+        scores = np.full((len(candidates), len(folds)), np.nan)
+        for (fold, members, _), (group_scores, hits, misses) in zip(tasks, results):
+            scores[members, fold] = group_scores
+            self.cache_hits_ += hits
+            self.cache_misses_ += misses
+        return scores
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        candidates = list(ParameterGrid(self.param_grid))
+        cv = check_cv(self.cv, y, classifier=True)
+        rng = np.random.RandomState(self.random_state)
+        folds = list(cv.split(X, y))
+        if self.halving:
+            # Fold training rows are shuffled once, so a halving round on r rows
+            # uses the first r of them
+            folds = [(rng.permutation(train), test) for train, test in folds]
+        X_key = joblib.hash((X, y))
+        schedule = self._schedule(len(candidates), min(len(train) for train, _ in folds))
+
+        self.cache_hits_ = self.cache_misses_ = 0
+        self.cv_results_ = {'params': candidates, 'round': [None] * len(candidates),
+                            'mean_test_score': [np.nan] * len(candidates),
+                            'std_test_score': [np.nan] * len(candidates),
+                            'split_test_scores': [None] * len(candidates)}
+        survivors = list(range(len(candidates)))
+        pool = None
+        if self.n_jobs != 1:
+            # Worker counts follow joblib's convention (-1 = all cores)
+            workers = joblib.effective_n_jobs(self.n_jobs)
+            pool = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                       initargs=(self.pipe, X, y, self.scoring, self.cache_dir))
+        else:
+            _init_worker(self.pipe, X, y, self.scoring, self.cache_dir)
+        try:
+            for round_number, resources in enumerate(schedule):
+                scores = self._run_round(pool, X_key, folds, candidates, survivors, resources)
+                for i in survivors:
+                    self.cv_results_['round'][i] = round_number
+                    self.cv_results_['mean_test_score'][i] = scores[i].mean()
+                    self.cv_results_['std_test_score'][i] = scores[i].std()
+                    self.cv_results_['split_test_scores'][i] = scores[i].tolist()
+                if round_number < len(schedule) - 1:
+                    keep = max(1, int(math.ceil(len(survivors) / self.factor)))
+                    # Stable sort: ties keep grid order, like GridSearchCV's rank
+                    order = sorted(survivors, key=lambda i: -self.cv_results_['mean_test_score'][i])
+                    survivors = sorted(order[:keep])
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        best = max(survivors, key=lambda i: (self.cv_results_['mean_test_score'][i], -i))
+        self.best_index_ = best
+        self.best_params_ = candidates[best]
+        self.best_score_ = self.cv_results_['mean_test_score'][best]
+        if self.refit:
+            self.best_estimator_ = clone(self.pipe).set_params(**self.best_params_).fit(X, y)
+        return self
+
+
+if __name__ == '__main__':
+    # python pipeline_search.py pipe.pkl Dataset/Titanic-Dataset.csv --grid '{"trf5__max_depth": [1, 2, 3, null]}'
+    parser = argparse.ArgumentParser(description='Cached grid search over a pickled Titanic pipeline')
+    parser.add_argument('pipe')
+    parser.add_argument('csv')
+    parser.add_argument('--grid', default='{"trf5__max_depth": [1, 2, 3, 4, 5, null]}')
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--cache-dir', default='.pipeline_cache')
+    parser.add_argument('--halving', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.pipe, 'rb') as f:
+        pipe = pickle.load(f)
+    df = pd.read_csv(args.csv).drop(columns=['PassengerId', 'Name', 'Ticket', 'Cabin'])
+    search = CachedPipelineSearch(pipe, json.loads(args.grid), cv=args.cv, n_jobs=args.n_jobs,
+                                  cache_dir=args.cache_dir, halving=args.halving, refit=False)
+    search.fit(df.drop(columns=['Survived']), df['Survived'])
+    print('best params {} score {:.4f} (prefix cache hits {}, misses {})'.format(
+        search.best_params_, search.best_score_, search.cache_hits_, search.cache_misses_))
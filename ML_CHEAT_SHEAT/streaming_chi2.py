@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy import special
+from sklearn.base import BaseEstimator
+from sklearn.feature_selection import SelectorMixin
+
+
+# SelectKBest(score_func=chi2) from statistics collected batch by batch.
+#
+# chi2 only needs, per class, the column sums of X over that class's rows and
+# the number of rows in the class. StreamingChi2Selector keeps exactly those
+# (an n_classes x n_features matrix), so the training matrix never has to be
+# in memory at once and is never densified: CSR batches from OneHotEncoder /
+# FastOneHotEncoder are summed with one sparse product per batch.
+#
+#   selector = StreamingChi2Selector(k=8)
+#   for X_batch, y_batch in batches:
+#       selector.partial_fit(X_batch, y_batch)
+#   X_small = selector.transform(X)
+#
+# Selectors fitted on different shards can be merged. It also works as a
+# drop-in for trf4 in titanic-using-pipeline.ipynb; scores_, pvalues_ and the
+# selected columns match SelectKBest(chi2, k) (including its tie-breaking),
+# with the top k found by np.argpartition instead of a full sort.
+
+
+def top_k_mask(scores, k):
+    # Same choice as SelectKBest: ties at the cut-off go to the later columns
+    scores = np.where(np.isnan(scores), np.finfo(np.float64).min, scores)
+    mask = np.zeros(len(scores), dtype=bool)
+    if k == 'all' or k >= len(scores):
+        mask[:] = True
+        return mask
+    if k == 0:
+        return mask
+    cut = len(scores) - k
+    threshold = scores[np.argpartition(scores, cut)[cut]]
+    mask[scores > threshold] = True
+    ties = np.flatnonzero(scores == threshold)
+    mask[ties[len(ties) - (k - mask.sum()):]] = True
+    return mask
+
+
+class StreamingChi2Selector(SelectorMixin, BaseEstimator):
+    def __init__(self, k=10, classes=None):
+        self.k = k
+        self.classes = classes
+
+    def _reset(self):
+        for name in ('classes_', 'observed_', 'class_count_', 'n_features_in_', 'feature_names_in_'):
+            self.__dict__.pop(name, None)
+
+    def _grow(self, new_classes):
+        classes = np.union1d(self.classes_, new_classes)
+        if len(classes) == len(self.classes_):
+            return
+        if self.classes is not None:
+            unknown = np.setdiff1d(new_classes, self.classes_)
+            raise ValueError('Labels not in classes: {}'.format(unknown[:10].tolist()))
+        position = np.searchsorted(classes, self.classes_)
+        observed = np.zeros((len(classes), self.n_features_in_))
+        observed[position] = self.observed_
+        class_count = np.zeros(len(classes), dtype=np.int64)
+        class_count[position] = self.class_count_
+        self.classes_, self.observed_, self.class_count_ = classes, observed, class_count
+
+    def partial_fit(self, X, y):
+        if isinstance(X, pd.DataFrame):
+            if not hasattr(self, 'feature_names_in_') and all(isinstance(name, str) for name in X.columns):
+                self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+            X = X.to_numpy()
+        X = X.tocsr() if sp.issparse(X) else np.asarray(X, dtype=np.float64)
+        y = np.asarray(y).ravel()
+        if X.shape[0] != len(y):
+            raise ValueError('X and y have different numbers of rows')
+        values = X.data if sp.issparse(X) else X
+        if values.size and values.min() < 0:
+            raise ValueError('Input X must be non-negative.')
+        if not hasattr(self, 'classes_'):
+            self.n_features_in_ = X.shape[1]
+            self.classes_ = np.sort(np.asarray(list(self.classes))) if self.classes is not None else np.unique(y)
+            self.observed_ = np.zeros((len(self.classes_), self.n_features_in_))
+            self.class_count_ = np.zeros(len(self.classes_), dtype=np.int64)
+        elif X.shape[1] != self.n_features_in_:
+            raise ValueError('X has {} features, but the selector has seen {}'.format(X.shape[1], self.n_features_in_))
+        self._grow(np.unique(y))
+        codes = np.searchsorted(self.classes_, y)
+        # Sparse class-indicator matrix: one product gives every class's column sums
+        indicator = sp.csr_matrix((np.ones(len(y)), (codes, np.arange(len(y)))), shape=(len(self.classes_), len(y)))
+        observed = indicator @ X
+        self.observed_ += observed.toarray() if sp.issparse(observed) else observed
+        self.class_count_ += np.bincount(codes, minlength=len(self.classes_))
+        return self
+
+    def fit(self, X, y, batch_size=None):
+        # batch_size bounds the working memory when X is a large dense array
+        self._reset()
+        n = X.shape[0]
+        step = batch_size or n or 1
+        for start in range(0, n, step):
+            batch = X.iloc[start:start + step] if isinstance(X, pd.DataFrame) else X[start:start + step]
+            self.partial_fit(batch, np.asarray(y)[start:start + step])
+        return self
+
+    def fit_batches(self, batches):
+        self._reset()
+        for X, y in batches:
+            self.partial_fit(X, y)
+        return self
+
+    def merge(self, other):
+        if not hasattr(self, 'classes_'):
+            self.__dict__.update({name: value.copy() if isinstance(value, np.ndarray) else value
+                                  for name, value in other.__dict__.items() if name.endswith('_')})
+            return self
+        if other.n_features_in_ != self.n_features_in_:
+            raise ValueError('Selectors were fitted on different numbers of features')
+        self._grow(other.classes_)
+        position = np.searchsorted(self.classes_, other.classes_)
+        self.observed_[position] += other.observed_
+        self.class_count_[position] += other.class_count_
+        return self
+
+    @property
+    def n_samples_seen_(self):
+        return int(self.class_count_.sum())
+
+    def _chi2(self):
+        # Same arithmetic as sklearn.feature_selection.chi2
+        observed, class_count = self.observed_, self.class_count_
+        if len(class_count) == 1:
+            # A single label is binarized as [1 - y, y] there
+            observed = np.vstack([np.zeros_like(observed), observed])
+            class_count = np.array([0, class_count[0]])
+        class_prob = class_count / class_count.sum()
+        expected = np.outer(class_prob, observed.sum(axis=0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = ((observed - expected) ** 2 / expected).sum(axis=0)
+        return scores, special.chdtrc(len(observed) - 1, scores)
+
+    @property
+    def scores_(self):
+        return self._chi2()[0]
+
+    @property
+    def pvalues_(self):
+        return self._chi2()[1]
+
+    def _get_support_mask(self):
+        if self.k != 'all' and not 0 <= self.k:
+            raise ValueError("k must be non-negative or 'all'")
+        return top_k_mask(self.scores_, self.k)
@@ -0,0 +1,82 @@
+import os
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+
+from fast_onehot import FastOneHotEncoder, hash_codes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    df = pd.read_csv(os.path.join(HERE, 'Dataset', 'Titanic-Dataset.csv'))
+    return df[['Sex', 'Embarked', 'Pclass']]
+
+
+def test_matches_sklearn(titanic):
+    train, test = titanic.iloc[:600], titanic.iloc[600:].copy()
+    test.iloc[0, 1] = 'Q?'
+    expected = OneHotEncoder(handle_unknown='ignore').fit(train)
+    fast = FastOneHotEncoder().fit(train)
+    for a, b in zip(fast.categories_, expected.categories_):
+        assert list(pd.Series(a).fillna('nan')) == list(pd.Series(b).fillna('nan'))
+    out = fast.transform(test)
+    assert sp.isspmatrix_csr(out)
+    np.testing.assert_array_equal(out.toarray(), expected.transform(test).toarray())
+    dense = FastOneHotEncoder(sparse_output=False).fit(train).transform(test)
+    np.testing.assert_array_equal(dense, expected.transform(test).toarray())
+    assert list(fast.get_feature_names_out()) == list(expected.get_feature_names_out())
+
+
+def test_codes_and_unknowns(titanic):
+    fast = FastOneHotEncoder(output='codes').fit(titanic)
+    codes = fast.transform(titanic.iloc[:5])
+    assert codes.shape == (5, 3)
+    assert (codes >= 0).all()
+    strict = FastOneHotEncoder(handle_unknown='error').fit(titanic)
+    with pytest.raises(ValueError):
+        strict.transform(pd.DataFrame({'Sex': ['other'], 'Embarked': ['S'], 'Pclass': [1]}))
+    np.testing.assert_array_equal(strict.inverse_transform(strict.transform(titanic.iloc[:3])),
+                                  titanic.iloc[:3].to_numpy(dtype=object))
+
+
+def test_hashed_columns():
+    jobs = pd.read_csv(os.path.join(HERE, 'Dataset', 'data_science_job.csv'), usecols=['city', 'gender'])
+    fast = FastOneHotEncoder(hashed={'city': 16}).fit(jobs)
+    out = fast.transform(jobs)
+    assert out.shape[1] == 16 + len(fast.categories_[1])
+    np.testing.assert_array_equal(out[:, :16].toarray().argmax(axis=1), hash_codes(jobs['city'], 16))
+    assert fast.get_feature_names_out()[0] == 'city_hash0'
+
+
+@pytest.mark.parametrize('column', ['Sex', 'Embarked'])
+def test_from_sklearn_and_pickle(titanic, column):
+    with open(os.path.join(HERE, 'models', 'ohe_%s.pkl' % column.lower()), 'rb') as f, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        encoder = pickle.load(f)
+    fast = FastOneHotEncoder.from_sklearn(encoder)
+    X = titanic[[column]].to_numpy(dtype=object, copy=True)
+    X[:3, 0] = 'unseen'
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = encoder.transform(X)
+    assert not sp.issparse(expected)
+    np.testing.assert_array_equal(fast.transform(X), expected)
+    restored = pickle.loads(pickle.dumps(fast))
+    np.testing.assert_array_equal(restored.transform_codes(X), fast.transform_codes(X))
+
+
+def test_inside_column_transformer(titanic):
+    def pipeline(encoder):
+        return ColumnTransformer([('ohe', encoder, ['Sex', 'Embarked'])], remainder='passthrough')
+    frame = titanic.fillna({'Embarked': 'S'})
+    expected = pipeline(OneHotEncoder(handle_unknown='ignore', sparse_output=False)).fit(frame)
+    fast = pipeline(FastOneHotEncoder(sparse_output=False)).fit(frame)
+    np.testing.assert_array_equal(fast.transform(frame), expected.transform(frame))
+    assert list(fast.get_feature_names_out()) == list(expected.get_feature_names_out())
@@ -0,0 +1,66 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_selection import SelectKBest, chi2
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from fast_pipeline import FastPredictor, export_fast_predictor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    # titanic-using-pipeline.ipynb
+    df = pd.read_csv(os.path.join(HERE, 'Dataset', 'Titanic-Dataset.csv'))
+    df = df.drop(columns=['PassengerId', 'Name', 'Ticket', 'Cabin'])
+    X_train, X_test, y_train, y_test = train_test_split(df.drop(columns=['Survived']), df['Survived'],
+                                                        test_size=0.2, random_state=42)
+    trf1 = ColumnTransformer([
+        ('impute_age', SimpleImputer(), [2]),
+        ('impute_embarked', SimpleImputer(strategy='most_frequent'), [6])
+    ], remainder='passthrough')
+    trf2 = ColumnTransformer([
+        ('ohe_sex_embarked', OneHotEncoder(sparse_output=False, handle_unknown='ignore'), [1, 6])
+    ], remainder='passthrough')
+    trf3 = ColumnTransformer([('scale', MinMaxScaler(), slice(0, 10))])
+    pipe = make_pipeline(trf1, trf2, trf3, SelectKBest(score_func=chi2, k=8), DecisionTreeClassifier(random_state=0))
+    pipe.fit(X_train, y_train)
+    return pipe, X_train, X_test
+
+
+def test_predictions_match_the_pipeline(titanic):
+    pipe, X_train, X_test = titanic
+    fast = FastPredictor(pipe)
+    for X in (X_train, X_test):
+        np.testing.assert_array_equal(fast.predict(X), pipe.predict(X))
+    row = X_test.iloc[0].tolist()
+    assert fast.predict_one(row) == pipe.predict(X_test.iloc[[0]])[0]
+
+
+def test_none_is_filled_like_nan(titanic):
+    pipe, _, X_test = titanic
+    fast = FastPredictor(pipe)
+    X = X_test.copy()
+    X.iloc[:50, list(X.columns).index('Embarked')] = np.nan
+    rows = X.astype(object).to_numpy()
+    rows[pd.isna(rows)] = None
+    np.testing.assert_array_equal(fast.predict(rows), pipe.predict(X))
+    filled = X_test.iloc[0].tolist()
+    filled[list(X.columns).index('Embarked')] = pipe[0].named_transformers_['impute_embarked'].statistics_[0]
+    assert fast.transform_one(rows[0]) == fast.transform_one(filled)
+
+
+def test_export_round_trip(titanic, tmp_path):
+    pipe, _, X_test = titanic
+    export_fast_predictor(pipe, str(tmp_path / 'pipe_fast.pkl'))
+    with open(tmp_path / 'pipe_fast.pkl', 'rb') as f:
+        fast = pickle.load(f)
+    np.testing.assert_array_equal(fast.predict(X_test), pipe.predict(X_test))
@@ -0,0 +1,82 @@
+import os
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_bundle
+from model_bundle import TITANIC_COLUMNS, TITANIC_LAYOUT, load_bundle, save_bundle
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load(name):
+    with open(os.path.join(HERE, 'models', name), 'rb') as f, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pickle.load(f)
+
+
+@pytest.fixture(scope='module')
+def parts():
+    return _load('ohe_sex.pkl'), _load('ohe_embarked.pkl'), _load('clf.pkl')
+
+
+@pytest.fixture
+def bundle_path(parts, tmp_path):
+    ohe_sex, ohe_embarked, clf = parts
+    path = str(tmp_path / 'titanic_bundle.pkl')
+    save_bundle(path, {'Sex': ohe_sex, 'Embarked': ohe_embarked}, clf, TITANIC_COLUMNS, TITANIC_LAYOUT)
+    return path
+
+
+def _notebook_transform(parts, test_input):
+    # The steps from predict-without-pipeline_deploy.ipynb
+    ohe_sex, ohe_embarked, _ = parts
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        test_input_sex = ohe_sex.transform(test_input[:, 1].reshape(1, 1))
+        test_input_embarked = ohe_embarked.transform(test_input[:, -1].reshape(1, 1))
+    test_input_age = test_input[:, 2].reshape(1, 1)
+    return np.concatenate((test_input[:, [0, 3, 4, 5]], test_input_age, test_input_sex, test_input_embarked),
+                          axis=1).astype(np.float64)
+
+
+def test_matches_the_notebook(parts, bundle_path):
+    frame = pd.read_csv(os.path.join(HERE, 'Dataset', 'Titanic-Dataset.csv'))
+    rows = frame[TITANIC_COLUMNS].dropna().iloc[:200].to_numpy(dtype=object)
+    expected = np.vstack([_notebook_transform(parts, row.reshape(1, 7)) for row in rows])
+    bundle = load_bundle(bundle_path)
+    np.testing.assert_array_equal(bundle.transform(rows), expected)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        np.testing.assert_array_equal(bundle.predict(rows), parts[2].predict(expected))
+    single = np.array([2, 'male', 31.0, 0, 0, 10.5, 'S'], dtype=object)
+    np.testing.assert_array_equal(bundle.transform(single), _notebook_transform(parts, single.reshape(1, 7)))
+
+
+def test_unknown_categories_are_all_zero(parts, bundle_path):
+    out = load_bundle(bundle_path).transform([[1, 'unknown', 30.0, 0, 0, 7.25, 'X']])
+    assert out.shape[1] == 5 + len(parts[0].categories_[0]) + len(parts[1].categories_[0])
+    assert not out[0, 5:].any()
+
+
+def test_none_is_unknown_like_sklearn(parts, bundle_path):
+    # NaN is a learned Embarked category, None is not
+    rows = np.array([[1, 'male', 30.0, 0, 0, 7.25, None], [1, 'male', 30.0, 0, 0, 7.25, np.nan]], dtype=object)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = parts[1].transform(rows[:, [6]])
+    np.testing.assert_array_equal(load_bundle(bundle_path).transform(rows)[:, -expected.shape[1]:], expected)
+    assert not expected[0].any() and expected[1].any()
+
+
+def test_identical_files_share_one_copy(bundle_path, tmp_path):
+    copy = str(tmp_path / 'copy.pkl')
+    with open(bundle_path, 'rb') as src, open(copy, 'wb') as dst:
+        dst.write(src.read())
+    assert load_bundle(copy).contents is load_bundle(bundle_path).contents
+    with open(copy, 'wb') as f:
+        pickle.dump({'format_version': model_bundle.FORMAT_VERSION + 1}, f)
+    with pytest.raises(ValueError):
+        load_bundle(copy).contents
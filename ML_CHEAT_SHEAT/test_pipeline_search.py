@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_selection import SelectKBest, chi2
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from pipeline_search import CachedPipelineSearch
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRID = {'trf4__k': [6, 8], 'trf5__max_depth': [1, 2, 3, 4, 5, None]}
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    # titanic-using-pipeline.ipynb
+    df = pd.read_csv(os.path.join(HERE, 'Dataset', 'Titanic-Dataset.csv'))
+    df = df.drop(columns=['PassengerId', 'Name', 'Ticket', 'Cabin'])
+    X_train, _, y_train, _ = train_test_split(df.drop(columns=['Survived']), df['Survived'],
+                                              test_size=0.2, random_state=42)
+    pipe = Pipeline([
+        ('trf1', ColumnTransformer([('impute_age', SimpleImputer(), [2]),
+                                    ('impute_embarked', SimpleImputer(strategy='most_frequent'), [6])],
+                                   remainder='passthrough')),
+        ('trf2', ColumnTransformer([('ohe_sex_embarked', OneHotEncoder(sparse_output=False, handle_unknown='ignore'),
+                                     [1, 6])], remainder='passthrough')),
+        ('trf3', ColumnTransformer([('scale', MinMaxScaler(), slice(0, 10))])),
+        ('trf4', SelectKBest(score_func=chi2, k=8)),
+        ('trf5', DecisionTreeClassifier(random_state=0)),
+    ])
+    return pipe, X_train, y_train
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_matches_grid_search_cv(titanic, tmp_path, n_jobs):
+    pipe, X, y = titanic
+    grid = GridSearchCV(pipe, GRID, cv=5, scoring='accuracy').fit(X, y)
+    search = CachedPipelineSearch(pipe, GRID, cv=5, scoring='accuracy', n_jobs=n_jobs,
+                                  cache_dir=str(tmp_path)).fit(X, y)
+    assert search.cv_results_['params'] == list(grid.cv_results_['params'])
+    np.testing.assert_allclose(search.cv_results_['mean_test_score'], grid.cv_results_['mean_test_score'])
+    np.testing.assert_allclose(search.cv_results_['std_test_score'], grid.cv_results_['std_test_score'])
+    splits = np.column_stack([grid.cv_results_['split{}_test_score'.format(k)] for k in range(5)])
+    np.testing.assert_allclose(search.cv_results_['split_test_scores'], splits)
+    assert search.best_params_ == grid.best_params_
+    assert search.best_score_ == pytest.approx(grid.best_score_)
+    np.testing.assert_array_equal(search.best_estimator_.predict(X), grid.best_estimator_.predict(X))
+
+
+def test_prefixes_are_fitted_once_per_fold(titanic, tmp_path):
+    pipe, X, y = titanic
+    first = CachedPipelineSearch(pipe, GRID, cv=5, n_jobs=1, cache_dir=str(tmp_path), refit=False).fit(X, y)
+    # trf1..trf3 once per fold, trf4 once per fold and k
+    assert first.cache_misses_ == 5 * (3 + 2)
+    # The second k of each fold loads only the trf3 prefix
+    assert first.cache_hits_ == 5
+    second = CachedPipelineSearch(pipe, GRID, cv=5, n_jobs=1, cache_dir=str(tmp_path), refit=False).fit(X, y)
+    assert second.cache_misses_ == 0
+    # One load (the trf4 prefix) per fold and k
+    assert second.cache_hits_ == 5 * 2
+    assert second.cv_results_['mean_test_score'] == first.cv_results_['mean_test_score']
+
+
+def test_halving_keeps_the_best_candidates(titanic, tmp_path):
+    pipe, X, y = titanic
+    search = CachedPipelineSearch(pipe, GRID, cv=3, n_jobs=1, cache_dir=str(tmp_path), halving=True,
+                                  refit=False).fit(X, y)
+    last_round = max(search.cv_results_['round'])
+    assert last_round >= 1
+    assert search.cv_results_['round'][search.best_index_] == last_round
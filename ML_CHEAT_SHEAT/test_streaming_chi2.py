@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_selection import SelectKBest, chi2
+from sklearn.preprocessing import OneHotEncoder
+
+from streaming_chi2 import StreamingChi2Selector, top_k_mask
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    df = pd.read_csv(os.path.join(HERE, 'Dataset', 'Titanic-Dataset.csv'))
+    X = OneHotEncoder().fit_transform(df[['Sex', 'Embarked', 'Pclass', 'SibSp', 'Parch']].fillna('S'))
+    return X.tocsr(), df['Survived'].to_numpy()
+
+
+def assert_same(selector, expected):
+    np.testing.assert_allclose(selector.scores_, expected.scores_, rtol=1e-10)
+    np.testing.assert_allclose(selector.pvalues_, expected.pvalues_, rtol=1e-8, atol=1e-300)
+    np.testing.assert_array_equal(selector.get_support(), expected.get_support())
+
+
+@pytest.mark.parametrize('k', [0, 1, 5, 8, 'all'])
+def test_matches_select_k_best(titanic, k):
+    X, y = titanic
+    expected = SelectKBest(chi2, k=k).fit(X, y)
+    assert_same(StreamingChi2Selector(k=k).fit(X, y), expected)
+    assert_same(StreamingChi2Selector(k=k).fit(X.toarray(), y, batch_size=100), expected)
+    if k != 0:
+        np.testing.assert_array_equal(StreamingChi2Selector(k=k).fit(X, y).transform(X).toarray(),
+                                      expected.transform(X).toarray())
+
+
+def test_batches_and_merge(titanic):
+    X, y = titanic
+    expected = SelectKBest(chi2, k=6).fit(X, y)
+    assert_same(StreamingChi2Selector(k=6).fit_batches((X[i:i + 64], y[i:i + 64]) for i in range(0, len(y), 64)),
+                expected)
+    # The first shard only sees one of the labels
+    order = np.argsort(y, kind='stable')
+    half = len(y) // 3
+    left = StreamingChi2Selector(k=6).fit(X[order[:half]], y[order[:half]])
+    right = StreamingChi2Selector(k=6).fit(X[order[half:]], y[order[half:]])
+    merged = StreamingChi2Selector(k=6).merge(left).merge(right)
+    assert merged.n_samples_seen_ == len(y)
+    assert_same(merged, expected)
+
+
+def test_ties_go_to_later_columns():
+    X = np.array([[1, 0, 1, 0, 1], [0, 1, 0, 1, 1], [1, 0, 1, 0, 0]] * 4)
+    y = np.array([0, 1, 0] * 4)
+    for k in range(6):
+        expected = SelectKBest(chi2, k=k).fit(X, y)
+        assert_same(StreamingChi2Selector(k=k).fit(X, y), expected)
+    scores = np.array([1.0, np.nan, 3.0, 3.0, 1.0])
+    assert top_k_mask(scores, 2).tolist() == [False, False, True, True, False]
+    assert top_k_mask(scores, 3).tolist() == [False, False, True, True, True]
+
+
+def test_single_class_and_errors():
+    X = sp.random(30, 6, density=0.4, format='csr', random_state=0)
+    y = np.ones(30)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected = SelectKBest(chi2, k=3).fit(X, y)
+    selector = StreamingChi2Selector(k=3).fit(X, y)
+    np.testing.assert_array_equal(np.isnan(selector.scores_), np.isnan(expected.scores_))
+    np.testing.assert_array_equal(selector.get_support(), expected.get_support())
+    with pytest.raises(ValueError):
+        StreamingChi2Selector(classes=[0, 1]).partial_fit(X, np.full(30, 2))
+    with pytest.raises(ValueError):
+        StreamingChi2Selector().partial_fit(-X.toarray(), y)
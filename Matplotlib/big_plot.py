@@ -0,0 +1,242 @@
+import argparse
+import numpy as np
+from matplotlib.colors import LogNorm
+
+
+# Plotting arrays that are too big to hand to matplotlib point by point.
+#
+# Arrays are opened with np.load(mmap_mode='r') and only ever read in chunks,
+# then reduced to about one value per screen pixel before anything is drawn:
+#   - line plots keep the min and max of every pixel-wide bucket (so spikes
+#     survive), or use LTTB (largest-triangle-three-buckets);
+#   - scatter plots become a 2-D histogram at the pixel resolution of the axes.
+# Zooming or panning recomputes the reduction for the visible range only.
+#
+#   import matplotlib.pyplot as plt
+#   from big_plot import open_array, plot_line, plot_density
+#   y = open_array('useing_dataset/big-array.npy')
+#   fig, ax = plt.subplots(figsize=(12, 4))
+#   plot_line(ax, y, color='red')
+#   plt.show()
+#
+#   python big_plot.py useing_dataset/big-array.npy --out big-array.png
+
+CHUNK_SIZE = 1 << 22
+
+
+def open_array(path):
+    return np.load(path, mmap_mode='r')
+
+
+def _positions(x, index):
+    return index.astype(np.float64) if x is None else np.asarray(x[index], dtype=np.float64)
+
+
+def minmax_decimate(y, n_bins, start=0, stop=None, x=None, chunk_size=CHUNK_SIZE):
+    # Indices of the min and max of each of n_bins equal-width buckets of
+    # y[start:stop], in order; at most 2 * n_bins points
+    stop = len(y) if stop is None else stop
+    n = stop - start
+    if n <= 2 * n_bins:
+        index = np.arange(start, stop)
+        return _positions(x, index), np.asarray(y[start:stop], dtype=np.float64)
+    width = -(-n // n_bins)
+    # Chunks hold whole buckets, so every bucket is reduced in one reshape
+    rows = max(1, chunk_size // width)
+    picked = []
+    for lo in range(start, stop, rows * width):
+        hi = min(stop, lo + rows * width)
+        block = np.asarray(y[lo:hi])
+        full = (hi - lo) // width
+        if full:
+            buckets = block[:full * width].reshape(full, width)
+            pair = np.sort(np.stack([buckets.argmin(axis=1), buckets.argmax(axis=1)], axis=1), axis=1)
+            picked.append((pair + (lo + np.arange(full) * width)[:, None]).ravel())
+        rest = block[full * width:]
+        if len(rest):
+            picked.append(lo + full * width + np.unique([rest.argmin(), rest.argmax()]))
+    index = np.concatenate(picked)
+    return _positions(x, index), np.asarray(y[index], dtype=np.float64)
+
+
+def lttb(y, n_out, start=0, stop=None, x=None):
+    # Largest-triangle-three-buckets: first and last point plus, per bucket,
+    # the point forming the largest triangle with the previous pick and the
+    # mean of the next bucket. Each bucket is a contiguous slice, read once.
+    stop = len(y) if stop is None else stop
+    n = stop - start
+    if n <= n_out or n_out < 3:
+        index = np.arange(start, stop)
+        return _positions(x, index), np.asarray(y[start:stop], dtype=np.float64)
+    edges = np.linspace(start + 1, stop - 1, n_out - 1).astype(np.int64)
+
+    def bucket(lo, hi):
+        index = np.arange(lo, hi)
+        return _positions(x, index), np.asarray(y[lo:hi], dtype=np.float64)
+
+    picked = [start]
+    xa, ya = _positions(x, np.array([start]))[0], float(y[start])
+    current = bucket(edges[0], edges[1])
+    for i in range(n_out - 2):
+        if i + 2 < len(edges):
+            following = bucket(edges[i + 1], edges[i + 2])
+            xn, yn = following[0].mean(), following[1].mean()
+        else:
+            following = None
+            xn, yn = _positions(x, np.array([stop - 1]))[0], float(y[stop - 1])
+        xs, ys = current
+        area = np.abs((xa - xn) * (ys - ya) - (xa - xs) * (yn - ya))
+        best = int(np.nanargmax(area)) if not np.isnan(area).all() else 0
+        picked.append(edges[i] + best)
+        xa, ya = xs[best], ys[best]
+        current = following
+    picked.append(stop - 1)
+    index = np.array(picked)
+    return _positions(x, index), np.asarray(y[index], dtype=np.float64)
+
+
+def chunked_range(a, chunk_size=CHUNK_SIZE):
+    low, high = np.inf, -np.inf
+    for lo in range(0, len(a), chunk_size):
+        block = np.asarray(a[lo:lo + chunk_size], dtype=np.float64)
+        if len(block):
+            low, high = min(low, np.nanmin(block)), max(high, np.nanmax(block))
+    return low, high
+
+
+def histogram2d(x, y, bins, bounds=None, chunk_size=CHUNK_SIZE):
+    # np.histogram2d over chunks of (memory-mapped) x and y
+    bx, by = (bins, bins) if np.isscalar(bins) else bins
+    if bounds is None:
+        bounds = (chunked_range(x, chunk_size), chunked_range(y, chunk_size))
+    (x0, x1), (y0, y1) = bounds
+    sx = bx / (x1 - x0) if x1 > x0 else 0.0
+    sy = by / (y1 - y0) if y1 > y0 else 0.0
+    counts = np.zeros(bx * by, dtype=np.int64)
+    for lo in range(0, len(x), chunk_size):
+        xs = np.asarray(x[lo:lo + chunk_size], dtype=np.float64)
+        ys = np.asarray(y[lo:lo + chunk_size], dtype=np.float64)
+        keep = (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        # The right edge belongs to the last bin, as in np.histogram2d
+        ix = np.minimum(((xs[keep] - x0) * sx).astype(np.intp), bx - 1)
+        iy = np.minimum(((ys[keep] - y0) * sy).astype(np.intp), by - 1)
+        counts += np.bincount(ix * by + iy, minlength=bx * by)
+    return counts.reshape(bx, by), np.linspace(x0, x1, bx + 1), np.linspace(y0, y1, by + 1)
+
+
+def _pixels(ax):
+    box = ax.get_window_extent()
+    return max(int(box.width), 1), max(int(box.height), 1)
+
+
+class DecimatedLine:
+    # A Line2D showing y (and optional increasing x) reduced to the axes width
+    def __init__(self, ax, y, x=None, method='minmax', **kwargs):
+        if method not in ('minmax', 'lttb'):
+            raise ValueError("method must be 'minmax' or 'lttb'")
+        self.ax = ax
+        self.y = y
+        self.x = x
+        self.method = method
+        self._view = None
+        self.line, = ax.plot(*self._reduce(0, len(y)), **kwargs)
+        ax.autoscale_view()
+        ax.callbacks.connect('xlim_changed', self._update)
+
+    def _reduce(self, start, stop):
+        width = _pixels(self.ax)[0]
+        if self.method == 'lttb':
+            return lttb(self.y, 2 * width, start, stop, self.x)
+        return minmax_decimate(self.y, width, start, stop, self.x)
+
+    def _index_range(self, low, high):
+        if self.x is None:
+            start, stop = int(np.floor(low)), int(np.ceil(high)) + 1
+        else:
+            # Binary search on the (memory-mapped) x only touches a few pages
+            start = int(np.searchsorted(self.x, low, side='left'))
+            stop = int(np.searchsorted(self.x, high, side='right'))
+        # One point of margin on each side, so the line runs off the edges
+        return max(start - 1, 0), min(stop + 1, len(self.y))
+
+    def _update(self, ax):
+        start, stop = self._index_range(*ax.get_xlim())
+        view = (start, stop, _pixels(ax)[0])
+        if view == self._view:
+            return
+        self._view = view
+        self.line.set_data(*self._reduce(start, stop))
+        ax.figure.canvas.draw_idle()
+
+
+class DensityScatter:
+    # A scatter of x against y drawn as a 2-D histogram at pixel resolution
+    def __init__(self, ax, x, y, pixel_size=1, cmap='viridis', **kwargs):
+        self.ax = ax
+        self.x = x
+        self.y = y
+        self.pixel_size = pixel_size
+        self.bounds = (chunked_range(x), chunked_range(y))
+        self._view = None
+        counts, bounds = self._histogram(self.bounds)
+        self.image = ax.imshow(counts, origin='lower', aspect='auto', cmap=cmap, norm=LogNorm(),
+                               extent=bounds[0] + bounds[1], interpolation='nearest', **kwargs)
+        ax.set_xlim(*self.bounds[0])
+        ax.set_ylim(*self.bounds[1])
+        ax.callbacks.connect('xlim_changed', self._update)
+        ax.callbacks.connect('ylim_changed', self._update)
+
+    def _histogram(self, bounds):
+        width, height = _pixels(self.ax)
+        bins = (max(width // self.pixel_size, 1), max(height // self.pixel_size, 1))
+        counts, _, _ = histogram2d(self.x, self.y, bins, bounds)
+        # Empty bins are left transparent; rows of the image are y bins
+        return np.ma.masked_equal(counts.T, 0), (tuple(bounds[0]), tuple(bounds[1]))
+
+    def _update(self, ax):
+        bounds = (tuple(sorted(ax.get_xlim())), tuple(sorted(ax.get_ylim())))
+        if bounds == self._view:
+            return
+        self._view = bounds
+        counts, bounds = self._histogram(bounds)
+        self.image.set_data(counts)
+        self.image.set_extent(bounds[0] + bounds[1])
+        if counts.count():
+            self.image.set_norm(LogNorm(vmin=1, vmax=counts.max()))
+        ax.figure.canvas.draw_idle()
+
+
+def plot_line(ax, y, x=None, method='minmax', **kwargs):
+    return DecimatedLine(ax, y, x, method, **kwargs)
+
+
+def plot_density(ax, x, y=None, **kwargs):
+    # plot_density(ax, xy) also accepts one (n, 2) array
+    if y is None:
+        x, y = x[:, 0], x[:, 1]
+    return DensityScatter(ax, x, y, **kwargs)
+
+
+if __name__ == '__main__':
+    import matplotlib
+    parser = argparse.ArgumentParser(description='Plot a large .npy array without loading it')
+    parser.add_argument('path')
+    parser.add_argument('--method', choices=['minmax', 'lttb', 'density'], default='minmax',
+                        help='density expects an (n, 2) array of x, y pairs')
+    parser.add_argument('--out', help='Write an image instead of opening a window')
+    args = parser.parse_args()
+    if args.out:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    data = open_array(args.path)
+    fig, ax = plt.subplots(figsize=(12, 5))
+    if args.method == 'density':
+        plot_density(ax, data)
+    else:
+        plot_line(ax, data.ravel() if data.ndim > 1 and 1 in data.shape else data, method=args.method)
+    ax.set_title('{} ({:,} points)'.format(args.path, data.shape[0]))
+    if args.out:
+        fig.savefig(args.out)
+    else:
+        plt.show()
@@ -0,0 +1,219 @@
+import argparse
+import os
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+
+# Per-batter and per-season running totals for the cricket datasets in
+# useing_dataset/, so charts look figures up instead of filtering and
+# grouping the raw frames every time.
+#
+#   from cricket_stats import CricketStats
+#   stats = CricketStats.from_datasets()
+#   stats.batter('V Kohli')                   # runs, balls, outs, avg, strike_rate, fours, sixes
+#   stats.batter_seasons('V Kohli')           # season -> runs
+#   stats.season_table(['RG Sharma', 'V Kohli'])   # the sharma-kohli.csv frame
+#   plt.scatter(stats.batters()['avg'], stats.batters()['strike_rate'])
+#
+# New match rows are folded in with append(); only the new rows are grouped,
+# and every total they touch is updated in place:
+#
+#   stats.append(pd.DataFrame({'batter': ['V Kohli'], 'season': [2017], 'match_id': [640],
+#                              'runs': [72], 'balls': [48], 'fours': [6], 'sixes': [3], 'dismissed': [True]}))
+#
+# batter.csv only has runs / avg / strike_rate, so balls faced and dismissals
+# are recovered as runs * 100 / strike_rate and runs / avg. For batters with
+# no runs those are undetermined; they start at 0 balls and, if avg is 0,
+# one dismissal, which reproduces the figures in the file.
+# Career fours, sixes and innings are not in any of the files, so they are
+# None for those batters (appended rows do not make them partial sums; vk.csv
+# only covers part of V Kohli's career, so his innings are unknown too).
+# Batters first seen through append() have complete counts.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, 'useing_dataset')
+
+CAREER = ['runs', 'balls', 'outs', 'fours', 'sixes', 'innings']
+MATCH_COLUMNS = ['runs', 'balls', 'fours', 'sixes', 'dismissed']
+
+
+def _average(runs, outs):
+    return runs / outs if outs else np.nan
+
+
+def _strike_rate(runs, balls):
+    return runs * 100 / balls if balls else 0.0
+
+
+class CricketStats:
+    def __init__(self):
+        self._career = {}                          # batter -> [runs, balls, outs, fours, sixes, innings]
+        self._batter_seasons = defaultdict(dict)   # batter -> {season: runs}
+        self._season_batters = defaultdict(dict)   # season -> {batter: runs}
+        self._season_totals = defaultdict(int)     # season -> runs over all batters
+        self._boundaries = {}                      # season -> [fours, sixes]
+        self._matches = defaultdict(list)          # batter -> [(match_id, runs)]
+        # Frames handed to charts are built once per version of the totals
+        self.version = 0
+        self._frames = {}
+
+    @classmethod
+    def from_datasets(cls, directory=DATA_DIR):
+        stats = cls()
+        batters = pd.read_csv(os.path.join(directory, 'batter.csv'))
+        balls = (batters['runs'] * 100 / batters['strike_rate']).fillna(0).round()
+        outs = (batters['runs'] / batters['avg']).fillna(0).round()
+        # avg 0 with no runs still means the batter was out at least once
+        outs[(batters['avg'] == 0) & (batters['runs'] == 0)] = 1
+        for name, runs, b, o in zip(batters['batter'], batters['runs'], balls, outs):
+            stats._career[name] = [int(runs), int(b), int(o), None, None, None]
+
+        seasons = pd.read_csv(os.path.join(directory, 'batsman_season_record.csv')).set_index('batsman')
+        head_to_head = pd.read_csv(os.path.join(directory, 'sharma-kohli.csv')).set_index('index')
+        for season, row in list(seasons.T.iterrows()) + list(head_to_head.iterrows()):
+            for name, runs in row.items():
+                stats._set_season_runs(name, int(season), int(runs))
+
+        boundaries = pd.read_csv(os.path.join(directory, 'fours-sixes.csv'))
+        for season, fours, sixes in zip(boundaries['season'], boundaries['Fours'], boundaries['Sixes']):
+            stats._boundaries[int(season)] = [int(fours), int(sixes)]
+
+        kohli = pd.read_csv(os.path.join(directory, 'vk.csv'))
+        stats._matches['V Kohli'] = list(zip(kohli['match_id'].tolist(), kohli['batsman_runs'].tolist()))
+        return stats
+
+    def _set_season_runs(self, name, season, runs):
+        self._season_totals[season] += runs - self._batter_seasons[name].get(season, 0)
+        self._batter_seasons[name][season] = runs
+        self._season_batters[season][name] = runs
+
+    def _changed(self):
+        self.version += 1
+        self._frames.clear()
+
+    # ---- updates
+
+    def append(self, rows):
+        # rows: one row per batter per match with batter and runs, plus any of
+        # season, match_id, balls, fours, sixes, dismissed
+        rows = pd.DataFrame(rows)
+        if not len(rows):
+            return self
+        for column in MATCH_COLUMNS:
+            if column not in rows:
+                rows[column] = 0
+        rows['dismissed'] = rows['dismissed'].astype(bool)
+        totals = rows.groupby('batter', sort=False)[MATCH_COLUMNS].sum()
+        innings = rows.groupby('batter', sort=False).size()
+        for name, runs, balls, fours, sixes, outs, count in zip(
+                totals.index, totals['runs'], totals['balls'], totals['fours'], totals['sixes'],
+                totals['dismissed'], innings.reindex(totals.index)):
+            career = self._career.setdefault(name, [0] * len(CAREER))
+            for k, value in enumerate((runs, balls, outs, fours, sixes, count)):
+                # Counts without a baseline stay unknown
+                if career[k] is not None:
+                    career[k] += int(value)
+
+        if 'season' in rows:
+            by_season = rows.groupby(['season', 'batter'], sort=False)['runs'].sum()
+            for (season, name), runs in by_season.items():
+                season = int(season)
+                self._set_season_runs(name, season, self._batter_seasons[name].get(season, 0) + int(runs))
+            boundaries = rows.groupby('season', sort=False)[['fours', 'sixes']].sum()
+            for season, fours, sixes in zip(boundaries.index, boundaries['fours'], boundaries['sixes']):
+                season_totals = self._boundaries.setdefault(int(season), [0, 0])
+                season_totals[0] += int(fours)
+                season_totals[1] += int(sixes)
+
+        if 'match_id' in rows:
+            for name, match_id, runs in zip(rows['batter'], rows['match_id'], rows['runs']):
+                self._matches[name].append((match_id, int(runs)))
+        self._changed()
+        return self
+
+    # ---- lookups
+
+    def batter(self, name):
+        runs, balls, outs, fours, sixes, innings = self._career[name]
+        return {'batter': name, 'runs': runs, 'balls': balls, 'outs': outs, 'avg': _average(runs, outs),
+                'strike_rate': _strike_rate(runs, balls), 'fours': fours, 'sixes': sixes, 'innings': innings}
+
+    def batter_seasons(self, name):
+        seasons = self._batter_seasons.get(name, {})
+        return pd.Series(dict(sorted(seasons.items())), name=name, dtype='int64')
+
+    def season(self, season):
+        # runs adds up the batters that have a record for the season
+        batters = self._season_batters.get(season, {})
+        fours, sixes = self._boundaries.get(season, (0, 0))
+        return {'season': season, 'runs': self._season_totals.get(season, 0), 'batters': len(batters),
+                'fours': fours, 'sixes': sixes}
+
+    def season_runs(self, season):
+        return dict(self._season_batters.get(season, {}))
+
+    def matches(self, name):
+        # The vk.csv frame for any batter with match rows
+        return pd.DataFrame(self._matches.get(name, []), columns=['match_id', 'batsman_runs'])
+
+    # ---- frames for charts (cached until the next append)
+
+    def _frame(self, key, build):
+        if key not in self._frames:
+            self._frames[key] = build()
+        return self._frames[key]
+
+    def batters(self):
+        # batter.csv layout: batter, runs, avg, strike_rate (plus the raw counts), most runs first
+        def build():
+            frame = pd.DataFrame.from_dict(self._career, orient='index', columns=CAREER)
+            frame.index.name = 'batter'
+            # Unknown fours / sixes / innings (None) become NaN
+            frame[CAREER[3:]] = frame[CAREER[3:]].astype(np.float64)
+            frame['avg'] = frame['runs'] / frame['outs'].where(frame['outs'] > 0)
+            frame['strike_rate'] = (frame['runs'] * 100 / frame['balls'].where(frame['balls'] > 0)).fillna(0.0)
+            frame = frame.reset_index()[['batter', 'runs', 'avg', 'strike_rate'] + CAREER[1:]]
+            return frame.sort_values('runs', ascending=False, kind='stable').reset_index(drop=True)
+        return self._frame('batters', build)
+
+    def top_batters(self, n=10, by='runs'):
+        return self.batters().nlargest(n, by)
+
+    def season_table(self, batters=None, seasons=None):
+        # Wide season x batter runs, as in sharma-kohli.csv (missing seasons are NaN)
+        def build():
+            table = pd.DataFrame(self._batter_seasons).sort_index()
+            table.index.name = 'index'
+            return table
+        table = self._frame('season_table', build)
+        if batters is not None:
+            table = table.reindex(columns=list(batters))
+        if seasons is not None:
+            table = table.reindex(list(seasons))
+        return table
+
+    def fours_sixes(self):
+        def build():
+            frame = pd.DataFrame([(season, fours, sixes) for season, (fours, sixes) in self._boundaries.items()],
+                                 columns=['season', 'Fours', 'Sixes'])
+            return frame.sort_values('Fours', ascending=False).reset_index(drop=True)
+        return self._frame('fours_sixes', build)
+
+
+if __name__ == '__main__':
+    # python cricket_stats.py ["V Kohli" ...]
+    parser = argparse.ArgumentParser(description='Batter and season totals from the cricket datasets')
+    parser.add_argument('batters', nargs='*')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    stats = CricketStats.from_datasets()
+    if not args.batters:
+        print(stats.top_batters(args.top)[['batter', 'runs', 'avg', 'strike_rate']].to_string(index=False))
+    for name in args.batters:
+        summary = stats.batter(name)
+        print('{batter}: {runs} runs, avg {avg:.2f}, strike rate {strike_rate:.2f}'.format(**summary))
+        seasons = stats.batter_seasons(name)
+        if len(seasons):
+            print(seasons.to_string())
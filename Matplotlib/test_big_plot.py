@@ -0,0 +1,76 @@
+import os
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from big_plot import histogram2d, lttb, minmax_decimate, open_array, plot_density, plot_line
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def signal():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=100_003))
+    y[12_345] += 500
+    return y
+
+
+@pytest.mark.parametrize('chunk_size', [1000, 1 << 22])
+def test_minmax_keeps_every_buckets_extremes(signal, chunk_size):
+    n_bins = 400
+    xs, ys = minmax_decimate(signal, n_bins, chunk_size=chunk_size)
+    width = -(-len(signal) // n_bins)
+    expected = []
+    for lo in range(0, len(signal), width):
+        bucket = signal[lo:lo + width]
+        expected.extend(lo + np.unique([bucket.argmin(), bucket.argmax()]))
+    np.testing.assert_array_equal(xs, expected)
+    np.testing.assert_array_equal(ys, signal[expected])
+    assert ys.max() == signal.max() and ys.min() == signal.min()
+    xs, ys = minmax_decimate(signal, 50, start=1000, stop=2001, chunk_size=chunk_size)
+    assert xs[0] >= 1000 and xs[-1] <= 2000 and ys.max() == signal[1000:2001].max()
+
+
+def test_lttb_picks_one_point_per_bucket(signal):
+    x = np.linspace(0, 1, len(signal))
+    xs, ys = lttb(signal, 500, x=x)
+    assert len(xs) == 500
+    assert xs[0] == 0 and xs[-1] == 1
+    assert np.all(np.diff(xs) > 0)
+    np.testing.assert_array_equal(ys, signal[np.searchsorted(x, xs)])
+    assert signal[12_345] in ys
+    xs, ys = lttb(signal[:10], 500)
+    np.testing.assert_array_equal(ys, signal[:10])
+
+
+@pytest.mark.parametrize('bounds', [None, ((-1, 1), (-0.5, 2))])
+def test_histogram_matches_numpy(bounds):
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(size=(2, 50_000))
+    counts, x_edges, y_edges = histogram2d(x, y, (64, 48), bounds, chunk_size=4096)
+    expected, ex, ey = np.histogram2d(x, y, (64, 48), range=bounds)
+    np.testing.assert_allclose(x_edges, ex)
+    np.testing.assert_allclose(y_edges, ey)
+    # Values on a bin edge may land either side by rounding
+    assert np.abs(counts - expected).sum() <= 2
+    assert counts.sum() == expected.sum()
+
+
+def test_plots_follow_the_view(tmp_path):
+    y = open_array(os.path.join(HERE, 'useing_dataset', 'big-array.npy'))
+    fig, (top, bottom) = plt.subplots(2, figsize=(6, 4), dpi=50)
+    line = plot_line(top, y)
+    width = top.get_window_extent().width
+    assert len(line.line.get_xdata()) <= 2 * width
+    top.set_xlim(10, 60)
+    assert line.line.get_xdata()[0] >= 9 and line.line.get_xdata()[-1] <= 61
+    points = np.random.default_rng(2).normal(size=(10_000, 2))
+    density = plot_density(bottom, points)
+    assert density.image.get_array().sum() == len(points)
+    bottom.set_xlim(0, 5)
+    assert 0 < density.image.get_array().sum() < len(points)
+    fig.savefig(str(tmp_path / 'plot.png'))
+    plt.close(fig)
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from cricket_stats import DATA_DIR, CricketStats
+
+
+@pytest.fixture
+def stats():
+    return CricketStats.from_datasets()
+
+
+def test_frames_reproduce_the_files(stats):
+    batters = pd.read_csv(os.path.join(DATA_DIR, 'batter.csv'))
+    frame = stats.batters().set_index('batter').loc[batters['batter']]
+    np.testing.assert_array_equal(frame['runs'], batters['runs'])
+    np.testing.assert_allclose(frame['avg'], batters['avg'], rtol=1e-2)
+    np.testing.assert_allclose(frame['strike_rate'], batters['strike_rate'], rtol=1e-2)
+
+    head_to_head = pd.read_csv(os.path.join(DATA_DIR, 'sharma-kohli.csv')).set_index('index')
+    table = stats.season_table(['RG Sharma', 'V Kohli'], head_to_head.index)
+    np.testing.assert_array_equal(table.to_numpy(), head_to_head.to_numpy())
+
+    boundaries = pd.read_csv(os.path.join(DATA_DIR, 'fours-sixes.csv'))
+    merged = boundaries.merge(stats.fours_sixes(), on='season', suffixes=('', '_stats'))
+    assert len(merged) == len(boundaries)
+    assert (merged['Fours'] == merged['Fours_stats']).all()
+
+    kohli = pd.read_csv(os.path.join(DATA_DIR, 'vk.csv'))
+    assert stats.matches('V Kohli').equals(kohli)
+
+
+def test_counts_without_a_baseline_are_unknown(stats):
+    kohli = stats.batter('V Kohli')
+    assert kohli['innings'] is None
+    assert kohli['fours'] is None and kohli['sixes'] is None
+    dhawan = stats.batter('S Dhawan')
+    assert dhawan['innings'] is None
+    assert np.isnan(stats.batters().set_index('batter').loc['S Dhawan', 'innings'])
+
+
+def test_append_updates_every_total(stats):
+    before = stats.batter('V Kohli')
+    season = stats.season(2017)
+    version = stats.version
+    stats.append(pd.DataFrame({'batter': ['V Kohli', 'New Batter'], 'season': [2017, 2017], 'match_id': [640, 640],
+                               'runs': [72, 15], 'balls': [48, 10], 'fours': [6, 2], 'sixes': [3, 0],
+                               'dismissed': [True, False]}))
+    assert stats.version == version + 1
+    after = stats.batter('V Kohli')
+    assert after['runs'] == before['runs'] + 72
+    assert after['outs'] == before['outs'] + 1
+    assert after['innings'] is None
+    assert after['fours'] is None
+    new = stats.batter('New Batter')
+    assert (new['runs'], new['balls'], new['fours'], new['sixes'], new['innings']) == (15, 10, 2, 0, 1)
+    assert stats.batter_seasons('V Kohli')[2017] == 308 + 72
+    assert stats.season(2017)['runs'] == season['runs'] + 72 + 15
+    assert stats.season(2017)['runs'] == sum(stats.season_runs(2017).values())
+    assert stats.matches('V Kohli').iloc[-1].tolist() == [640, 72]
+    assert stats.batters().iloc[0]['runs'] == after['runs']
@@ -0,0 +1,187 @@
+import argparse
+import multiprocessing
+import resource
+import time
+import traceback
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import train_test_split
+
+
+# Fit several candidate models on one dataset at the same time and compare them.
+#
+# The notebooks fit LogisticRegression() and DecisionTreeClassifier() one after
+# the other and compare their scores by hand. compare_models() runs every
+# estimator in its own process (at most n_jobs at once), with the train/test
+# matrices placed once in shared memory: workers map them read-only instead of
+# receiving pickled copies, so 42k x 784 MNIST costs one copy, not one per model.
+#
+#   table = compare_models([LogisticRegression(), DecisionTreeClassifier()],
+#                          X_train, y_train, X_test, y_test, n_jobs=2, timeout=600)
+#
+# The result is a DataFrame with the test score, fit and predict time and the
+# peak RSS of each model's process. A model that fails or runs past `timeout`
+# seconds is stopped and reported in the error column instead.
+
+
+class _SharedArray:
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=self.shm.buf)[...] = array
+        self.spec = (self.shm.name, array.shape, array.dtype.str)
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    # Workers share the parent's resource tracker, so attaching here does not
+    # change who cleans up: the parent unlinks the block when all models are done
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+
+def _as_matrix(X):
+    values = X.to_numpy() if isinstance(X, (pd.DataFrame, pd.Series)) else np.asarray(X)
+    if values.dtype.kind not in 'biuf':
+        raise TypeError('compare_models expects numeric features; encode them first')
+    return values
+
+
+def _run_model(conn, name, estimator, specs, scoring):
+    # The mappings stay open until the worker exits
+    blocks = []
+    try:
+        arrays = []
+        for spec in specs:
+            shm, array = _attach(spec)
+            blocks.append(shm)
+            arrays.append(array)
+        X_train, y_train, X_test, y_test = arrays
+        start = time.perf_counter()
+        estimator.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        score = get_scorer(scoring)(estimator, X_test, y_test)
+        predict_seconds = time.perf_counter() - start
+        conn.send({'model': name, 'score': score, 'fit_seconds': fit_seconds,
+                   'predict_seconds': predict_seconds,
+                   'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                   'error': None})
+    except Exception as error:
+        conn.send({'model': name, 'error': '{}: {}'.format(type(error).__name__, error),
+                   'traceback': traceback.format_exc()})
+    finally:
+        conn.close()
+
+
+def _named(estimators):
+    if isinstance(estimators, dict):
+        items = list(estimators.items())
+    else:
+        items = [item if isinstance(item, tuple) else (type(item).__name__, item) for item in estimators]
+    names = [name for name, _ in items]
+    # Repeated class names get a suffix so every row is distinguishable
+    seen = {}
+    out = []
+    for name, estimator in items:
+        seen[name] = seen.get(name, 0) + 1
+        out.append(('{}_{}'.format(name, seen[name]) if names.count(name) > 1 else name, estimator))
+    return out
+
+
+def compare_models(estimators, X_train, y_train, X_test=None, y_test=None, scoring='accuracy',
+                   n_jobs=None, timeout=None, test_size=0.2, random_state=0):
+    # With no test set, one is split off the training data as in the notebooks
+    if X_test is None:
+        X_train, X_test, y_train, y_test = train_test_split(X_train, y_train, test_size=test_size,
+                                                            random_state=random_state)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    if y_train.dtype.kind not in 'biuf':
+        # String labels go through shared memory as integer codes
+        _, codes = np.unique(np.concatenate([y_train, y_test]), return_inverse=True)
+        y_train, y_test = codes[:len(y_train)], codes[len(y_train):]
+    models = _named(estimators)
+    n_jobs = min(n_jobs or multiprocessing.cpu_count(), len(models))
+    # Workers start from a clean fork server rather than a fork of this
+    # process, so their peak RSS is the model's own and not the caller's
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['numpy', 'sklearn.base', 'sklearn.metrics'])
+    else:
+        context = multiprocessing.get_context('spawn')
+
+    shared = []
+    try:
+        for array in (_as_matrix(X_train), y_train, _as_matrix(X_test), y_test):
+            shared.append(_SharedArray(array))
+        specs = [block.spec for block in shared]
+        results = {}
+        queue = list(models)
+        running = {}
+        while queue or running:
+            while queue and len(running) < n_jobs:
+                name, estimator = queue.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_run_model,
+                                          args=(sender, name, clone(estimator), specs, scoring))
+                process.start()
+                sender.close()
+                running[receiver] = (name, process, time.monotonic())
+            now = time.monotonic()
+            wait_for = None
+            if timeout is not None:
+                wait_for = max(0.0, min(started + timeout for _, _, started in running.values()) - now)
+            for receiver in wait(list(running), timeout=wait_for):
+                name, process, _ = running.pop(receiver)
+                try:
+                    results[name] = receiver.recv()
+                except EOFError:
+                    results[name] = {'model': name, 'error': 'worker exited with code {}'.format(process.exitcode)}
+                process.join()
+            if timeout is not None:
+                now = time.monotonic()
+                for receiver, (name, process, started) in list(running.items()):
+                    if now - started >= timeout:
+                        process.terminate()
+                        process.join()
+                        del running[receiver]
+                        results[name] = {'model': name, 'error': 'timed out after {}s'.format(timeout)}
+    finally:
+        for block in shared:
+            block.release()
+
+    columns = ['model', 'score', 'fit_seconds', 'predict_seconds', 'peak_rss_mb', 'error']
+    table = pd.DataFrame([results[name] for name, _ in models]).reindex(columns=columns)
+    return table.sort_values('score', ascending=False, na_position='last').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    # python model_comparison.py dataset/iris.csv Species
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+
+    parser = argparse.ArgumentParser(description='Fit and compare classifiers in parallel')
+    parser.add_argument('csv')
+    parser.add_argument('target')
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=None)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    X = df.drop(columns=[args.target]).select_dtypes(include='number')
+    table = compare_models([LogisticRegression(max_iter=1000), DecisionTreeClassifier(),
+                            RandomForestClassifier(), KNeighborsClassifier()],
+                           X, df[args.target], n_jobs=args.n_jobs, timeout=args.timeout)
+    print(table.to_string(index=False))
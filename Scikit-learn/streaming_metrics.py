@@ -0,0 +1,196 @@
+import numpy as np
+
+
+# Classification metrics from a single confusion matrix, built incrementally.
+#
+# The notebooks call accuracy_score, confusion_matrix, precision_score,
+# recall_score, f1_score and classification_report one after another, and
+# each of them re-scans y_test / y_pred. MetricsAccumulator counts the pairs
+# once per batch - one np.bincount over true * n_labels + pred - and derives
+# every metric from the resulting matrix. Batches can be fed as they are
+# predicted, and accumulators filled by different workers can be merged, so
+# the labels never have to be held in memory together:
+#
+#   metrics = MetricsAccumulator(labels=range(10))
+#   for X_batch, y_batch in batches:
+#       metrics.update(y_batch, clf.predict(X_batch))
+#   metrics.accuracy(), metrics.f1(average='weighted')
+#   print(metrics.classification_report())
+#
+# Results match sklearn.metrics with zero_division=0.
+
+AVERAGES = (None, 'micro', 'macro', 'weighted', 'binary')
+
+
+class MetricsAccumulator:
+    def __init__(self, labels=None):
+        # With labels=None the label set is discovered from the data (and
+        # grows as new labels appear); a fixed set skips that lookup
+        self.fixed_labels = labels is not None
+        self.labels = np.sort(np.asarray(list(labels))) if labels is not None else np.array([], dtype=np.int64)
+        self.matrix = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+
+    def _grow(self, new_labels):
+        labels = np.union1d(self.labels, new_labels)
+        if len(labels) == len(self.labels):
+            return
+        position = np.searchsorted(labels, self.labels)
+        matrix = np.zeros((len(labels), len(labels)), dtype=self.matrix.dtype)
+        matrix[np.ix_(position, position)] = self.matrix
+        self.labels, self.matrix = labels, matrix
+
+    def _codes(self, y):
+        # Labels are mapped to 0..n-1 by binary search in the sorted label set
+        codes = np.searchsorted(self.labels, y)
+        codes[codes == len(self.labels)] = 0
+        if len(y) and not np.array_equal(self.labels[codes], y):
+            unknown = np.setdiff1d(y, self.labels)
+            raise ValueError('Labels not in the fixed label set: {}'.format(unknown[:10].tolist()))
+        return codes
+
+    def update(self, y_true, y_pred, sample_weight=None):
+        y_true = np.asarray(y_true).ravel()
+        y_pred = np.asarray(y_pred).ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError('y_true and y_pred have different lengths')
+        if not self.fixed_labels:
+            self._grow(np.unique(np.concatenate([np.unique(y_true), np.unique(y_pred)])))
+        n = len(self.labels)
+        if not n:
+            return self
+        pairs = self._codes(y_true) * n + self._codes(y_pred)
+        if sample_weight is None:
+            counts = np.bincount(pairs, minlength=n * n)
+        else:
+            counts = np.bincount(pairs, weights=np.asarray(sample_weight, dtype=np.float64), minlength=n * n)
+            if self.matrix.dtype != np.float64:
+                self.matrix = self.matrix.astype(np.float64)
+        self.matrix += counts.reshape(n, n).astype(self.matrix.dtype, copy=False)
+        return self
+
+    def merge(self, other):
+        labels, matrix = other.labels, other.matrix
+        if self.fixed_labels:
+            # Same rule as update(): counts for labels outside the fixed set are an error
+            known = np.isin(labels, self.labels)
+            seen = (matrix.sum(axis=0) + matrix.sum(axis=1)) != 0
+            if (seen & ~known).any():
+                raise ValueError('Labels not in the fixed label set: {}'.format(labels[seen & ~known][:10].tolist()))
+            labels, matrix = labels[known], matrix[np.ix_(known, known)]
+        else:
+            self._grow(labels)
+        position = np.searchsorted(self.labels, labels)
+        if matrix.dtype == np.float64 and self.matrix.dtype != np.float64:
+            self.matrix = self.matrix.astype(np.float64)
+        self.matrix[np.ix_(position, position)] += matrix
+        return self
+
+    # ---- metrics
+
+    def confusion_matrix(self, normalize=None):
+        # Rows are true labels, columns predictions (as in sklearn)
+        matrix = self.matrix
+        if normalize is None:
+            return matrix.copy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if normalize == 'true':
+                out = matrix / matrix.sum(axis=1, keepdims=True)
+            elif normalize == 'pred':
+                out = matrix / matrix.sum(axis=0, keepdims=True)
+            elif normalize == 'all':
+                out = matrix / matrix.sum()
+            else:
+                raise ValueError("normalize must be None, 'true', 'pred' or 'all'")
+        return np.nan_to_num(out)
+
+    @property
+    def n_samples(self):
+        return self.matrix.sum()
+
+    def support(self):
+        return self.matrix.sum(axis=1)
+
+    def accuracy(self):
+        total = self.n_samples
+        return float(np.trace(self.matrix) / total) if total else 0.0
+
+    def _counts(self):
+        tp = np.diag(self.matrix).astype(np.float64)
+        return tp, self.matrix.sum(axis=0), self.matrix.sum(axis=1)
+
+    @staticmethod
+    def _divide(numerator, denominator, zero_division):
+        out = np.full(np.shape(numerator), float(zero_division))
+        np.divide(numerator, denominator, out=out, where=denominator != 0)
+        return out
+
+    def _average(self, scores, average, pos_label):
+        if average is None:
+            return scores
+        if average == 'macro':
+            return float(scores.mean()) if len(scores) else 0.0
+        if average == 'weighted':
+            support = self.support()
+            return float(np.average(scores, weights=support)) if support.sum() else 0.0
+        if average == 'binary':
+            if len(self.labels) > 2:
+                raise ValueError("average='binary' needs at most two labels")
+            index = np.flatnonzero(self.labels == pos_label)
+            if not len(index):
+                raise ValueError('pos_label={!r} is not a known label'.format(pos_label))
+            return float(scores[index[0]])
+        raise ValueError('average must be one of {}'.format(AVERAGES))
+
+    def precision_recall_fscore(self, average=None, beta=1.0, pos_label=1, zero_division=0.0):
+        tp, predicted, true = self._counts()
+        if average == 'micro':
+            tp, predicted, true = tp.sum(), predicted.sum(), true.sum()
+        precision = self._divide(tp, predicted, zero_division)
+        recall = self._divide(tp, true, zero_division)
+        beta2 = beta * beta
+        f_score = self._divide((1 + beta2) * precision * recall, beta2 * precision + recall, zero_division)
+        if average == 'micro':
+            return float(precision), float(recall), float(f_score)
+        return tuple(self._average(scores, average, pos_label) for scores in (precision, recall, f_score))
+
+    def precision(self, average=None, **kwargs):
+        return self.precision_recall_fscore(average, **kwargs)[0]
+
+    def recall(self, average=None, **kwargs):
+        return self.precision_recall_fscore(average, **kwargs)[1]
+
+    def f1(self, average=None, **kwargs):
+        return self.precision_recall_fscore(average, **kwargs)[2]
+
+    def classification_report(self, target_names=None, digits=2, output_dict=False, zero_division=0.0):
+        # Same layout as sklearn.metrics.classification_report
+        if target_names is None:
+            target_names = ['{}'.format(label) for label in self.labels]
+        precision, recall, f_score = self.precision_recall_fscore(None, zero_division=zero_division)
+        support = self.support()
+        rows = list(zip(target_names, precision, recall, f_score, support))
+        averages = [('accuracy', None)] + [(name + ' avg', name) for name in ('macro', 'weighted')]
+
+        if output_dict:
+            report = {name: {'precision': float(p), 'recall': float(r), 'f1-score': float(f), 'support': s.item()}
+                      for name, p, r, f, s in rows}
+            report['accuracy'] = self.accuracy()
+            for heading, average in averages[1:]:
+                p, r, f = self.precision_recall_fscore(average, zero_division=zero_division)
+                report[heading] = {'precision': p, 'recall': r, 'f1-score': f, 'support': support.sum().item()}
+            return report
+
+        headers = ['precision', 'recall', 'f1-score', 'support']
+        width = max(max((len(name) for name in target_names), default=0), len('weighted avg'), digits)
+        report = ('{:>{width}s} ' + ' {:>9}' * len(headers)).format('', *headers, width=width) + '\n\n'
+        row_fmt = '{:>{width}s} ' + ' {:>9.{digits}f}' * 3 + ' {:>9}\n'
+        for row in rows:
+            report += row_fmt.format(*row, width=width, digits=digits)
+        report += '\n'
+        total = support.sum()
+        report += ('{:>{width}s} ' + ' {:>9.{digits}}' * 2 + ' {:>9.{digits}f}' + ' {:>9}\n').format(
+            'accuracy', '', '', self.accuracy(), total, width=width, digits=digits)
+        for heading, average in averages[1:]:
+            p, r, f = self.precision_recall_fscore(average, zero_division=zero_division)
+            report += row_fmt.format(heading, p, r, f, total, width=width, digits=digits)
+        return report
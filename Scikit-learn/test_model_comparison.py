@@ -0,0 +1,35 @@
+import os
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from model_comparison import compare_models
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def iris():
+    df = pd.read_csv(os.path.join(HERE, 'dataset', 'iris.csv'))
+    return df.drop(columns=['Id', 'Species']), df['Species']
+
+
+def test_scores_match_fitting_in_process(iris):
+    X, y = iris
+    models = [LogisticRegression(max_iter=1000), DecisionTreeClassifier(random_state=0)]
+    table = compare_models(models, X, y, n_jobs=2)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=0)
+    for model in models:
+        expected = model.fit(X_train, y_train).score(X_test, y_test)
+        row = table.set_index('model').loc[type(model).__name__]
+        assert row['score'] == pytest.approx(expected)
+        assert pd.isna(row['error'])
+
+
+def test_failures_are_reported(iris):
+    X, y = iris
+    table = compare_models({'bad': LogisticRegression(C=-1), 'tree': DecisionTreeClassifier()}, X, y)
+    assert list(table['model']) == ['tree', 'bad']
+    assert 'C' in table.set_index('model').loc['bad', 'error']
@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn import metrics
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from streaming_metrics import MetricsAccumulator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def iris_predictions():
+    # classification-metrics-multi-iris1.ipynb
+    df = pd.read_csv(os.path.join(HERE, 'dataset', 'iris.csv'))
+    X_train, X_test, y_train, y_test = train_test_split(df.iloc[:, 1:5], df['Species'], test_size=0.5,
+                                                        random_state=1)
+    clf = DecisionTreeClassifier(max_depth=2, random_state=0).fit(X_train, y_train)
+    return y_test.to_numpy(), clf.predict(X_test)
+
+
+def _batched(y_true, y_pred, size=7, **kwargs):
+    acc = MetricsAccumulator(**kwargs)
+    for start in range(0, len(y_true), size):
+        acc.update(y_true[start:start + size], y_pred[start:start + size])
+    return acc
+
+
+def test_matches_sklearn_metrics(iris_predictions):
+    y_true, y_pred = iris_predictions
+    acc = _batched(y_true, y_pred)
+    assert acc.accuracy() == metrics.accuracy_score(y_true, y_pred)
+    np.testing.assert_array_equal(acc.confusion_matrix(), metrics.confusion_matrix(y_true, y_pred))
+    np.testing.assert_allclose(acc.confusion_matrix('true'), metrics.confusion_matrix(y_true, y_pred, normalize='true'))
+    for average in (None, 'micro', 'macro', 'weighted'):
+        expected = metrics.precision_recall_fscore_support(y_true, y_pred, average=average, zero_division=0)[:3]
+        np.testing.assert_allclose(acc.precision_recall_fscore(average), expected)
+
+
+def test_classification_report_is_identical(iris_predictions):
+    y_true, y_pred = iris_predictions
+    acc = _batched(y_true, y_pred)
+    assert acc.classification_report() == metrics.classification_report(y_true, y_pred, zero_division=0)
+    assert acc.classification_report(digits=4) == metrics.classification_report(y_true, y_pred, digits=4,
+                                                                                 zero_division=0)
+    report = acc.classification_report(output_dict=True)
+    expected = metrics.classification_report(y_true, y_pred, output_dict=True, zero_division=0)
+    assert list(report) == list(expected)
+    assert report.pop('accuracy') == pytest.approx(expected.pop('accuracy'))
+    for name, row in expected.items():
+        assert report[name] == pytest.approx(row)
+
+
+def test_binary_labels_and_missing_predictions():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 500)
+    y_pred = np.where(rng.random(500) < 0.8, y_true, 1 - y_true)
+    acc = _batched(y_true, y_pred, labels=[0, 1])
+    assert acc.f1('binary') == pytest.approx(metrics.f1_score(y_true, y_pred))
+    assert acc.precision('binary', pos_label=0) == pytest.approx(metrics.precision_score(y_true, y_pred, pos_label=0))
+    # A label that is never predicted scores 0 precision, as with zero_division=0
+    never = MetricsAccumulator().update([0, 1, 2], [0, 1, 1])
+    np.testing.assert_allclose(never.precision(), metrics.precision_score([0, 1, 2], [0, 1, 1], average=None,
+                                                                          zero_division=0))
+
+
+def test_merged_workers_equal_one_pass(iris_predictions):
+    y_true, y_pred = iris_predictions
+    left = MetricsAccumulator().update(y_true[:30], y_pred[:30])
+    right = MetricsAccumulator().update(y_true[30:], y_pred[30:])
+    merged = left.merge(right)
+    np.testing.assert_array_equal(merged.confusion_matrix(), metrics.confusion_matrix(y_true, y_pred))
+    weights = np.linspace(0.5, 2, len(y_true))
+    weighted = MetricsAccumulator().update(y_true, y_pred, sample_weight=weights)
+    np.testing.assert_allclose(weighted.confusion_matrix(),
+                               metrics.confusion_matrix(y_true, y_pred, sample_weight=weights))
+
+
+def test_unknown_label_with_a_fixed_set():
+    with pytest.raises(ValueError):
+        MetricsAccumulator(labels=[0, 1]).update([0, 2], [0, 1])
+    fixed = MetricsAccumulator(labels=[0, 1]).update([0, 1], [1, 1])
+    with pytest.raises(ValueError):
+        fixed.merge(MetricsAccumulator().update([0, 2], [0, 1]))
+    assert fixed.labels.tolist() == [0, 1]
+    # Labels the other side knows of but never saw are fine
+    fixed.merge(MetricsAccumulator(labels=[0, 1, 2]).update([0, 1], [0, 0]))
+    np.testing.assert_array_equal(fixed.confusion_matrix(), [[1, 1], [1, 1]])
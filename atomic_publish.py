@@ -0,0 +1,72 @@
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows: concurrent writers are then only made safe by the atomic swap
+    fcntl = None
+
+
+# Versioned directories published by swapping a symlink, shared by
+# dataset_cache.py and model_image.py.
+#
+# `base` is a symlink to the current <base>.v<pid>-<ns> directory. A writer
+# fills a fresh version, then points `base` at it with one atomic rename, so
+# readers resolve either the old or the new version and never see a
+# half-written one. Writers are serialised with the <base>.lock file:
+#
+#   with publish_lock(base):
+#       version_dir = new_version_dir(base)
+#       ...write files into version_dir...
+#       publish(base, version_dir)
+
+
+def _version_pattern(base):
+    # Only the names created here: <base>.v<pid>-<ns> and <base>.v-old<ns>
+    return re.compile(re.escape(os.path.basename(base)) + r'\.v(\d+-|-old)\d+$')
+
+
+def new_version_dir(base):
+    version_dir = '{}.v{}-{}'.format(base, os.getpid(), time.time_ns())
+    os.makedirs(version_dir)
+    return version_dir
+
+
+def publish(base, version_dir):
+    # Point `base` at version_dir with one atomic rename of a new symlink
+    base = os.path.abspath(base)
+    version_dir = os.path.abspath(version_dir)
+    if os.path.isdir(base) and not os.path.islink(base):
+        # Written before it was versioned: move it aside first
+        os.rename(base, '{}.v-old{}'.format(base, time.time_ns()))
+    link = '{}.link{}'.format(base, os.getpid())
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, base)
+    # Old versions go: processes that already mapped their files keep them
+    # (the inodes stay alive), and anyone still opening one retries
+    parent = os.path.dirname(base)
+    versions = _version_pattern(base)
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        if versions.match(entry) and path != version_dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def publish_lock(base):
+    lock_path = os.path.abspath(base) + '.lock'
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
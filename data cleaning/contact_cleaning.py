@@ -0,0 +1,201 @@
+import argparse
+import os
+import re
+import numpy as np
+import pandas as pd
+
+
+# The Customer_Call_List cleanup from basics.ipynb as one vectorized pass:
+#
+#   python contact_cleaning.py "using dataset/Customer_Call_List.xlsx" assets/Customer_Call_List_Edited.xlsx
+#
+#   from contact_cleaning import clean_contacts
+#   df = clean_contacts(pd.read_excel('using dataset/Customer_Call_List.xlsx'))
+#
+# Same steps as the notebook: drop duplicate rows and Not_Useful_Column, strip
+# "123._/" from Last_Name, format phone numbers as 123-456-7890, split Address
+# into Street and City, map Yes/No flags to Y/N, blank out N/a / NaN / missing
+# values, then drop the Do_Not_Contact == 'Y' rows and the rows without a
+# phone number. Instead of row-by-row drops and per-element lambdas:
+#   - every column is factorized once and each step runs on its distinct
+#     values only, broadcast back with the codes (call lists repeat flags,
+#     cities and shared phone numbers a lot);
+#   - phone numbers go through one compiled regex (anything that is not a
+#     10-digit number becomes '');
+#   - Yes/No flags are mapped through the FLAG_VALUES table;
+#   - duplicates and dropped rows are one boolean mask.
+# Phone numbers stored as numbers in the sheet are formatted like the others
+# (the notebook's str.replace turned them into NaN, so those customers were
+# dropped).
+#
+# Large exports are read in chunks - csv with read_csv(chunksize=...), xlsx
+# through openpyxl's read-only mode - and written out chunk by chunk;
+# duplicates are found across chunks by row hash.
+
+PHONE_PATTERN = re.compile(r'^\D*(\d{3})\D*(\d{3})\D*(\d{4})\D*$')
+LAST_NAME_CHARS = '123._/'
+FLAG_VALUES = {'Yes': 'Y', 'Y': 'Y', 'No': 'N', 'N': 'N'}
+MISSING_VALUES = ['N/a', 'NaN']
+COLUMNS = ['CustomerID', 'First_Name', 'Last_Name', 'Phone_Number', 'Paying Customer', 'Do_Not_Contact',
+           'Street', 'City']
+
+
+def _blank(value):
+    return '' if value in MISSING_VALUES else value
+
+
+def _format_phone(value):
+    match = PHONE_PATTERN.match(str(value))
+    return '{}-{}-{}'.format(*match.groups()) if match else ''
+
+
+def _strip_last_name(value):
+    return _blank(str(value).strip(LAST_NAME_CHARS))
+
+
+def _map_flag(value):
+    return _blank(FLAG_VALUES.get(value, value))
+
+
+def _split_address(value):
+    # Street and City only; the Zip the notebook splits off is deleted anyway
+    parts = str(value).split(',', 2)
+    return _blank(parts[0]), _blank(parts[1] if len(parts) > 1 else '')
+
+
+# (output columns, input column, step); every step runs once per distinct value
+CLEANING_STEPS = [
+    (['First_Name'], 'First_Name', lambda value: _blank(str(value))),
+    (['Last_Name'], 'Last_Name', _strip_last_name),
+    (['Phone_Number'], 'Phone_Number', _format_phone),
+    (['Paying Customer'], 'Paying Customer', _map_flag),
+    (['Do_Not_Contact'], 'Do_Not_Contact', _map_flag),
+    (['Street', 'City'], 'Address', _split_address),
+]
+
+
+def factorize_columns(df):
+    return {name: pd.factorize(df[name]) for name in df.columns}
+
+
+def _by_value(factorized, step, n_outputs):
+    codes, uniques = factorized
+    parsed = [step(value) for value in uniques]
+    if n_outputs == 1:
+        parsed = [(value,) for value in parsed]
+    out = []
+    for k in range(n_outputs):
+        # One extra slot at the end for missing inputs (code -1), which become ''
+        column = np.array([p[k] for p in parsed] + [''], dtype=object)
+        out.append(column[codes])
+    return out
+
+
+def row_hashes(factorized):
+    # One uint64 per row, combined from the hashes of each column's distinct values
+    hashes = None
+    for codes, uniques in factorized.values():
+        table = np.append(pd.util.hash_array(np.asarray(uniques, dtype=object)), np.uint64(0))
+        column = table[codes]
+        hashes = column if hashes is None else (hashes * np.uint64(0x100000001B3)) ^ column
+    return hashes
+
+
+def _unseen(hashes, seen):
+    # Rows not seen earlier in this chunk or in `seen` (a sorted array of row hashes)
+    new = ~pd.Series(hashes).duplicated().to_numpy()
+    order = np.argsort(hashes)
+    ordered = hashes[order]
+    if len(seen):
+        # Sorted queries keep the binary searches in cache
+        position = np.minimum(np.searchsorted(seen, ordered), len(seen) - 1)
+        new[order] &= seen[position] != ordered
+    # Two sorted runs, so the stable sort is a linear merge
+    seen = np.sort(np.concatenate([seen, ordered[new[order]]]), kind='stable')
+    return new, seen
+
+
+def _clean(df, factorized, keep):
+    out = {'CustomerID': df['CustomerID'].to_numpy()}
+    for names, column, step in CLEANING_STEPS:
+        out.update(zip(names, _by_value(factorized[column], step, len(names))))
+    keep = keep & (out['Do_Not_Contact'] != 'Y') & (out['Phone_Number'] != '')
+    return pd.DataFrame({name: out[name][keep] for name in COLUMNS}, index=df.index[keep])
+
+
+def clean_contacts(df):
+    # The notebook's cleaned frame for a raw sheet (index kept, not reset)
+    factorized = factorize_columns(df)
+    return _clean(df, factorized, ~pd.Series(row_hashes(factorized)).duplicated().to_numpy())
+
+
+def read_xlsx(path, chunksize=100_000, sheet=None):
+    # openpyxl read-only mode streams rows from the file instead of loading the workbook
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows)
+        # Columns without a header and blank rows are skipped, as read_excel does
+        named = [i for i, name in enumerate(header) if name is not None]
+        header = [header[i] for i in named]
+        batch = []
+        for row in rows:
+            if any(value is not None for value in row):
+                batch.append([row[i] for i in named])
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=header, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, dtype=object)
+    finally:
+        workbook.close()
+
+
+def read_contacts(path, chunksize=100_000):
+    if path.endswith(('.xlsx', '.xlsm')):
+        return read_xlsx(path, chunksize)
+    return pd.read_csv(path, chunksize=chunksize, dtype=object, keep_default_na=False, na_values=[''])
+
+
+def iter_clean_contacts(path, chunksize=100_000):
+    seen = np.array([], dtype=np.uint64)
+    for chunk in read_contacts(path, chunksize):
+        # Duplicates are whole raw rows, Not_Useful_Column included, as in the notebook
+        factorized = factorize_columns(chunk)
+        new, seen = _unseen(row_hashes(factorized), seen)
+        yield _clean(chunk, factorized, new)
+
+
+def clean_contacts_file(path, out_path, chunksize=100_000):
+    # Rows are numbered 0..n-1 in the output, like the notebook's reset_index + to_excel
+    start = 0
+    if out_path.endswith('.xlsx'):
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append([None] + COLUMNS)
+        for df in iter_clean_contacts(path, chunksize):
+            for i, row in enumerate(df.itertuples(index=False, name=None), start):
+                worksheet.append([i] + [None if value == '' else value for value in row])
+            start += len(df)
+        workbook.save(out_path)
+        return out_path
+    with open(out_path, 'w', newline='', encoding='utf-8') as out:
+        out.write(',' + ','.join(COLUMNS) + '\n')
+        for df in iter_clean_contacts(path, chunksize):
+            df.index = pd.RangeIndex(start, start + len(df))
+            out.write(df.to_csv(header=False))
+            start += len(df)
+    return out_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean a customer call list (csv or xlsx) in chunks')
+    parser.add_argument('src', nargs='?', default=os.path.join('using dataset', 'Customer_Call_List.xlsx'))
+    parser.add_argument('dst', nargs='?', default=os.path.join('assets', 'Customer_Call_List_Edited.xlsx'))
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+    clean_contacts_file(args.src, args.dst, args.chunksize)
+    print('Wrote {}'.format(args.dst))
@@ -0,0 +1,170 @@
+import argparse
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# The cleanup from olympics_cleanup.ipynb as a streaming pipeline:
+#
+#   python olympics_pipeline.py "using dataset/bios.csv" assets/bios_cleaned.csv
+#
+# bios.csv is read in chunks (only the six columns the cleanup uses), every
+# chunk goes through CLEANING_STEPS and is appended to the output, so memory
+# is bounded by the chunk size and no full-frame copies are made. The output
+# file is byte-for-byte the one the notebook writes.
+#
+# Born / Died / Measurements repeat a lot (and dates even more once extracted),
+# so each step works on the distinct values of its input column only and
+# broadcasts the result back with the factorize codes. Parsed dates are kept
+# in a cache across chunks, parsed with the explicit format the notebook's
+# pd.to_datetime inferred.
+
+DATE_PATTERN = re.compile(r'(\d+ \w+ \d{4} | d{4})')
+LOCATION_PATTERN = re.compile(r'in ([\w\s-]+), ([\w\s-]+) \((\w+)\)')
+DATE_FORMAT = '%d %B %Y '
+
+USECOLS = ['athlete_id', 'Used name', 'Born', 'Died', 'NOC', 'Measurements']
+COLUMNS = ['athlete_id', 'name', 'born_date', 'born_city', 'born_region', 'born_country',
+           'NOC', 'height_cm', 'weight_kg', 'died_date']
+CATEGORIES = ['NOC', 'born_country']
+
+_date_cache = {}
+
+
+def _by_value(series, parse, n_outputs):
+    # Runs parse(value) -> tuple once per distinct non-null value
+    codes, uniques = pd.factorize(series)
+    parsed = [parse(value) for value in uniques]
+    out = []
+    for k in range(n_outputs):
+        # One extra slot at the end for missing inputs (code -1)
+        column = np.array([p[k] for p in parsed] + [None], dtype=object)
+        out.append(column[codes])
+    return out
+
+
+def replace_bullets(used_name):
+    # Rebuilt from the values so it gets the same string dtype as the other text columns
+    return [pd.Series(used_name.str.replace('•', ' ', regex=False).to_numpy(), index=used_name.index)]
+
+
+def _split_measurement(value):
+    # "183 cm / 76 kg", "183 cm" or "76 kg"; a single value stands in for both
+    parts = value.split('/')
+    if len(parts) > 2:
+        raise ValueError('Measurements with more than one "/": {!r}'.format(value))
+    return parts[0].strip(' cm'), parts[-1].strip(' kg')
+
+
+def split_measurements(measurements):
+    height, weight = _by_value(measurements, _split_measurement, 2)
+    # float64 even when a chunk happens to hold only whole numbers
+    return [pd.to_numeric(pd.Series(height, index=measurements.index), errors='coerce').astype('float64'),
+            pd.to_numeric(pd.Series(weight, index=measurements.index), errors='coerce').astype('float64')]
+
+
+def _to_dates(date_text):
+    # Distinct date strings are parsed once, with the notebook's inferred format
+    codes, uniques = pd.factorize(pd.Series(date_text, dtype=object))
+    new = [value for value in uniques if value not in _date_cache]
+    if new:
+        parsed = pd.to_datetime(pd.Series(new, dtype=object), format=DATE_FORMAT, errors='coerce')
+        _date_cache.update(zip(new, parsed.to_numpy(dtype='datetime64[us]')))
+    lookup = np.array([_date_cache[value] for value in uniques] + [np.datetime64('NaT')], dtype='datetime64[us]')
+    return lookup[codes]
+
+
+def _parse_born(value):
+    date = DATE_PATTERN.search(value)
+    location = LOCATION_PATTERN.search(value)
+    return ((date.group(1) if date else None),) + (location.groups() if location else (None, None, None))
+
+
+def parse_born(born):
+    # Date and birthplace come out of the same distinct values in one pass
+    date_text, city, region, country = _by_value(born, _parse_born, 4)
+    return [pd.Series(_to_dates(date_text), index=born.index)] + [
+        pd.Series(column, index=born.index) for column in (city, region, country)]
+
+
+def _parse_died(value):
+    date = DATE_PATTERN.search(value)
+    return (date.group(1) if date else None),
+
+
+def parse_died(died):
+    (date_text,) = _by_value(died, _parse_died, 1)
+    return [pd.Series(_to_dates(date_text), index=died.index)]
+
+
+# (output columns, input column, step)
+CLEANING_STEPS = [
+    (['name'], 'Used name', replace_bullets),
+    (['height_cm', 'weight_kg'], 'Measurements', split_measurements),
+    (['born_date', 'born_city', 'born_region', 'born_country'], 'Born', parse_born),
+    (['died_date'], 'Died', parse_died),
+]
+
+
+def clean_chunk(bios):
+    out = {'athlete_id': bios['athlete_id'], 'NOC': bios['NOC']}
+    for names, column, step in CLEANING_STEPS:
+        out.update(zip(names, step(bios[column])))
+    df_clean = pd.DataFrame(out, index=bios.index)[COLUMNS]
+    for name in CATEGORIES:
+        df_clean[name] = df_clean[name].astype('category')
+    return df_clean
+
+
+def read_bios(path, chunksize=50_000):
+    return pd.read_csv(path, usecols=USECOLS, chunksize=chunksize,
+                       dtype={name: object for name in USECOLS if name != 'athlete_id'})
+
+
+def clean_bios(path, chunksize=50_000):
+    # Whole cleaned frame in memory (the notebook's df_clean). Every chunk has
+    # its own categories, which concat would turn back into plain strings, so
+    # the category columns are rebuilt from the union of the chunks' categories
+    chunks = [clean_chunk(chunk) for chunk in read_bios(path, chunksize)]
+    df_clean = pd.concat(chunks, ignore_index=True)
+    for name in CATEGORIES:
+        df_clean[name] = union_categoricals([chunk[name] for chunk in chunks], sort_categories=True)
+    return df_clean
+
+
+def _clean_to_csv(chunk):
+    return clean_chunk(chunk).to_csv(index=False, header=False)
+
+
+def clean_bios_csv(path, out_path, chunksize=50_000, n_jobs=1):
+    # Chunks are cleaned in up to n_jobs processes and written in input order;
+    # at most 2 * n_jobs chunks are in flight at any time
+    with open(out_path, 'w', newline='', encoding='utf-8') as out:
+        out.write(','.join(COLUMNS) + '\n')
+        if n_jobs == 1:
+            for chunk in read_bios(path, chunksize):
+                out.write(_clean_to_csv(chunk))
+            return out_path
+        with ProcessPoolExecutor(n_jobs) as pool:
+            pending = deque()
+            for chunk in read_bios(path, chunksize):
+                pending.append(pool.submit(_clean_to_csv, chunk))
+                if len(pending) >= 2 * n_jobs:
+                    out.write(pending.popleft().result())
+            while pending:
+                out.write(pending.popleft().result())
+    return out_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the olympics bios.csv dump in chunks')
+    parser.add_argument('src', nargs='?', default='using dataset/bios.csv')
+    parser.add_argument('dst', nargs='?', default='assets/bios_cleaned.csv')
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args()
+    clean_bios_csv(args.src, args.dst, args.chunksize, args.n_jobs)
+    print('Wrote {}'.format(args.dst))
@@ -0,0 +1,65 @@
+import os
+import pandas as pd
+import pytest
+
+from contact_cleaning import COLUMNS, clean_contacts, clean_contacts_file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CALL_LIST = os.path.join(HERE, 'using dataset', 'Customer_Call_List.xlsx')
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_excel(CALL_LIST)
+
+
+def notebook_clean(df):
+    # The steps from basics.ipynb
+    df = df.drop_duplicates()
+    df = df.drop(columns=['Not_Useful_Column'])
+    df['Last_Name'] = df["Last_Name"].str.strip("123._/")
+    df["Phone_Number"] = df["Phone_Number"].str.replace('[^a-zA-Z0-9]', '', regex=True)
+    df["Phone_Number"] = df["Phone_Number"].apply(lambda x: str(x))
+    df["Phone_Number"] = df["Phone_Number"].apply(lambda x: x[0:3] + '-' + x[3:6] + '-' + x[6:10])
+    df["Phone_Number"] = df["Phone_Number"].str.replace('nan--', '')
+    df["Phone_Number"] = df["Phone_Number"].str.replace('Na--', '')
+    df[["Street", "City", "Zip"]] = df["Address"].str.split(',', expand=True)
+    del df["Address"]
+    for column in ["Paying Customer", "Do_Not_Contact"]:
+        df[column] = df[column].str.replace('Yes', 'Y')
+        df[column] = df[column].str.replace('No', 'N')
+    df = df.replace('N/a', '')
+    df = df.replace('NaN', '')
+    df = df.fillna('')
+    df = df[df["Do_Not_Contact"] != 'Y']
+    df = df[df["Phone_Number"] != '']
+    del df["Zip"]
+    return df
+
+
+def _same(frame, expected):
+    assert list(frame.columns) == COLUMNS
+    assert list(frame.index) == list(expected.index)
+    for column in COLUMNS:
+        assert frame[column].astype(str).tolist() == expected[column].astype(str).tolist(), column
+
+
+def test_matches_the_notebook(raw):
+    # Numbers stored as numbers are the one intended difference: the notebook drops them
+    text_phones = raw.assign(Phone_Number=raw['Phone_Number'].map(lambda x: x if pd.isna(x) else str(x)))
+    _same(clean_contacts(raw), notebook_clean(text_phones))
+    dropped = set(clean_contacts(raw)['CustomerID']) - set(notebook_clean(raw)['CustomerID'])
+    assert sorted(raw.loc[raw['CustomerID'].isin(dropped), 'Phone_Number'].map(type).unique(), key=str) == [int]
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_chunked_files_match_one_pass(raw, tmp_path, suffix):
+    src = str(tmp_path / 'calls.csv')
+    # Repeat the sheet so duplicates also span chunks
+    pd.concat([raw, raw]).to_csv(src, index=False)
+    for source in [src, CALL_LIST]:
+        out = clean_contacts_file(source, str(tmp_path / ('out' + suffix)), chunksize=4)
+        frame = (pd.read_csv(out, index_col=0, dtype=str, keep_default_na=False) if suffix == '.csv'
+                 else pd.read_excel(out, index_col=0, dtype=str).fillna(''))
+        frame.index = frame.index.astype(int)
+        _same(frame, clean_contacts(raw).reset_index(drop=True))
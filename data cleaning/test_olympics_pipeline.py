@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+import olympics_pipeline
+from olympics_pipeline import CATEGORIES, COLUMNS, clean_bios, clean_bios_csv
+
+# Rows in the shape of bios.csv, with the cases the cleanup handles
+BIOS = pd.DataFrame({
+    'athlete_id': range(1, 9),
+    'name': ['Jean Dupont', 'Anna Schmidt', 'Li Wei', 'Sam Jones', 'Mary Smith', 'Ole Berg', 'Ana Ruiz', 'Ivan Petrov'],
+    'Used name': ['Jean•Dupont', 'Anna•Schmidt', 'Li•Wei', 'Sam•Jones', 'Mary•Smith', 'Ole•Berg', 'Ana•Ruiz',
+                  'Ivan•Petrov'],
+    'Born': ['12 March 1990 in Paris, Île-de-France (FRA)', '4 April 1979 in Mainz, Rheinland-Pfalz (GER)',
+             '1 January 2000 in Beijing, Beijing (CHN)', '1912 in London, England (GBR)', None,
+             '12 March 1990 in Bergen, Vestland (NOR)', 'in Madrid, Madrid (ESP)', '30 June 1950'],
+    'Died': [None, '22 May 2010 in Mainz, Rheinland-Pfalz (GER)', None, '3 February 1980 in Leeds, England (GBR)',
+             None, '22 May 2010', None, None],
+    'NOC': ['France', 'Germany', 'China', 'Great Britain', 'United States', 'Norway', 'Spain', 'Soviet Union'],
+    'Measurements': ['183 cm / 76 kg', '170 cm', '65 kg', None, '160 cm / 55 kg', '183 cm / 76 kg', '-',
+                     '190 cm / 90 kg'],
+    'Affiliations': ['Club A', None, None, 'Club B', None, None, 'Club C', None],
+})
+
+
+def notebook_clean(bios):
+    # The steps from olympics_cleanup.ipynb
+    df = bios.copy()
+    df['name'] = df['Used name'].str.replace("•", " ")
+    df[['height_cm', 'weight_kg']] = df['Measurements'].str.split("/", expand=True)
+    df['weight_kg'] = df['weight_kg'].fillna(df['height_cm'])
+    df['height_cm'] = pd.to_numeric(df['height_cm'].str.strip(' cm'), errors='coerce')
+    df['weight_kg'] = pd.to_numeric(df['weight_kg'].str.strip(' kg'), errors='coerce')
+    df['born_date'] = df['Born'].str.extract(r'(\d+ \w+ \d{4} | d{4})')
+    df['born_date'] = pd.to_datetime(df['born_date'], errors='coerce')
+    df['died_date'] = df['Died'].str.extract(r'(\d+ \w+ \d{4} | d{4})')
+    df['died_date'] = pd.to_datetime(df['died_date'], errors='coerce')
+    location_pattern = r'in ([\w\s-]+), ([\w\s-]+) \((\w+)\)'
+    df[['born_city', 'born_region', 'born_country']] = df['Born'].str.extract(location_pattern, expand=True)
+    return df[COLUMNS]
+
+
+@pytest.fixture
+def bios_path(tmp_path):
+    path = str(tmp_path / 'bios.csv')
+    BIOS.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('chunksize', [3, 100])
+def test_matches_the_notebook(bios_path, chunksize):
+    olympics_pipeline._date_cache.clear()
+    expected = notebook_clean(pd.read_csv(bios_path))
+    frame = clean_bios(bios_path, chunksize)
+    assert list(frame.columns) == COLUMNS
+    for name in CATEGORIES:
+        assert isinstance(frame[name].dtype, pd.CategoricalDtype), name
+        assert list(frame[name].cat.categories) == sorted(expected[name].dropna().unique())
+        expected[name] = expected[name].astype(frame[name].dtype)
+    pd.testing.assert_frame_equal(frame, expected)
+    assert frame['born_date'].notna().sum() == 4
+    assert frame['weight_kg'].notna().sum() == 5
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_csv_is_the_notebooks_file(bios_path, tmp_path, n_jobs):
+    expected = notebook_clean(pd.read_csv(bios_path)).to_csv(index=False)
+    out = clean_bios_csv(bios_path, str(tmp_path / 'bios_cleaned.csv'), chunksize=3, n_jobs=n_jobs)
+    with open(out, newline='', encoding='utf-8') as f:
+        assert f.read() == expected
@@ -0,0 +1,293 @@
+import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from atomic_publish import new_version_dir, publish, publish_lock
+
+
+# Columnar binary cache for the CSV datasets used across the notebooks.
+#
+# The first load of a CSV parses it with pd.read_csv as usual and writes the
+# raw bytes of every column, one after another, to a single columns.bin next to
+# a schema.json (dtype and offset of each column, row count and the source
+# file's size / mtime / sha256). Later loads map columns.bin once instead of
+# parsing text, so numeric columns come back as zero-copy views and only the
+# requested columns are touched:
+#
+#   from dataset_cache import load_csv, load_dataset
+#   df = load_dataset('titanic', columns=['Survived', 'Pclass', 'Age'])
+#   df = load_csv('Scikit-learn/dataset/heart.csv')
+#   arrays = load_arrays('ML_CHEAT_SHEAT/Dataset/train1.csv', ['SalePrice'])
+#
+# Text columns are stored dictionary-encoded: int codes in columns.bin and the
+# distinct values in schema.json. They are returned with the dtype
+# pd.read_csv gave them, built by one take() over the distinct values, or as
+# categoricals over the mapped codes with strings='category' (zero-copy).
+#
+# The cache lives in <file>.cols/<read_csv options hash>, a symlink to the
+# current <hash>.v<pid>-<ns> directory, and is rebuilt when the source changes:
+# a size/mtime mismatch is confirmed with the sha256 first, so touching a file
+# without changing it does not trigger a rebuild. Rebuilds are serialised with
+# <hash>.lock and published by swapping the symlink (atomic_publish.py), so
+# readers always see one complete version.
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_VERSION = 2
+DATA_FILE = 'columns.bin'
+ALIGNMENT = 64
+
+DATASETS = {
+    'titanic': 'ML_CHEAT_SHEAT/Dataset/Titanic-Dataset.csv',
+    'titanic_toy': 'ML_CHEAT_SHEAT/Dataset/titanic_toy.csv',
+    'data_science_job': 'ML_CHEAT_SHEAT/Dataset/data_science_job.csv',
+    'train1': 'ML_CHEAT_SHEAT/Dataset/train1.csv',
+    '50_startups': 'ML_CHEAT_SHEAT/Dataset/50_Startups.csv',
+    'housing': 'data cleaning/using dataset/housing.csv',
+    'ecommerce': 'data cleaning/using dataset/ecommerce_data.csv',
+    'heart': 'Scikit-learn/dataset/heart.csv',
+    'iris': 'Scikit-learn/dataset/iris.csv',
+}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_info(path, sha256=None):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256 or file_sha256(path)}
+
+
+def _cache_dir(path, read_csv_kwargs):
+    options = json.dumps(read_csv_kwargs, sort_keys=True, default=repr)
+    key = hashlib.sha256(options.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(path + '.cols', key)
+
+
+def _codes_dtype(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _encode_column(series):
+    # (schema entry, array whose bytes go to columns.bin)
+    dtype = series.dtype
+    entry = {'name': series.name, 'dtype': str(dtype)}
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object or pd.api.types.is_string_dtype(dtype):
+        codes, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+        values = list(uniques)
+        if not all(isinstance(value, str) for value in values):
+            raise TypeError('Column {!r} mixes strings and other objects'.format(series.name))
+        entry['kind'] = 'text'
+        entry['values'] = values
+        array = codes.astype(_codes_dtype(len(values)))
+    else:
+        entry['kind'] = 'array'
+        array = series.to_numpy()
+        if array.dtype.hasobject:
+            raise TypeError('Column {!r} has dtype {} and cannot be stored'.format(series.name, dtype))
+    entry['array_dtype'] = array.dtype.str
+    return entry, np.ascontiguousarray(array)
+
+
+def _write_columns(directory, frame):
+    columns = []
+    offset = 0
+    with open(os.path.join(directory, DATA_FILE), 'wb') as f:
+        for name in frame.columns:
+            entry, array = _encode_column(frame[name])
+            # Aligned starts, so every column is a valid view of the mapped file
+            padding = -offset % ALIGNMENT
+            f.write(b'\0' * padding)
+            offset += padding
+            entry['offset'] = offset
+            f.write(array.tobytes())
+            offset += array.nbytes
+            columns.append(entry)
+    return columns
+
+
+def _write_schema(directory, schema):
+    # Written aside and renamed, so a reader never sees a half-written file
+    tmp = os.path.join(directory, 'schema.json.{}'.format(os.getpid()))
+    with open(tmp, 'w') as f:
+        json.dump(schema, f, indent=1)
+    os.replace(tmp, os.path.join(directory, 'schema.json'))
+
+
+def _build(path, directory, read_csv_kwargs, source):
+    # Returns the schema and the version directory it was written to
+    frame = pd.read_csv(path, **read_csv_kwargs)
+    index_names = None
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0 or frame.index.step != 1:
+        index_names = [name if name is not None else '__index_{}__'.format(k)
+                       for k, name in enumerate(frame.index.names)]
+        frame.index.names = index_names
+        frame = frame.reset_index()
+    version_dir = new_version_dir(directory)
+    try:
+        schema = {
+            'schema_version': SCHEMA_VERSION,
+            'pandas': pd.__version__,
+            'read_csv_kwargs': json.loads(json.dumps(read_csv_kwargs, default=repr)),
+            'source': source,
+            'n_rows': len(frame),
+            'index': index_names,
+            'columns': _write_columns(version_dir, frame),
+        }
+        _write_schema(version_dir, schema)
+        publish(directory, version_dir)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    return schema, version_dir
+
+
+def _read_schema(directory):
+    try:
+        with open(os.path.join(directory, 'schema.json')) as f:
+            schema = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if schema.get('schema_version') != SCHEMA_VERSION or schema.get('pandas') != pd.__version__:
+        return None
+    return schema
+
+
+def _current(path, directory, validate):
+    # (schema, version directory) of an up-to-date cache, or (None, None)
+    version_dir = os.path.realpath(directory)
+    schema = _read_schema(version_dir)
+    if schema is not None:
+        cached = schema['source']
+        stat = os.stat(path)
+        unchanged = stat.st_size == cached['size'] and stat.st_mtime_ns == cached['mtime_ns']
+        if validate == 'hash' or (not unchanged and stat.st_size == cached['size']):
+            sha256 = file_sha256(path)
+            if sha256 == cached['sha256']:
+                if not unchanged:
+                    # Same bytes, new mtime: remember it instead of rebuilding
+                    schema['source'] = _source_info(path, sha256)
+                    _write_schema(version_dir, schema)
+                return schema, version_dir
+        elif unchanged:
+            return schema, version_dir
+    return None, None
+
+
+def _open(path, validate, read_csv_kwargs):
+    if validate not in ('mtime', 'hash'):
+        raise ValueError("validate must be 'mtime' or 'hash'")
+    path = os.path.abspath(path)
+    directory = _cache_dir(path, read_csv_kwargs)
+    schema, version_dir = _current(path, directory, validate)
+    if schema is None:
+        with publish_lock(directory):
+            # Another process may have rebuilt it while we waited for the lock
+            schema, version_dir = _current(path, directory, validate)
+            if schema is None:
+                schema, version_dir = _build(path, directory, read_csv_kwargs, _source_info(path))
+    return schema, version_dir
+
+
+def cached_schema(path, validate='mtime', **read_csv_kwargs):
+    # Returns the schema of an up-to-date cache for `path`, building it if needed
+    return _open(path, validate, read_csv_kwargs)[0]
+
+
+def _read_data(version_dir, mmap):
+    data_path = os.path.join(version_dir, DATA_FILE)
+    if not mmap:
+        return np.fromfile(data_path, dtype=np.uint8)
+    if os.path.getsize(data_path) == 0:
+        # mmap cannot map an empty file
+        return np.empty(0, dtype=np.uint8)
+    # Plain ndarray view of the map, so results of arithmetic are not memmaps
+    return np.memmap(data_path, mode='r').view(np.ndarray)
+
+
+def _load(path, validate, read_csv_kwargs, mmap, retries=5):
+    # (schema, contents of columns.bin) for one consistent version of the cache
+    for attempt in range(retries):
+        schema, version_dir = _open(path, validate, read_csv_kwargs)
+        try:
+            return schema, _read_data(version_dir, mmap)
+        except OSError as error:
+            # The version we resolved was replaced and removed while we opened it
+            if error.errno != errno.ENOENT or attempt == retries - 1:
+                raise
+            time.sleep(0.01 * (attempt + 1))
+
+
+def _select(schema, columns):
+    entries = {entry['name']: entry for entry in schema['columns']}
+    if columns is None:
+        return schema['columns']
+    missing = [name for name in columns if name not in entries]
+    if missing:
+        raise KeyError('Columns not in the dataset: {}'.format(missing))
+    return [entries[name] for name in columns]
+
+
+def _load_column(data, n_rows, entry, strings):
+    dtype = np.dtype(entry['array_dtype'])
+    array = data[entry['offset']:entry['offset'] + n_rows * dtype.itemsize].view(dtype)
+    if entry['kind'] == 'array':
+        return array
+    if strings == 'category':
+        categories = pd.Index(np.array(entry['values'], dtype=object))
+        return pd.Categorical.from_codes(array, categories=categories, validate=False)
+    # Missing values have code -1, which picks the trailing NaN
+    values = np.array(entry['values'] + [np.nan], dtype=object)
+    if strings == 'object' or entry['dtype'] == 'object':
+        return values[array]
+    return pd.array(values, dtype=entry['dtype']).take(array)
+
+
+def load_arrays(path, columns=None, mmap=True, validate='mtime', **read_csv_kwargs):
+    # {column: array}; numeric columns are read-only memory maps, text columns object arrays
+    schema, data = _load(path, validate, read_csv_kwargs, mmap)
+    return {entry['name']: _load_column(data, schema['n_rows'], entry, 'object')
+            for entry in _select(schema, columns)}
+
+
+def load_csv(path, columns=None, mmap=True, strings='default', validate='mtime', **read_csv_kwargs):
+    # Same frame as pd.read_csv(path, **read_csv_kwargs)[columns]
+    if strings not in ('default', 'category'):
+        raise ValueError("strings must be 'default' or 'category'")
+    schema, data = _load(path, validate, read_csv_kwargs, mmap)
+    index_names = schema['index'] or []
+    wanted = None if columns is None else [name for name in index_names if name not in columns] + list(columns)
+    arrays = {entry['name']: _load_column(data, schema['n_rows'], entry, strings) for entry in _select(schema, wanted)}
+    # copy=False keeps one block per column, so the memory maps are not consolidated into a copy
+    frame = pd.DataFrame(arrays, copy=False)
+    if index_names:
+        frame = frame.set_index(index_names)
+        frame.index.names = [None if name.startswith('__index_') else name for name in index_names]
+    return frame
+
+
+def load_dataset(name, columns=None, **kwargs):
+    return load_csv(os.path.join(REPO_ROOT, DATASETS[name]), columns, **kwargs)
+
+
+if __name__ == '__main__':
+    # python dataset_cache.py [name ...]    (default: every dataset in DATASETS)
+    parser = argparse.ArgumentParser(description='Build the columnar cache for the repo datasets')
+    parser.add_argument('names', nargs='*', help='Any of: ' + ', '.join(sorted(DATASETS)))
+    parser.add_argument('--validate', choices=['mtime', 'hash'], default='mtime')
+    args = parser.parse_args()
+    for name in args.names or sorted(DATASETS):
+        schema = cached_schema(os.path.join(REPO_ROOT, DATASETS[name]), args.validate)
+        print('{:<18} {:>7} rows  {:>3} columns'.format(name, schema['n_rows'], len(schema['columns'])))
@@ -1,6 +1,17 @@
+from typing import List
 from pydantic import BaseModel
 class BankNote(BaseModel):
     variance: float
     skewness: float
     curtosis: float
-    entropy: float
\ No newline at end of file
+    entropy: float
+
+# Feature order used by the model
+FEATURES = ['variance', 'skewness', 'curtosis', 'entropy']
+
+# Columnar batch payload: one array per feature, all the same length
+class BankNoteColumns(BaseModel):
+    variance: List[float]
+    skewness: List[float]
+    curtosis: List[float]
+    entropy: List[float]
\ No newline at end of file
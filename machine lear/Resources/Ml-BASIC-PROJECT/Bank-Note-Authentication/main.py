@@ -1,34 +1,220 @@
-from fastapi import FastAPI  # all lowercase for 'fastapi'
-import uvicorn
-from BankNotes import BankNote # Importing the BankNote model
+from fastapi import FastAPI, HTTPException, Request  # all lowercase for 'fastapi'
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+from BankNotes import BankNote, BankNoteColumns, FEATURES # Importing the BankNote models
+from microbatch import MicroBatcher
+from stream_scoring import DuplexStreamingResponse, score_stream
+from metrics import MetricsMiddleware, ServiceMetrics, current_timer, profiled
+from typing import List, Union
 import numpy as np
-import pandas as pd
 import pickle
+import os
+import sys
+import time
+
+# Shared serving helpers (model_image.py, prediction_cache.py, model_reload.py) live one level up in Ml-BASIC-PROJECT
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_image
+from prediction_cache import PredictionCache
+from model_reload import ModelHandle, ModelNotReady
+
+
+# MODEL_IMAGE=model_image serves from a memory-mapped copy of model.pkl that all
+# workers share through the page cache, instead of one unpickled copy per worker.
+# An up-to-date image opens without importing sklearn at all, and with
+# MODEL_PREWARM=1 its pages are read in before the model is reported ready
+MODEL_IMAGE = os.environ.get('MODEL_IMAGE')
+MODEL_PREWARM = os.environ.get('MODEL_PREWARM', '0') == '1'
+
+def load_model(path):
+    if MODEL_IMAGE:
+        model = model_image.open_image(MODEL_IMAGE, source=path)
+        if MODEL_PREWARM:
+            model.prewarm()
+        return model
+    with open(path, "rb") as pickle_in:
+        return pickle.load(pickle_in)
+
+# A new model.pkl is picked up every MODEL_RELOAD_INTERVAL seconds (0 disables)
+# after it has scored the canary note from Bank-Note-Authentication.ipynb
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 5))
+CANARY = [[3.6216, 8.6661, -2.8073, -0.44699]]
+# MODEL_LOADING=deferred starts serving before the model is loaded: it is loaded
+# in the background at startup and /ready answers 503 until it has scored the
+# canary. Prediction requests wait up to MODEL_READY_TIMEOUT seconds for it
+MODEL_LOADING = os.environ.get('MODEL_LOADING', 'eager')
+MODEL_READY_TIMEOUT = float(os.environ.get('MODEL_READY_TIMEOUT', 30))
+models = ModelHandle("model.pkl", load_model, CANARY, MODEL_RELOAD_INTERVAL,
+                     defer=MODEL_LOADING == 'deferred', ready_timeout=MODEL_READY_TIMEOUT)
+
+# Largest number of notes accepted by /predict/batch in one call
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+# Opt-in: MICRO_BATCHING=1 coalesces concurrent /predict calls into one predict
+MICRO_BATCHING = os.environ.get('MICRO_BATCHING', '0') == '1'
+MICRO_BATCH_SIZE = int(os.environ.get('MICRO_BATCH_SIZE', 64))
+MICRO_BATCH_WAIT_MS = float(os.environ.get('MICRO_BATCH_WAIT_MS', 2))
+batcher = None
+# Cache of predictions for repeated notes; PREDICTION_CACHE_SIZE=0 turns it off
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+PREDICTION_CACHE_DECIMALS = int(os.environ.get('PREDICTION_CACHE_DECIMALS', 6))
+cache = None
+if PREDICTION_CACHE_SIZE > 0:
+    cache = PredictionCache("model.pkl", PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_DECIMALS,
+                            version_of=lambda: models.version)
+# Rows scored per predict call by /predict/stream
+STREAM_CHUNK_ROWS = int(os.environ.get('STREAM_CHUNK_ROWS', 4096))
+# Per-stage timings and counters for the prediction routes, served on /metrics.
+# PROFILE_SAMPLE_RATE=0.01 runs 1% of requests under cProfile and keeps the slowest
+PREDICTION_ROUTES = ['/predict', '/predict/batch', '/predict/stream']
+metrics = ServiceMetrics('banknote', lambda: models.version,
+                         profile_sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)))
+
+
+def label_for(prediction):
+    if prediction == 0:
+        return 'The note is authentic'
+    else:
+        return 'The note is not authentic'
+
+def predict_with_live_model(X):
+    # In-flight requests keep the model they started with across a reload
+    with models.acquire() as classifier, profiled():
+        predictions = classifier.predict(X)
+    metrics.record_rows(len(predictions))
+    return predictions
+
+def predict_rows(X):
+    if cache is not None:
+        return cache.predict(predict_with_live_model, X)
+    return predict_with_live_model(X)
+
+def to_matrix(data):
+    # Build one float matrix (n_notes x 4) from either payload shape
+    if isinstance(data, BankNoteColumns):
+        columns = [getattr(data, name) for name in FEATURES]
+        if len(set(len(column) for column in columns)) != 1:
+            raise HTTPException(status_code=422, detail='All feature columns must have the same length')
+        return np.array(columns, dtype=np.float64).T.reshape(-1, len(FEATURES))
+    return np.array([[getattr(note, name) for name in FEATURES] for note in data],
+                    dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global batcher
+    models.start()
+    if MICRO_BATCHING:
+        batcher = MicroBatcher(predict_rows, MICRO_BATCH_SIZE, MICRO_BATCH_WAIT_MS)
+        await batcher.start()
+    yield
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+    models.stop()
 
 
 # Create FastAPI instance
-app = FastAPI()
-pickle_in = open("model.pkl", "rb")
-classifier = pickle.load(pickle_in)
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware, metrics=metrics, routes=PREDICTION_ROUTES)
 
+@app.exception_handler(ModelNotReady)
+async def model_not_ready(request: Request, error: ModelNotReady):
+    return JSONResponse({'detail': str(error)}, status_code=503, headers={'Retry-After': '1'})
 
 @app.get('/')
 def index():
     return {'message': 'Hello, World'}
 
+@app.get('/ready')
+def ready():
+    # Readiness probe: 200 once a model is live, 503 while it is still loading
+    if not models.ready:
+        error = models.load_error
+        return JSONResponse({'ready': False, 'error': str(error) if error else None}, status_code=503)
+    return {'ready': True, 'version': models.version}
+
 @app.post('/predict')
-def predict_bank_note(data: BankNote):
+async def predict_bank_note(data: BankNote):
+    timer = current_timer()
+    timer.mark('validate')
     variance = data.variance
     skewness = data.skewness
     curtosis = data.curtosis
     entropy = data.entropy
-    prediction = classifier.predict([[variance, skewness, curtosis, entropy]])
-    if prediction[0] == 0:
-        return {'prediction': 'The note is authentic'}
+    row = [variance, skewness, curtosis, entropy]
+    timer.mark('build')
+    if batcher is not None:
+        prediction = await batcher.submit(row)
     else:
-        return {'prediction': 'The note is not authentic'}
+        prediction = (await run_in_threadpool(predict_rows, [row]))[0]
+    timer.mark('predict')
+    return {'prediction': label_for(prediction)}
+
+@app.get('/model')
+def model_info():
+    return {
+        'ready': models.ready,
+        'version': models.version,
+        'reloads': models.reloads,
+        'failed_reloads': models.failed_reloads,
+        'in_flight': models.in_flight(),
+    }
+
+@app.get('/metrics', response_class=PlainTextResponse)
+def metrics_text():
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.get('/metrics/profiles', response_class=PlainTextResponse)
+def metrics_profiles():
+    return metrics.profiles()
+
+@app.get('/cache/stats')
+def cache_stats():
+    if cache is None:
+        return {'enabled': False}
+    return dict(cache.stats(), enabled=True)
+
+@app.post('/predict/batch')
+def predict_bank_note_batch(data: Union[List[BankNote], BankNoteColumns]):
+    '''
+    Score many notes with a single classifier.predict call
+    '''
+    start = time.perf_counter()
+    timer = current_timer()
+    timer.mark('validate')
+    X = to_matrix(data)
+    if len(X) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413,
+                            detail='Batch of {} notes exceeds the maximum of {}'.format(len(X), MAX_BATCH_SIZE))
+    timer.mark('build')
+    predictions = predict_rows(X) if len(X) else []
+    timer.mark('predict')
+    return {
+        'predictions': [label_for(prediction) for prediction in predictions],
+        'batch_size': len(X),
+        'latency_ms': (time.perf_counter() - start) * 1000,
+    }
+
+@app.post('/predict/stream')
+async def predict_bank_note_stream(request: Request):
+    '''
+    Score an NDJSON or CSV upload chunk by chunk, streaming NDJSON results back
+    '''
+    current_timer().mark('validate')
+    fmt = 'csv' if 'csv' in request.headers.get('content-type', '') else 'ndjson'
+    # Large files bypass the prediction cache and go straight to the model
+    results = score_stream(request.stream(), predict_with_live_model, label_for, fmt, STREAM_CHUNK_ROWS)
+    return DuplexStreamingResponse(results, media_type='application/x-ndjson')
 
 if __name__ == '__main__':
-    uvicorn.run(app, host='127.0.0.1', port=8000)
+    # Only needed when run as a script; `uvicorn main:app` imports it itself
+    import uvicorn
+    workers = int(os.environ.get('WORKERS', 1))
+    if workers > 1:
+        uvicorn.run('main:app', host='127.0.0.1', port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host='127.0.0.1', port=8000)
 # BankNotes.py
  # D:\EDOC\pythone-Ml-Basic\machine lear\Resources\Ml-BASIC-PROJECT\Bank-Note-Authentication\main.py
\ No newline at end of file
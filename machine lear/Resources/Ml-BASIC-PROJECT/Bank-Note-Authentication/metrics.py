@@ -0,0 +1,248 @@
+import cProfile
+import heapq
+import io
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Small Prometheus-style metrics layer for the prediction routes: counters,
+# gauges and histograms with labels, rendered in the text exposition format
+# on /metrics. No client library needed.
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ['{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+             for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}'
+
+
+class _Metric:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for labels, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    out.append((self.name + '_bucket', labels + (repr(bound),), cumulative))
+                out.append((self.name + '_bucket', labels + ('+Inf',), count))
+                out.append((self.name + '_sum', labels, total))
+                out.append((self.name + '_count', labels, count))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append('# HELP {} {}'.format(metric.name, metric.documentation))
+            lines.append('# TYPE {} {}'.format(metric.name, metric.kind))
+            for name, labels, value in metric.samples():
+                names = metric.labelnames + (('le',) if name.endswith('_bucket') else ())
+                lines.append('{}{} {}'.format(name, _format_labels(names, labels), value))
+        return '\n'.join(lines) + '\n'
+
+
+# ---- per-request stage timing
+
+_current = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    def __init__(self, route):
+        self.route = route
+        self.start = self.last = time.perf_counter()
+        self.stages = []
+        self.profiler = None
+
+    def mark(self, stage):
+        # Records the time since the previous mark (or the request start)
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+class _NullTimer:
+    profiler = None
+
+    def mark(self, stage):
+        pass
+
+
+def current_timer():
+    return _current.get() or _NullTimer()
+
+
+@contextmanager
+def profiled():
+    # Runs the block under cProfile when the current request was sampled
+    profiler = current_timer().profiler
+    if profiler is None:
+        yield
+        return
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+
+class ServiceMetrics:
+    def __init__(self, prefix, model_version, profile_sample_rate=0.0, keep_profiles=5):
+        self.model_version = model_version
+        self.profile_sample_rate = profile_sample_rate
+        self.keep_profiles = keep_profiles
+        self._profiles = []
+        self._profiles_lock = threading.Lock()
+        self.registry = Registry()
+        self.requests = self.registry.register(Counter(
+            prefix + '_requests_total', 'Prediction requests served.', ('route', 'status', 'model_version')))
+        self.rows = self.registry.register(Counter(
+            prefix + '_predicted_rows_total', 'Rows sent through the model.', ('route', 'model_version')))
+        self.in_flight = self.registry.register(Gauge(
+            prefix + '_requests_in_flight', 'Prediction requests currently being handled.', ('route',)))
+        self.stage_seconds = self.registry.register(Histogram(
+            prefix + '_request_stage_seconds', 'Time spent per request stage.', ('route', 'stage')))
+
+    def render(self):
+        return self.registry.render()
+
+    def record_rows(self, count):
+        # Rows predicted outside a request (the micro-batcher) are labelled 'microbatch'
+        route = getattr(_current.get(), 'route', 'microbatch')
+        self.rows.inc(route, self.model_version(), amount=count)
+
+    def profiles(self):
+        with self._profiles_lock:
+            slowest = sorted(self._profiles, reverse=True)
+        return '\n'.join('=== {} {:.2f} ms\n{}'.format(route, seconds * 1000, text)
+                         for seconds, _, route, text in slowest)
+
+    def _keep_profile(self, timer, seconds):
+        out = io.StringIO()
+        pstats.Stats(timer.profiler, stream=out).sort_stats('cumulative').print_stats(20)
+        entry = (seconds, id(timer), timer.route, out.getvalue())
+        with self._profiles_lock:
+            # Min-heap on duration: only the slowest sampled requests are kept
+            if len(self._profiles) < self.keep_profiles:
+                heapq.heappush(self._profiles, entry)
+            elif seconds > self._profiles[0][0]:
+                heapq.heapreplace(self._profiles, entry)
+
+    def finish(self, timer, status):
+        total = time.perf_counter() - timer.start
+        for stage, seconds in timer.stages:
+            self.stage_seconds.observe(timer.route, stage, value=seconds)
+        self.stage_seconds.observe(timer.route, 'total', value=total)
+        self.requests.inc(timer.route, status, self.model_version())
+        if timer.profiler is not None and timer.profiler.getstats():
+            self._keep_profile(timer, total)
+
+
+# Pure ASGI middleware (no BaseHTTPMiddleware overhead). Everything before the
+# handler's first mark is request parsing + pydantic validation; everything
+# between the last mark and the response start is serialization.
+class MetricsMiddleware:
+    def __init__(self, app, metrics, routes):
+        self.app = app
+        self.metrics = metrics
+        self.routes = set(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        route = scope['path']
+        timer = RequestTimer(route)
+        if metrics.profile_sample_rate and random.random() < metrics.profile_sample_rate:
+            timer.profiler = cProfile.Profile()
+        status = [500]
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                if timer.stages:
+                    timer.mark('serialize')
+            await send(message)
+
+        token = _current.set(timer)
+        metrics.in_flight.inc(route)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.in_flight.dec(route)
+            _current.reset(token)
+            metrics.finish(timer, str(status[0]))
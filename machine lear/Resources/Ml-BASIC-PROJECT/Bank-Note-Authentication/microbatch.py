@@ -0,0 +1,78 @@
+import asyncio
+import numpy as np
+
+
+# Coalesces concurrent single-row predictions into one matrix per flush.
+# A flush happens when max_batch_size rows are queued or max_wait_ms has
+# passed since the first row of the batch arrived, whichever comes first.
+class MicroBatcher:
+    def __init__(self, predict, max_batch_size=64, max_wait_ms=2.0):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        # Rows taken off the queue and not answered yet
+        self._batch = []
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Anyone still waiting - in the batch being collected or predicted, or
+        # still queued - gets an error instead of hanging forever
+        pending = self._batch
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError('Micro-batcher stopped'))
+
+    async def submit(self, row):
+        if self._task is None:
+            raise RuntimeError('Micro-batcher is not running')
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = self._batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            X = np.array([row for row, _ in batch], dtype=np.float64)
+            try:
+                # Run the model off the event loop so new requests keep queueing
+                predictions = await loop.run_in_executor(None, self.predict, X)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                # The caller may have gone away (client disconnect) meanwhile
+                if not future.done():
+                    future.set_result(prediction)
+            self._batch = []
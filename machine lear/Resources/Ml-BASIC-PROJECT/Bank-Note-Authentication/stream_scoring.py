@@ -0,0 +1,195 @@
+import asyncio
+import json
+import tempfile
+from collections import deque
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from BankNotes import FEATURES
+
+
+# The body generator reads the request itself, so Starlette's extra
+# disconnect listener (which would also call receive()) must not run.
+class DuplexStreamingResponse(StreamingResponse):
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+# One note is well under 100 bytes; a longer line is a broken upload, and
+# without a limit it would be buffered whole while waiting for its newline
+MAX_LINE_BYTES = 64 << 10
+
+
+async def iter_lines(byte_chunks, max_line_bytes=MAX_LINE_BYTES):
+    pending = b''
+    async for chunk in byte_chunks:
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise ValueError('Line longer than {} bytes'.format(max_line_bytes))
+            yield line.decode('utf-8').strip()
+        if len(pending) > max_line_bytes:
+            raise ValueError('Line longer than {} bytes'.format(max_line_bytes))
+    if pending:
+        yield pending.decode('utf-8').strip()
+
+
+def parse_csv(line):
+    # data_banknote_authentication.csv rows: 4 features, optionally the class
+    fields = line.split(',')
+    if len(fields) < len(FEATURES):
+        raise ValueError('Expected {} comma separated features'.format(len(FEATURES)))
+    return [float(field) for field in fields[:len(FEATURES)]]
+
+
+def is_csv_header(line):
+    # A header names the features in model order, optionally followed by the class
+    fields = [field.strip().strip('"').lower() for field in line.split(',')]
+    return fields[:len(FEATURES)] == FEATURES and len(fields) <= len(FEATURES) + 1
+
+
+def parse_ndjson(line):
+    record = json.loads(line)
+    if isinstance(record, dict):
+        return [float(record[name]) for name in FEATURES]
+    if len(record) != len(FEATURES):
+        raise ValueError('Expected {} features'.format(len(FEATURES)))
+    return [float(value) for value in record]
+
+
+def _score_chunk(predict, label_for, entries):
+    rows = [features for _, features, error in entries if error is None]
+    predictions = iter(predict(np.array(rows, dtype=np.float64)) if rows else [])
+    out = []
+    for row_number, _, error in entries:
+        if error is None:
+            out.append(json.dumps({'row': row_number, 'prediction': label_for(next(predictions))}))
+        else:
+            out.append(json.dumps({'row': row_number, 'error': error}))
+    return ('\n'.join(out) + '\n').encode('utf-8')
+
+
+async def _score_chunks(byte_chunks, predict, label_for, fmt, chunk_rows, max_line_bytes):
+    parse = parse_csv if fmt == 'csv' else parse_ndjson
+    entries = []
+    row_number = 0
+    first = True
+    async for line in iter_lines(byte_chunks, max_line_bytes):
+        if not line:
+            continue
+        if first and fmt == 'csv' and is_csv_header(line):
+            first = False
+            continue
+        first = False
+        try:
+            entries.append((row_number, parse(line), None))
+        except (ValueError, KeyError, TypeError) as error:
+            entries.append((row_number, None, '{}: {}'.format(type(error).__name__, error)))
+        row_number += 1
+        if len(entries) >= chunk_rows:
+            yield await run_in_threadpool(_score_chunk, predict, label_for, entries)
+            entries = []
+    if entries:
+        yield await run_in_threadpool(_score_chunk, predict, label_for, entries)
+
+
+# Result chunks waiting for the client. Most HTTP clients upload the whole
+# body before reading the response, so results cannot simply wait in memory
+# for them: up to max_chunks are kept in memory, the rest spill to a temp
+# file. Once max_spill_bytes are waiting on disk the reader stops pulling the
+# upload until the client catches up (backpressure), so memory stays bounded
+# by the chunk size and disk by max_spill_bytes whatever the file size.
+class _Spool:
+    def __init__(self, max_chunks, max_spill_bytes):
+        self.max_chunks = max_chunks
+        self.max_spill_bytes = max_spill_bytes
+        self.chunks = deque()
+        self.file = None
+        self.written = 0
+        self.read = 0
+        self.spilling = False
+        self.done = False
+        self.error = None
+        self.readable = asyncio.Event()
+        self.writable = asyncio.Event()
+
+    async def put(self, data):
+        while self.spilling and self.written - self.read >= self.max_spill_bytes:
+            self.writable.clear()
+            await self.writable.wait()
+        if self.spilling or len(self.chunks) >= self.max_chunks:
+            # Everything after the first spilled chunk goes to disk too, to keep order
+            if self.file is None:
+                self.file = tempfile.TemporaryFile()
+            self.file.seek(self.written)
+            self.file.write(data)
+            self.written += len(data)
+            self.spilling = True
+        else:
+            self.chunks.append(data)
+        self.readable.set()
+
+    def _take(self):
+        if self.chunks:
+            return self.chunks.popleft()
+        if self.spilling:
+            self.file.seek(self.read)
+            data = self.file.read(1 << 20)
+            self.read += len(data)
+            if self.read == self.written:
+                self.file.seek(0)
+                self.file.truncate()
+                self.read = self.written = 0
+                self.spilling = False
+            return data
+        return None
+
+    async def get(self):
+        while True:
+            data = self._take()
+            if data is not None:
+                self.writable.set()
+                return data
+            if self.error is not None:
+                raise self.error
+            if self.done:
+                return None
+            self.readable.clear()
+            await self.readable.wait()
+
+    def finish(self, error=None):
+        self.error = error
+        self.done = True
+        self.readable.set()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+async def score_stream(byte_chunks, predict, label_for, fmt='ndjson', chunk_rows=4096,
+                       max_buffered_chunks=4, max_spill_bytes=8 << 20, max_line_bytes=MAX_LINE_BYTES):
+    # A line over max_line_bytes fails the request with ValueError
+    spool = _Spool(max_buffered_chunks, max_spill_bytes)
+
+    async def produce():
+        # Reads and scores the upload independently of how fast results are sent
+        try:
+            async for data in _score_chunks(byte_chunks, predict, label_for, fmt, chunk_rows, max_line_bytes):
+                await spool.put(data)
+        except Exception as error:
+            spool.finish(error)
+        else:
+            spool.finish()
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            data = await spool.get()
+            if data is None:
+                break
+            yield data
+    finally:
+        producer.cancel()
+        spool.close()
@@ -0,0 +1,84 @@
+import importlib.util
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATASET = os.path.join(HERE, '..', 'dataset', 'data_banknote_authentication.csv')
+FEATURES = ['variance', 'skewness', 'curtosis', 'entropy']
+
+
+@pytest.fixture(scope='module')
+def client():
+    with pytest.MonkeyPatch.context() as patch:
+        # model.pkl is opened relative to the working directory
+        patch.chdir(HERE)
+        patch.setenv('MODEL_RELOAD_INTERVAL', '0')
+        patch.setenv('PREDICTION_CACHE_SIZE', '0')
+        patch.setenv('STREAM_CHUNK_ROWS', '100')
+        spec = importlib.util.spec_from_file_location('bank_note_api_main', os.path.join(HERE, 'main.py'))
+        main = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(main)
+        with TestClient(main.app) as client:
+            yield client
+
+
+@pytest.fixture(scope='module')
+def notes():
+    frame = pd.read_csv(DATASET, header=None, names=FEATURES + ['class'])
+    with open(os.path.join(HERE, 'model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    predictions = model.predict(frame[FEATURES].to_numpy())
+    labels = np.where(predictions == 0, 'The note is authentic', 'The note is not authentic')
+    return frame, list(labels)
+
+
+def test_single_and_batch_match_the_model(client, notes):
+    frame, labels = notes
+    for position in [0, 1, 700, 1371]:
+        note = frame.loc[position, FEATURES].to_dict()
+        assert client.post('/predict', json=note).json() == {'prediction': labels[position]}
+    rows = client.post('/predict/batch', json=frame[FEATURES].to_dict('records')).json()
+    assert rows['batch_size'] == len(frame)
+    assert rows['predictions'] == labels
+    columns = client.post('/predict/batch', json=frame[FEATURES].to_dict('list')).json()
+    assert columns['predictions'] == labels
+    assert client.post('/predict/batch', json=[]).json()['predictions'] == []
+    ragged = dict(frame[FEATURES].iloc[:3].to_dict('list'), entropy=[0.0])
+    assert client.post('/predict/batch', json=ragged).status_code == 422
+
+
+def test_stream_matches_the_model(client, notes):
+    frame, labels = notes
+    with open(DATASET, 'rb') as f:
+        body = f.read() + b'not,a,row\n'
+    response = client.post('/predict/stream', content=body, headers={'content-type': 'text/csv'})
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result['row'] for result in results] == list(range(len(frame) + 1))
+    assert [result['prediction'] for result in results[:-1]] == labels
+    assert 'error' in results[-1]
+    ndjson = '\n'.join(json.dumps(note) for note in frame[FEATURES].iloc[:250].to_dict('records'))
+    response = client.post('/predict/stream', content=ndjson, headers={'content-type': 'application/x-ndjson'})
+    assert [json.loads(line)['prediction'] for line in response.text.splitlines()] == labels[:250]
+
+
+def test_metrics_count_requests_and_rows(client):
+    def samples():
+        text = client.get('/metrics').text
+        return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+                for line in text.splitlines() if line and not line.startswith('#')}
+
+    before = samples()
+    client.post('/predict/batch', json=[{name: 1.0 for name in FEATURES}] * 7)
+    after = samples()
+    rows = [key for key in after if key.startswith('banknote_predicted_rows_total{route="/predict/batch"')]
+    requests = [key for key in after if key.startswith('banknote_requests_total{route="/predict/batch",status="200"')]
+    assert len(rows) == len(requests) == 1
+    assert after[rows[0]] - before.get(rows[0], 0) == 7
+    assert after[requests[0]] - before.get(requests[0], 0) == 1
+    assert client.get('/cache/stats').json() == {'enabled': False}
+    assert client.get('/ready').json()['ready'] is True
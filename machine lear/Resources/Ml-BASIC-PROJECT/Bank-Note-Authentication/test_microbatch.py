@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+
+from microbatch import MicroBatcher
+
+
+def _sum_rows(X):
+    return X.sum(axis=1)
+
+
+def test_concurrent_rows_share_a_batch():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return _sum_rows(X)
+
+    async def run():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        results = await asyncio.gather(*[batcher.submit([i, 1.0]) for i in range(20)])
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    np.testing.assert_array_equal(results, np.arange(20) + 1.0)
+    assert calls == [8, 8, 4]
+
+
+def test_model_errors_reach_every_caller():
+    def predict(X):
+        raise ValueError('bad model')
+
+    async def run():
+        batcher = MicroBatcher(predict, max_wait_ms=5)
+        await batcher.start()
+        results = await asyncio.gather(*[batcher.submit([1.0]) for _ in range(3)], return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_stop_fails_the_batch_in_flight_and_the_queue():
+    release = threading.Event()
+
+    def slow_predict(X):
+        release.wait(5)
+        return _sum_rows(X)
+
+    async def run():
+        batcher = MicroBatcher(slow_predict, max_batch_size=2, max_wait_ms=1)
+        await batcher.start()
+        tasks = [asyncio.create_task(batcher.submit([float(i)])) for i in range(5)]
+        # Let the first batch reach the model while the rest wait in the queue
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(batcher.stop(), 1)
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+        release.set()
+        with pytest.raises(RuntimeError):
+            await batcher.submit([1.0])
+        return results
+
+    results = asyncio.run(run())
+    assert len(results) == 5
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+
+from stream_scoring import score_stream
+
+
+async def _chunks(data, size=7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _score(data, fmt='csv', **kwargs):
+    async def run():
+        return [chunk async for chunk in score_stream(_chunks(data), lambda X: np.asarray(X)[:, 0] > 0, str, fmt,
+                                                      chunk_rows=2, **kwargs)]
+    lines = b''.join(asyncio.run(run())).decode('utf-8').splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_csv_header_must_name_the_features():
+    rows = b'3.6,8.6,-2.8,-0.4,0\n-1.4,-4.8,6.2,0.1,1\n'
+    expected = [{'row': 0, 'prediction': 'True'}, {'row': 1, 'prediction': 'False'}]
+    assert _score(rows) == expected
+    assert _score(b'variance,skewness,curtosis,entropy,class\n' + rows) == expected
+    assert _score(b'Variance, Skewness, Curtosis, Entropy\r\n' + rows) == expected
+    broken = _score(b'3.6,8.6,oops,-0.4\n' + rows)
+    assert broken[0]['row'] == 0 and 'error' in broken[0]
+    assert broken[1:] == [{'row': 1, 'prediction': 'True'}, {'row': 2, 'prediction': 'False'}]
+    assert 'error' in _score(b'skewness,variance,curtosis,entropy\n' + rows)[0]
+
+
+def test_overlong_lines_fail_the_request():
+    with pytest.raises(ValueError, match='Line longer'):
+        _score(b'1.0,' * 100 + b'1.0\n', max_line_bytes=64)
+    # Also without a newline ever arriving
+    with pytest.raises(ValueError, match='Line longer'):
+        _score(b'{"variance": ' + b'1' * 200, fmt='ndjson', max_line_bytes=64)
+
+
+def test_results_spill_in_order():
+    rows = b''.join(b'%d,0,0,0\n' % (k % 3 - 1) for k in range(500))
+    results = _score(rows, max_buffered_chunks=1, max_spill_bytes=256)
+    assert [result['row'] for result in results] == list(range(500))
+    assert [result['prediction'] for result in results] == [str(k % 3 == 2) for k in range(500)]
@@ -1,14 +1,59 @@
 import numpy as np
 from flask import Flask, request, jsonify, render_template
 import pickle   
+import os
+import model_image
+from prediction_cache import PredictionCache
+from model_reload import ModelHandle, ModelNotReady
 
 app = Flask(__name__)
-model = pickle.load(open('model.pkl', 'rb'))
+
+def load_model(path):
+    # MODEL_IMAGE=model_image shares one memory-mapped model between all workers
+    # (MODEL_PREWARM=1 reads it into the page cache before going ready)
+    if os.environ.get('MODEL_IMAGE'):
+        model = model_image.open_image(os.environ['MODEL_IMAGE'], source=path)
+        if os.environ.get('MODEL_PREWARM', '0') == '1':
+            model.prewarm()
+        return model
+    return pickle.load(open(path, 'rb'))
+
+# model.pkl is hot-reloaded every MODEL_RELOAD_INTERVAL seconds (0 disables)
+# once the new model has scored a canary flower. MODEL_LOADING=deferred loads
+# it in the background instead of at import; /ready reports when it is live
+models = ModelHandle('model.pkl', load_model, [[5.1, 3.5, 1.4, 0.2]],
+                     float(os.environ.get('MODEL_RELOAD_INTERVAL', 5)),
+                     defer=os.environ.get('MODEL_LOADING', 'eager') == 'deferred',
+                     ready_timeout=float(os.environ.get('MODEL_READY_TIMEOUT', 30)))
+models.start()
+# Cache of predictions for repeated inputs; PREDICTION_CACHE_SIZE=0 turns it off
+cache = None
+if int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)) > 0:
+    cache = PredictionCache('model.pkl', int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)),
+                            float(os.environ.get('PREDICTION_CACHE_TTL', 300)),
+                            version_of=lambda: models.version)
+
+def predict_with_live_model(X):
+    # The model is taken only once the cache has keyed the rows, so a reload in
+    # between can never file old-model predictions under the new version
+    with models.acquire() as model:
+        return model.predict(X)
+
+@app.errorhandler(ModelNotReady)
+def model_not_ready(error):
+    return jsonify({'detail': str(error)}), 503, {'Retry-After': '1'}
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    if not models.ready:
+        error = models.load_error
+        return jsonify({'ready': False, 'error': str(error) if error else None}), 503
+    return jsonify({'ready': True, 'version': models.version})
+
 @app.route('/predict',methods=['POST'])
 def predict():
     '''
@@ -16,9 +61,19 @@ def predict():
     '''
     float_features = [float(x) for x in request.form.values()]
     final_features = [np.array(float_features)]
-    prediction = model.predict(final_features)
+    if cache is not None:
+        prediction = cache.predict(predict_with_live_model, final_features)
+    else:
+        prediction = predict_with_live_model(final_features)
 
     # output = prediction[0]
     return render_template('index.html', prediction_text='Predicted Iris Species is: {}'.format(prediction))
+
+@app.route('/cache/stats')
+def cache_stats():
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(cache.stats(), enabled=True))
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
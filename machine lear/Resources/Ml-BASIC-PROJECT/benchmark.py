@@ -0,0 +1,346 @@
+import argparse
+import csv
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+
+# Offline load test for the model servers in this repo.
+#
+#   python benchmark.py --out report.json
+#   python benchmark.py --out report.json --baseline baseline.json
+#
+# Each target is started as a local subprocess on a free port and driven by
+# keep-alive http.client connections from a thread pool. Payloads come from
+# fixed, seeded corpora built from dataset/*.csv, so runs are comparable.
+# Every scenario replays the same corpus, so the servers run with the
+# prediction cache off (PREDICTION_CACHE_SIZE=0) unless --env turns it on;
+# otherwise everything after the warm-up would be measured as cache hits.
+# Latencies and RPS count successful (200) responses only.
+# For every scenario the report holds RPS, p50/p95/p99 latency and the CPU
+# time and peak RSS of the server process and each of its workers.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BANK_NOTE_DIR = os.path.join(HERE, 'Bank-Note-Authentication')
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+FEATURES = ['variance', 'skewness', 'curtosis', 'entropy']
+IRIS_FIELDS = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
+
+TARGETS = {
+    # name: (command, working directory, corpus, supports /predict/batch)
+    'banknote': ([sys.executable, '-m', 'uvicorn', 'main:app', '--app-dir', BANK_NOTE_DIR],
+                 BANK_NOTE_DIR, 'banknote', True),
+    'fastapi': ([sys.executable, '-m', 'uvicorn', 'main:app', '--app-dir', os.path.join(REPO_ROOT, 'FastAPI')],
+                BANK_NOTE_DIR, 'banknote', True),
+    'flask': ([sys.executable, '-m', 'flask', '--app', 'app', 'run'], HERE, 'iris', False),
+}
+
+
+def build_corpus(kind, size, seed=0):
+    rng = random.Random(seed)
+    if kind == 'banknote':
+        with open(os.path.join(HERE, 'dataset', 'data_banknote_authentication.csv')) as f:
+            rows = [[float(value) for value in row[:4]] for row in csv.reader(f) if row]
+        return [dict(zip(FEATURES, rng.choice(rows))) for _ in range(size)]
+    with open(os.path.join(HERE, 'dataset', 'iris.csv')) as f:
+        rows = [[row[name] for name in ['SepalLengthCm', 'SepalWidthCm', 'PetalLengthCm', 'PetalWidthCm']]
+                for row in csv.DictReader(f)]
+    return [dict(zip(IRIS_FIELDS, rng.choice(rows))) for _ in range(size)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# ---- process stats from /proc (Linux); missing values are reported as None
+
+def _child_pids(pid):
+    children = []
+    try:
+        for task in os.listdir('/proc/{}/task'.format(pid)):
+            with open('/proc/{}/task/{}/children'.format(pid, task)) as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def process_tree(pid):
+    pids = [pid]
+    for child in _child_pids(pid):
+        pids.extend(process_tree(child))
+    return pids
+
+
+def cpu_seconds(pid):
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def rss_mb(pid):
+    try:
+        with open('/proc/{}/status'.format(pid)) as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class ResourceSampler(threading.Thread):
+    def __init__(self, pid, interval=0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = {}
+        self.cpu_start = {p: cpu_seconds(p) for p in process_tree(pid)}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for p in process_tree(self.pid):
+                rss = rss_mb(p)
+                if rss is not None:
+                    self.peak_rss[p] = max(self.peak_rss.get(p, 0), rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        workers = []
+        for p in process_tree(self.pid):
+            start, end = self.cpu_start.get(p), cpu_seconds(p)
+            workers.append({
+                'pid': p,
+                'cpu_seconds': end - start if start is not None and end is not None else end,
+                'peak_rss_mb': self.peak_rss.get(p),
+            })
+        return workers
+
+
+# ---- load generation
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+def _format(value, spec):
+    return format(value, spec) if value is not None else '-'
+
+
+def run_scenario(port, path, bodies, content_type, concurrency, pid):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    next_index = [0]
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local = []
+        while True:
+            with lock:
+                i = next_index[0]
+                next_index[0] += 1
+            if i >= len(bodies):
+                break
+            start = time.perf_counter()
+            try:
+                conn.request('POST', path, body=bodies[i], headers={'Content-Type': content_type})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                with lock:
+                    errors[0] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    sampler = ResourceSampler(pid)
+    sampler.start()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    workers = sampler.stop()
+
+    latencies.sort()
+    return {
+        'path': path,
+        'requests': len(bodies),
+        'concurrency': concurrency,
+        'errors': errors[0],
+        'seconds': wall,
+        'rps': len(latencies) / wall if wall else None,
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'workers': workers,
+    }
+
+
+def start_server(name, port, workers, env):
+    command, cwd, _, _ = TARGETS[name]
+    command = list(command)
+    if name == 'flask':
+        command += ['--port', str(port)]
+    else:
+        command += ['--port', str(port), '--workers', str(workers), '--log-level', 'warning']
+    full_env = dict(os.environ, PREDICTION_CACHE_SIZE='0')
+    full_env.update(env)
+    server = subprocess.Popen(command, cwd=cwd, env=full_env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            conn.close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('{} server did not start'.format(name))
+
+
+def benchmark_target(name, args, env):
+    _, _, corpus_kind, has_batch = TARGETS[name]
+    corpus = build_corpus(corpus_kind, args.requests, seed=args.seed)
+    if corpus_kind == 'banknote':
+        bodies = [json.dumps(record).encode() for record in corpus]
+        content_type = 'application/json'
+    else:
+        bodies = [urlencode(record).encode() for record in corpus]
+        content_type = 'application/x-www-form-urlencoded'
+
+    port = free_port()
+    server = start_server(name, port, args.workers, env)
+    try:
+        # Warm-up so the first scenario does not pay for lazy imports
+        run_scenario(port, '/predict', bodies[:min(50, len(bodies))], content_type, 1, server.pid)
+        results = {
+            'single': run_scenario(port, '/predict', bodies, content_type, 1, server.pid),
+            'concurrent': run_scenario(port, '/predict', bodies, content_type, args.concurrency, server.pid),
+        }
+        if has_batch:
+            batches = [json.dumps(corpus[i:i + args.batch_size]).encode()
+                       for i in range(0, len(corpus), args.batch_size)]
+            result = run_scenario(port, '/predict/batch', batches, content_type, 1, server.pid)
+            result['rows_per_second'] = len(corpus) / result['seconds'] if result['seconds'] else None
+            results['batch'] = result
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(report, baseline, tolerance):
+    # Regression = RPS dropped or p99 grew by more than `tolerance` (fraction)
+    regressions = []
+    print('{:<10} {:<11} {:>12} {:>12} {:>9} {:>12} {:>12} {:>9}'.format(
+        'target', 'scenario', 'base rps', 'rps', 'change', 'base p99', 'p99', 'change'))
+    for target, scenarios in report['results'].items():
+        for scenario, result in scenarios.items():
+            base = baseline.get('results', {}).get(target, {}).get(scenario)
+            if base is None or not (base['rps'] and base['p99_ms']):
+                continue
+            if not (result['rps'] and result['p99_ms']):
+                # No successful requests at all
+                regressions.append('{}/{}'.format(target, scenario))
+                continue
+            rps_change = result['rps'] / base['rps'] - 1
+            p99_change = result['p99_ms'] / base['p99_ms'] - 1
+            print('{:<10} {:<11} {:>12.1f} {:>12.1f} {:>+8.1%} {:>12.2f} {:>12.2f} {:>+8.1%}'.format(
+                target, scenario, base['rps'], result['rps'], rps_change,
+                base['p99_ms'], result['p99_ms'], p99_change))
+            if rps_change < -tolerance or p99_change > tolerance:
+                regressions.append('{}/{}'.format(target, scenario))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the bank-note and iris model servers')
+    parser.add_argument('--target', action='append', choices=sorted(TARGETS),
+                        help='Server to benchmark (repeatable, default: all)')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn workers for the FastAPI targets')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra environment for the servers, e.g. PREDICTION_CACHE_SIZE=10000 to measure with the cache')
+    parser.add_argument('--out', default='benchmark_report.json')
+    parser.add_argument('--baseline', help='Earlier report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    env = dict(item.split('=', 1) for item in args.env)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+        },
+        'results': {},
+    }
+    for name in args.target or sorted(TARGETS):
+        print('Benchmarking {} ...'.format(name))
+        report['results'][name] = benchmark_target(name, args, env)
+        for scenario, result in report['results'][name].items():
+            print('  {:<11} {:>9} rps  p50 {} ms  p95 {} ms  p99 {} ms  errors {}'.format(
+                scenario, _format(result['rps'], '.1f'), _format(result['p50_ms'], '.2f'),
+                _format(result['p95_ms'], '.2f'), _format(result['p99_ms'], '.2f'), result['errors']))
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('Wrote {}'.format(args.out))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print('Regressions beyond {:.0%}: {}'.format(args.tolerance, ', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+import errno
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+import numpy as np
+
+# The versioned-directory publishing shared with dataset_cache.py lives at the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from atomic_publish import new_version_dir, publish, publish_lock
+
+
+# A "model image" is a directory holding the fitted arrays of a classifier as
+# plain .npy files plus a meta.json. Workers open it with mmap_mode='r', so N
+# processes share one read-only copy through the page cache instead of each
+# unpickling its own model.
+#
+# Supported: RandomForestClassifier / ExtraTreesClassifier,
+# DecisionTreeClassifier and linear classifiers (coef_ / intercept_).
+#
+# `image_dir` is a symlink to a versioned directory (model_image.v<pid>-<ns>).
+# A new export is written to a fresh version and the link is swapped
+# atomically (atomic_publish.py), so the live image is never deleted or
+# half-written under a reader. Exports from several workers are serialised with
+# a lock file (model_image.lock), and whoever gets the lock second finds the
+# image fresh.
+
+META = 'meta.json'
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _tree_arrays(estimators, n_classes):
+    # Concatenate every tree's node arrays; child indices are shifted so they
+    # point into the flat arrays. Leaves keep -1 as their children.
+    roots, left, right, feature, threshold, proba = [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        roots.append(offset)
+        is_leaf = tree.children_left == -1
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :n_classes].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        proba.append(value / normalizer)
+        offset += tree.node_count
+    return {
+        'roots': np.array(roots, dtype=np.int64),
+        'left': np.concatenate(left).astype(np.int64),
+        'right': np.concatenate(right).astype(np.int64),
+        'feature': np.concatenate(feature).astype(np.int64),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'proba': np.concatenate(proba),
+    }
+
+
+def export_image(model, image_dir, source=None):
+    with publish_lock(image_dir):
+        _export(model, image_dir, source)
+
+
+def _export(model, image_dir, source=None):
+    # Callers hold the export lock
+    if hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_'):
+        kind, arrays = 'forest', _tree_arrays(model.estimators_, len(model.classes_))
+    elif hasattr(model, 'tree_'):
+        kind, arrays = 'forest', _tree_arrays([model], len(model.classes_))
+    elif hasattr(model, 'coef_'):
+        kind = 'linear'
+        arrays = {'coef': np.asarray(model.coef_, dtype=np.float64),
+                  'intercept': np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))}
+    else:
+        raise TypeError('Cannot export {} as a model image'.format(type(model).__name__))
+
+    meta = {
+        'kind': kind,
+        'classes': np.asarray(model.classes_).tolist(),
+        'n_features': int(model.n_features_in_),
+        'source': _source_stamp(source) if source else None,
+    }
+    base = image_dir.rstrip(os.sep)
+    version_dir = new_version_dir(base)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(version_dir, name + '.npy'), np.ascontiguousarray(array))
+        with open(os.path.join(version_dir, META), 'w') as f:
+            json.dump(meta, f)
+        publish(base, version_dir)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+
+def is_stale(image_dir, source):
+    try:
+        with open(os.path.join(image_dir, META)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return True
+    return meta.get('source') != _source_stamp(source)
+
+
+class MappedModel:
+    def __init__(self, image_dir):
+        # Resolve the link once, so meta.json and the arrays come from the same version
+        image_dir = os.path.realpath(image_dir)
+        with open(os.path.join(image_dir, META)) as f:
+            meta = json.load(f)
+        self.kind = meta['kind']
+        self.classes_ = np.array(meta['classes'])
+        self.n_features_in_ = meta['n_features']
+        self.names = ['roots', 'left', 'right', 'feature', 'threshold', 'proba'] if self.kind == 'forest' else ['coef', 'intercept']
+        for name in self.names:
+            setattr(self, name, np.load(os.path.join(image_dir, name + '.npy'), mmap_mode='r'))
+
+    def prewarm(self):
+        # Read every page of the image once, so the first requests do not
+        # fault them in from disk; returns the number of bytes touched
+        touched = 0
+        for name in self.names:
+            array = getattr(self, name)
+            np.asarray(array).reshape(-1).view(np.uint8).max(initial=0)
+            touched += array.nbytes
+        return touched
+
+    def _forest_proba(self, X):
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        rows = np.arange(len(X))
+        nodes = np.repeat(np.asarray(self.roots)[:, np.newaxis], len(X), axis=1)
+        while True:
+            left = self.left[nodes]
+            active = left != -1
+            if not active.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(active, np.where(go_left, left, self.right[nodes]), nodes)
+        # Accumulate tree by tree like RandomForestClassifier.predict_proba
+        proba = np.zeros((len(X), len(self.classes_)))
+        for tree_nodes in nodes:
+            proba += self.proba[tree_nodes]
+        proba /= len(nodes)
+        return proba
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features_in_)
+        scores = X @ np.asarray(self.coef).T + np.asarray(self.intercept)
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X):
+        if self.kind == 'forest':
+            return self._forest_proba(X)
+        raise AttributeError('predict_proba is only available for tree models')
+
+    def predict(self, X):
+        if self.kind == 'forest':
+            return self.classes_.take(np.argmax(self._forest_proba(X), axis=1))
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes_.take((scores > 0).astype(int))
+        return self.classes_.take(np.argmax(scores, axis=1))
+
+
+def open_image(image_dir, source='model.pkl', retries=5):
+    # Convert model.pkl once (or again if it changed), then map it read-only
+    if is_stale(image_dir, source):
+        with publish_lock(image_dir):
+            # Another worker may have exported it while we waited for the lock
+            if is_stale(image_dir, source):
+                with open(source, 'rb') as f:
+                    _export(pickle.load(f), image_dir, source=source)
+    for attempt in range(retries):
+        try:
+            return MappedModel(image_dir)
+        except OSError as error:
+            # The version we resolved was replaced and removed while we opened it
+            if error.errno != errno.ENOENT or attempt == retries - 1:
+                raise
+            time.sleep(0.01 * (attempt + 1))
+
+
+if __name__ == '__main__':
+    # python model_image.py model.pkl model_image
+    source, image_dir = sys.argv[1], sys.argv[2]
+    with open(source, 'rb') as f:
+        export_image(pickle.load(f), image_dir, source=source)
+    print('Wrote model image to {}'.format(image_dir))
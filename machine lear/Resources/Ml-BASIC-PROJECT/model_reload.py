@@ -0,0 +1,162 @@
+import logging
+import pickle
+import threading
+from contextlib import contextmanager
+import numpy as np
+from prediction_cache import model_version
+
+logger = logging.getLogger(__name__)
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class _Slot:
+    # One loaded model plus the number of requests currently using it
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+        self.refs = 0
+        self.retired = False
+
+
+class ModelNotReady(RuntimeError):
+    pass
+
+
+# Holds the live model and swaps in a new one when the model file changes.
+# A watcher thread polls the file every `interval` seconds, loads the new
+# artifact on that thread, warms it up on the canary rows and only then
+# swaps it in. Requests hold the model through acquire(), so anything already
+# in flight finishes on the model it started with; a replaced model is
+# dropped once its last request releases it.
+#
+# With defer=True nothing is loaded in __init__: start() loads the first
+# model on the watcher thread, so the process can bind its port right away
+# and report readiness (ready / wait_ready) once the model has scored the
+# canary. Until then acquire() waits up to `ready_timeout` seconds and then
+# raises ModelNotReady.
+class ModelHandle:
+    def __init__(self, path, loader=load_pickle, canary=None, interval=5.0, defer=False, ready_timeout=30.0):
+        self.path = path
+        self.loader = loader
+        self.canary = canary
+        self.interval = interval
+        self.ready_timeout = ready_timeout
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.load_error = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._current = None
+        if not defer:
+            self.load()
+
+    @property
+    def version(self):
+        current = self._current
+        return current.version if current is not None else None
+
+    @property
+    def model(self):
+        current = self._current
+        return current.model if current is not None else None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def in_flight(self):
+        with self._lock:
+            return self._current.refs if self._current is not None else 0
+
+    def load(self):
+        # First load; a no-op once a model is live
+        with self._load_lock:
+            if self._current is None:
+                version = model_version(self.path)
+                try:
+                    self._current = _Slot(self._load(), version)
+                except Exception as error:
+                    self.load_error = error
+                    raise
+                self.load_error = None
+                self._ready.set()
+        return self._current.model
+
+    @contextmanager
+    def acquire(self):
+        if not self._ready.is_set() and not self._ready.wait(self.ready_timeout):
+            raise ModelNotReady('{} is not loaded yet{}'.format(
+                self.path, ' ({})'.format(self.load_error) if self.load_error else ''))
+        with self._lock:
+            slot = self._current
+            slot.refs += 1
+        try:
+            yield slot.model
+        finally:
+            with self._lock:
+                slot.refs -= 1
+                if slot.retired and slot.refs == 0:
+                    slot.model = None
+
+    def _load(self):
+        model = self.loader(self.path)
+        if self.canary is not None:
+            # A model that cannot score the canary rows never goes live
+            model.predict(np.asarray(self.canary, dtype=np.float64))
+        return model
+
+    def reload(self):
+        if self._current is None:
+            self.load()
+            return True
+        version = model_version(self.path)
+        if version == self._current.version:
+            return False
+        new_slot = _Slot(self._load(), version)
+        with self._lock:
+            old_slot, self._current = self._current, new_slot
+            old_slot.retired = True
+            if old_slot.refs == 0:
+                old_slot.model = None
+        self.reloads += 1
+        logger.info('Reloaded %s (version %s)', self.path, version)
+        return True
+
+    def _watch(self):
+        while self._current is None and not self._stop.is_set():
+            try:
+                self.load()
+            except Exception:
+                logger.exception('Loading %s failed; retrying', self.path)
+                self._stop.wait(max(self.interval, 1.0))
+        if self.interval <= 0:
+            return
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload()
+            except Exception:
+                # Half-written file or bad artifact: keep the old model, retry next poll
+                self.failed_reloads += 1
+                logger.exception('Reloading %s failed; keeping version %s', self.path, self.version)
+
+    def start(self):
+        if (self.interval > 0 or self._current is None) and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='model-reload', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+def model_version(path):
+    # Cheap identity for a model file: changes whenever it is rewritten
+    stat = os.stat(path)
+    return '{:x}-{:x}'.format(stat.st_size, stat.st_mtime_ns)
+
+
+# In-process cache of predictions for repeated feature vectors.
+# Keys are (model version, feature values rounded to `decimals`); entries are
+# evicted least-recently-used once maxsize is reached and expire after ttl
+# seconds. When the model file changes on disk the whole cache is dropped.
+# Pass version_of (e.g. a ModelHandle's version) to follow the model that is
+# actually live instead of the file on disk.
+class PredictionCache:
+    def __init__(self, model_path, maxsize=10000, ttl=300.0, decimals=6, check_interval=1.0, version_of=None):
+        self.model_path = model_path
+        self.version_of = version_of
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self.check_interval = check_interval
+        self.version = version_of() if version_of else model_version(model_path)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + check_interval
+
+    def _check_model_file(self, now):
+        if self.version_of is not None:
+            version = self.version_of()
+        else:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                version = model_version(self.model_path)
+            except OSError:
+                # Mid-deploy the file may briefly be missing; keep serving
+                return
+        if version != self.version:
+            self.version = version
+            self._entries.clear()
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def predict(self, predict, X):
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(len(X), -1)
+        results = [None] * len(X)
+        missing = []
+        with self._lock:
+            now = time.monotonic()
+            self._check_model_file(now)
+            version = self.version
+            keys = [(version,) + tuple(row) for row in np.round(X, self.decimals).tolist()]
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    results[i] = entry[0]
+                    self.hits += 1
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                    self.expirations += 1
+                missing.append(i)
+                self.misses += 1
+
+        if missing:
+            predictions = predict(X[missing])
+            with self._lock:
+                now = time.monotonic()
+                # A reload during the predict call invalidates what it returned
+                self._check_model_file(now)
+                expires = now + self.ttl
+                for i, prediction in zip(missing, predictions):
+                    results[i] = prediction
+                    # Skip storing if the model changed while we were predicting
+                    if keys[i][0] == self.version:
+                        self._entries[keys[i]] = (prediction, expires)
+                        self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return np.array(results)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'model_version': self.version,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
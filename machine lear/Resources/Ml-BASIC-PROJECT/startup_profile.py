@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+# Cold-start report for the model servers in this repo.
+#
+#   python startup_profile.py banknote --import-budget-ms 1500
+#   python startup_profile.py banknote --env MODEL_LOADING=deferred --import-budget-ms 800
+#   python startup_profile.py flask --repeat 5 --out startup.json
+#
+# The app module is imported in a fresh interpreter under `python -X importtime`
+# and its model is loaded (models.load(), a no-op when it was loaded at import),
+# so each run measures what a new replica pays before it can answer requests:
+#   - process: interpreter start to exit;
+#   - import:  importing the app module (what blocks binding the port);
+#   - ready:   import plus loading and warming the model.
+# The import breakdown adds up self time per top-level package, which shows
+# where the time goes no matter which module happened to import a package first.
+# With a budget given, the exit code is 1 when the best run is over it.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BANK_NOTE_DIR = os.path.join(HERE, 'Bank-Note-Authentication')
+
+TARGETS = {
+    # name: (module, working directory)
+    'banknote': ('main', BANK_NOTE_DIR),
+    'flask': ('app', HERE),
+}
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)\s*$')
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+import {module} as app_module
+imported = time.perf_counter()
+app_module.models.load()
+ready = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'ready_s': ready - start}}))
+'''
+
+
+def parse_importtime(text):
+    # (self_us, cumulative_us, depth, module) for every -X importtime line
+    rows = []
+    for line in text.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, module))
+    return rows
+
+
+def by_package(rows):
+    totals = defaultdict(int)
+    for self_us, _, _, module in rows:
+        totals[module.split('.')[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def profile_once(module, cwd, env):
+    child_env = dict(os.environ, MODEL_RELOAD_INTERVAL='0', PREDICTION_CACHE_SIZE='0')
+    child_env.update(env)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD.format(module=module)],
+                            cwd=cwd, env=child_env, capture_output=True, text=True)
+    process_s = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError('Importing {} failed:\n{}'.format(module, result.stderr[-2000:]))
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(result.stderr)
+    app_us = next((cumulative for _, cumulative, depth, name in rows if depth == 0 and name == module), None)
+    return {
+        'process_ms': process_s * 1000,
+        'import_ms': timings['import_s'] * 1000,
+        'ready_ms': timings['ready_s'] * 1000,
+        'app_import_us': app_us,
+        'packages': by_package(rows),
+    }
+
+
+def profile(module, cwd, env=None, repeat=3):
+    # Best of `repeat` runs; the first one also warms the OS file cache
+    runs = [profile_once(module, cwd, env or {}) for _ in range(repeat)]
+    return min(runs, key=lambda run: run['ready_ms']), runs
+
+
+def render(name, best, runs, top=15):
+    lines = ['{}: best of {} runs'.format(name, len(runs))]
+    for key in ('process_ms', 'import_ms', 'ready_ms'):
+        values = ', '.join('{:.0f}'.format(run[key]) for run in runs)
+        lines.append('  {:<10} {:>8.1f} ms   ({})'.format(key[:-3], best[key], values))
+    lines.append('')
+    lines.append('  {:<28} {:>10}'.format('self time by package', 'ms'))
+    total = sum(us for _, us in best['packages'])
+    for package, us in best['packages'][:top]:
+        lines.append('  {:<28} {:>10.1f}  {:>5.1f}%'.format(package, us / 1000, 100 * us / total if total else 0))
+    return '\n'.join(lines)
+
+
+def check_budget(best, import_budget_ms=None, ready_budget_ms=None):
+    failures = []
+    if import_budget_ms is not None and best['import_ms'] > import_budget_ms:
+        failures.append('import took {:.0f} ms, budget {:.0f} ms'.format(best['import_ms'], import_budget_ms))
+    if ready_budget_ms is not None and best['ready_ms'] > ready_budget_ms:
+        failures.append('ready took {:.0f} ms, budget {:.0f} ms'.format(best['ready_ms'], ready_budget_ms))
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import-time and time-to-ready report for the model servers')
+    parser.add_argument('target', choices=sorted(TARGETS))
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra environment for the app, e.g. MODEL_LOADING=deferred')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--import-budget-ms', type=float)
+    parser.add_argument('--ready-budget-ms', type=float)
+    parser.add_argument('--out', help='Also write the runs as JSON')
+    args = parser.parse_args()
+
+    module, cwd = TARGETS[args.target]
+    env = dict(item.split('=', 1) for item in args.env)
+    best, runs = profile(module, cwd, env, args.repeat)
+    print(render(args.target, best, runs, args.top))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'target': args.target, 'env': env, 'best': best, 'runs': runs}, f, indent=1)
+    failures = check_budget(best, args.import_budget_ms, args.ready_budget_ms)
+    for failure in failures:
+        print('OVER BUDGET: ' + failure)
+    sys.exit(1 if failures else 0)
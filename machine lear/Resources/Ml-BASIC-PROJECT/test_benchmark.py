@@ -0,0 +1,29 @@
+import os
+
+import benchmark
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([], 99) is None
+
+
+def test_no_requests():
+    result = benchmark.run_scenario(benchmark.free_port(), '/predict', [], 'application/json', 4, os.getpid())
+    assert result['errors'] == 0
+    assert result['p99_ms'] is None
+
+
+def test_every_request_failing():
+    # Nothing listens on the port, so every request is refused
+    bodies = [b'{}'] * 5
+    result = benchmark.run_scenario(benchmark.free_port(), '/predict', bodies, 'application/json', 2, os.getpid())
+    assert result['errors'] == 5
+    assert result['rps'] == 0
+    assert result['p50_ms'] is None
+
+    base = dict(result, rps=100.0, p99_ms=5.0)
+    report = {'results': {'banknote': {'single': result}}}
+    assert benchmark.compare(report, {'results': {'banknote': {'single': base}}}, 0.1) == ['banknote/single']
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+import model_image
+import atomic_publish
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def banknotes():
+    data = pd.read_csv(os.path.join(HERE, 'dataset', 'data_banknote_authentication.csv'), header=None)
+    return data.iloc[:, :4].to_numpy(), data.iloc[:, 4].to_numpy()
+
+
+def _pickled(tmp_path, model):
+    path = tmp_path / 'model.pkl'
+    with open(path, 'wb') as f:
+        pickle.dump(model, f)
+    return str(path)
+
+
+def test_forest_image_predicts_like_the_pickle(tmp_path):
+    with open(os.path.join(HERE, 'model.pkl'), 'rb') as f:
+        forest = pickle.load(f)
+    iris = pd.read_csv(os.path.join(HERE, 'dataset', 'iris.csv'))
+    X = iris[['SepalLengthCm', 'SepalWidthCm', 'PetalLengthCm', 'PetalWidthCm']].to_numpy()
+    mapped = model_image.open_image(str(tmp_path / 'image'), source=os.path.join(HERE, 'model.pkl'))
+    np.testing.assert_array_equal(mapped.predict(X), forest.predict(X))
+    np.testing.assert_allclose(mapped.predict_proba(X), forest.predict_proba(X))
+
+
+@pytest.mark.parametrize('model', [DecisionTreeClassifier(random_state=0), LogisticRegression(max_iter=1000)])
+def test_tree_and_linear_images(tmp_path, banknotes, model):
+    X, y = banknotes
+    model.fit(X, y)
+    mapped = model_image.open_image(str(tmp_path / 'image'), source=_pickled(tmp_path, model))
+    np.testing.assert_array_equal(mapped.predict(X), model.predict(X))
+
+
+def test_reexport_swaps_the_link_and_drops_old_versions(tmp_path, banknotes):
+    X, y = banknotes
+    source = _pickled(tmp_path, DecisionTreeClassifier(max_depth=2).fit(X, y))
+    image = str(tmp_path / 'image')
+    unrelated = tmp_path / 'image.very_important'
+    unrelated.mkdir()
+    first = model_image.open_image(image, source=source)
+    deeper = DecisionTreeClassifier(random_state=0).fit(X, y)
+    with open(source, 'wb') as f:
+        pickle.dump(deeper, f)
+    os.utime(source, ns=(1, 1))
+    assert model_image.is_stale(image, source)
+    second = model_image.open_image(image, source=source)
+    assert os.path.islink(image)
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith('image.v')) == sorted(
+        [os.readlink(image), unrelated.name])
+    np.testing.assert_array_equal(second.predict(X), deeper.predict(X))
+    # The first model's maps survive the removal of its directory
+    assert len(first.predict(X)) == len(X)
+
+
+def _open_in_child(image, source, queue):
+    try:
+        model = model_image.open_image(image, source=source)
+        queue.put(('ok', int(model.predict(np.zeros((1, 4)))[0])))
+    except Exception as error:
+        queue.put(('error', repr(error)))
+
+
+@pytest.mark.skipif(atomic_publish.fcntl is None, reason='needs flock')
+def test_concurrent_workers_open_a_stale_image(tmp_path, banknotes):
+    X, y = banknotes
+    source = _pickled(tmp_path, DecisionTreeClassifier(random_state=0).fit(X, y))
+    image = str(tmp_path / 'image')
+    model_image.open_image(image, source=source)
+    for trial in range(3):
+        os.utime(source, ns=(trial + 2, trial + 2))
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        workers = [context.Process(target=_open_in_child, args=(image, source, queue)) for _ in range(16)]
+        for worker in workers:
+            worker.start()
+        results = [queue.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join()
+        assert all(status == 'ok' for status, _ in results), results
+        assert not model_image.is_stale(image, source)
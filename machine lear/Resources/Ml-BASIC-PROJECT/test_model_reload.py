@@ -0,0 +1,81 @@
+import os
+import time
+import numpy as np
+import pytest
+
+from model_reload import ModelHandle, ModelNotReady
+
+
+class Constant:
+    # Predicts the number written in the model file; 'broken' fails the canary
+    def __init__(self, text):
+        self.text = text
+
+    def predict(self, X):
+        return np.full(len(X), int(self.text))
+
+
+def read_model(path):
+    with open(path) as f:
+        return Constant(f.read())
+
+
+def write_model(path, text, mtime_ns):
+    with open(path, 'w') as f:
+        f.write(text)
+    # Distinct mtimes, so every write is a new version even within one clock tick
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'model.txt')
+    write_model(path, '1', 10 ** 9)
+    return path
+
+
+def test_in_flight_requests_keep_their_model(path):
+    handle = ModelHandle(path, read_model, canary=[[0.0]], interval=0)
+    with handle.acquire() as old:
+        write_model(path, '2', 2 * 10 ** 9)
+        assert handle.reload()
+        assert old.predict([[0.0]])[0] == 1
+        assert handle.in_flight() == 0
+        with handle.acquire() as new:
+            assert new.predict([[0.0]])[0] == 2
+    assert not handle.reload()
+    assert handle.reloads == 1
+
+
+def test_bad_artifacts_never_go_live(path):
+    handle = ModelHandle(path, read_model, canary=[[0.0]], interval=0)
+    version = handle.version
+    write_model(path, 'broken', 3 * 10 ** 9)
+    with pytest.raises(ValueError):
+        handle.reload()
+    assert handle.version == version
+    with handle.acquire() as model:
+        assert model.predict([[0.0]])[0] == 1
+
+
+def test_deferred_loading(path, tmp_path):
+    missing = ModelHandle(str(tmp_path / 'missing.txt'), read_model, defer=True, ready_timeout=0.01)
+    with pytest.raises(ModelNotReady):
+        with missing.acquire():
+            pass
+    handle = ModelHandle(path, read_model, interval=0.02, defer=True, ready_timeout=5)
+    assert not handle.ready and handle.model is None
+    handle.start()
+    try:
+        with handle.acquire() as model:
+            assert model.predict([[0.0]])[0] == 1
+        assert handle.ready
+        # The watcher picks up the next version on its own
+        write_model(path, '2', 4 * 10 ** 9)
+        for _ in range(500):
+            if handle.reloads:
+                break
+            time.sleep(0.01)
+        assert handle.model.predict([[0.0]])[0] == 2
+    finally:
+        handle.stop()
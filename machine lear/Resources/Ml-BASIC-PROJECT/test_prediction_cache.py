@@ -0,0 +1,61 @@
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+class Models:
+    # Stands in for a ModelHandle: predicts the live version number for every row
+    def __init__(self):
+        self.version = 1
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return np.full(len(X), self.version)
+
+
+def test_repeated_rows_are_served_from_the_cache():
+    models = Models()
+    cache = PredictionCache('model.pkl', version_of=lambda: models.version)
+    X = [[1.0, 2.0], [3.0, 4.0], [1.0, 2.0]]
+    np.testing.assert_array_equal(cache.predict(models.predict, X), [1, 1, 1])
+    np.testing.assert_array_equal(cache.predict(models.predict, X), [1, 1, 1])
+    assert models.calls == 1
+    assert cache.stats()['hits'] == 3
+
+
+def test_reload_clears_the_cache():
+    models = Models()
+    cache = PredictionCache('model.pkl', version_of=lambda: models.version)
+    cache.predict(models.predict, [[1.0, 2.0]])
+    models.version = 2
+    np.testing.assert_array_equal(cache.predict(models.predict, [[1.0, 2.0]]), [2])
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_reload_during_predict_is_not_cached():
+    models = Models()
+    cache = PredictionCache('model.pkl', version_of=lambda: models.version)
+
+    def reload_then_predict(X):
+        # The rows were keyed under version 1, the new model answers them
+        models.version = 2
+        return models.predict(X)
+
+    np.testing.assert_array_equal(cache.predict(reload_then_predict, [[1.0, 2.0]]), [2])
+    assert cache.stats()['size'] == 0
+    np.testing.assert_array_equal(cache.predict(models.predict, [[1.0, 2.0]]), [2])
+    assert cache.stats()['size'] == 1
+
+
+def test_model_acquired_before_a_reload_is_not_cached():
+    models = Models()
+    cache = PredictionCache('model.pkl', version_of=lambda: models.version)
+    old_predict = Models().predict
+
+    def predict_with_old_model(X):
+        models.version = 2
+        return old_predict(X)
+
+    np.testing.assert_array_equal(cache.predict(predict_with_old_model, [[1.0, 2.0]]), [1])
+    np.testing.assert_array_equal(cache.predict(models.predict, [[1.0, 2.0]]), [2])
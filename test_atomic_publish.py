@@ -0,0 +1,40 @@
+import os
+
+from atomic_publish import new_version_dir, publish, publish_lock
+
+
+def _write_version(base, text):
+    version_dir = new_version_dir(base)
+    with open(os.path.join(version_dir, 'data.txt'), 'w') as f:
+        f.write(text)
+    publish(base, version_dir)
+    return version_dir
+
+
+def _read(base):
+    with open(os.path.join(base, 'data.txt')) as f:
+        return f.read()
+
+
+def test_publish_swaps_versions_and_keeps_unrelated_siblings(tmp_path):
+    base = str(tmp_path / 'cache')
+    for name in ['cache.very_important', 'cache.v1', 'cache.v-older', 'other.v1-2']:
+        (tmp_path / name).mkdir()
+    with publish_lock(base):
+        first = _write_version(base, 'one')
+    assert _read(base) == 'one'
+    second = _write_version(base, 'two')
+    assert _read(base) == 'two'
+    assert os.readlink(base) == os.path.basename(second)
+    assert not os.path.exists(first)
+    assert sorted(os.listdir(tmp_path)) == sorted(['cache', 'cache.lock', os.path.basename(second),
+                                                   'cache.very_important', 'cache.v1', 'cache.v-older', 'other.v1-2'])
+
+
+def test_unversioned_directory_is_replaced(tmp_path):
+    base = tmp_path / 'image'
+    base.mkdir()
+    (base / 'data.txt').write_text('old')
+    version_dir = _write_version(str(base), 'new')
+    assert os.path.islink(str(base)) and _read(str(base)) == 'new'
+    assert sorted(os.listdir(tmp_path)) == ['image', os.path.basename(version_dir)]
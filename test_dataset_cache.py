@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+
+import atomic_publish
+import dataset_cache
+from dataset_cache import DATASETS, REPO_ROOT, cached_schema, load_arrays, load_csv
+
+
+@pytest.fixture
+def copy_of(tmp_path):
+    def copy(name):
+        path = str(tmp_path / os.path.basename(DATASETS[name]))
+        shutil.copy(os.path.join(REPO_ROOT, DATASETS[name]), path)
+        return path
+    return copy
+
+
+def _append_row(path):
+    with open(path) as f:
+        text = f.read()
+    with open(path, 'a') as f:
+        f.write(('' if text.endswith('\n') else '\n') + '1.0,2.0,3.0,Florida,4.0\n')
+
+
+@pytest.mark.parametrize('name', sorted(DATASETS))
+def test_frames_match_read_csv(copy_of, name):
+    path = copy_of(name)
+    expected = pd.read_csv(path)
+    pd.testing.assert_frame_equal(load_csv(path), expected)
+    # Second load comes from the cache
+    pd.testing.assert_frame_equal(load_csv(path), expected)
+    pd.testing.assert_frame_equal(load_csv(path, mmap=False), expected)
+    arrays = load_arrays(path)
+    for column in expected.columns:
+        np.testing.assert_array_equal(pd.isna(arrays[column]), expected[column].isna().to_numpy())
+        assert list(pd.Series(arrays[column]).dropna()) == list(expected[column].dropna())
+
+
+def test_columns_categories_and_read_csv_options(copy_of):
+    path = copy_of('titanic')
+    expected = pd.read_csv(path, index_col='PassengerId', usecols=['PassengerId', 'Name', 'Embarked', 'Age'])
+    frame = load_csv(path, index_col='PassengerId', usecols=['PassengerId', 'Name', 'Embarked', 'Age'])
+    pd.testing.assert_frame_equal(frame, expected)
+    pd.testing.assert_frame_equal(load_csv(path, columns=['Age', 'Survived']), pd.read_csv(path)[['Age', 'Survived']])
+    embarked = load_csv(path, columns=['Embarked'], strings='category')['Embarked']
+    assert isinstance(embarked.dtype, pd.CategoricalDtype)
+    assert list(embarked.astype(object).fillna('?')) == list(expected['Embarked'].astype(object).fillna('?'))
+    assert not load_arrays(path, ['Age'])['Age'].flags.writeable
+
+
+def test_rebuilds_only_when_the_contents_change(copy_of):
+    path = copy_of('50_startups')
+    first = cached_schema(path)
+    os.utime(path, ns=(1, 1))
+    assert cached_schema(path)['source']['sha256'] == first['source']['sha256']
+    assert cached_schema(path)['source']['mtime_ns'] == 1
+    _append_row(path)
+    assert cached_schema(path)['n_rows'] == first['n_rows'] + 1
+    assert load_csv(path)['State'].iloc[-1] == 'Florida'
+    cache_dir = os.path.dirname(dataset_cache._cache_dir(path, {}))
+    versions = [name for name in os.listdir(cache_dir) if '.v' in name]
+    assert versions == [os.readlink(dataset_cache._cache_dir(path, {}))]
+
+
+def _load_in_child(path, queue):
+    try:
+        queue.put(('ok', int(load_csv(path)['Profit'].count())))
+    except Exception as error:
+        queue.put(('error', repr(error)))
+
+
+@pytest.mark.skipif(atomic_publish.fcntl is None, reason='needs flock')
+def test_concurrent_loads_of_a_changed_file(copy_of):
+    path = copy_of('50_startups')
+    load_csv(path)
+    context = multiprocessing.get_context('fork')
+    for trial in range(3):
+        _append_row(path)
+        queue = context.Queue()
+        workers = [context.Process(target=_load_in_child, args=(path, queue)) for _ in range(12)]
+        for worker in workers:
+            worker.start()
+        results = [queue.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join()
+        assert results == [('ok', 51 + trial)] * len(workers)